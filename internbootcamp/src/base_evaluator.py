@@ -1,22 +1,57 @@
 import os
+import re
 from re import S
 import openai
 import yaml
 import importlib
 import json
 import asyncio
+import time
 import httpx
-import csv
+from concurrent.futures import ThreadPoolExecutor
 
 from transformers import AutoTokenizer
 import pandas as pd
 from tqdm import tqdm
-from typing import Any, Dict, List, Optional, Callable, Tuple
-from tenacity import retry, stop_after_attempt, wait_exponential
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Callable, Tuple, Union
 from internbootcamp.utils.format_time_now import format_time_now
 from internbootcamp.utils.load_tool_from_config import load_tool_from_config
 from internbootcamp.utils.load_interaction_from_config import load_interaction_from_config
 from internbootcamp.utils.load_class_from_str import load_class_from_string
+from internbootcamp.utils.adaptive_concurrency import AdaptiveConcurrencyLimiter, is_overload_error
+from internbootcamp.utils.chat_stream import FINISH_REASON_TIME_BUDGET, consume_chat_stream, current_sample_deadline
+from internbootcamp.utils.context_render import render_contexts, render_messages
+from internbootcamp.utils.endpoint_pool import EndpointPool, current_routing_key, parse_api_urls
+from internbootcamp.utils.http_pool import build_http_client, build_timeout, close_shared_aiohttp_sessions, http_pool_stats
+from internbootcamp.utils.eval_metrics import (
+    COLLECT_INTERVAL,
+    EvaluationMetrics,
+    PhaseTimer,
+    run_metrics_collector,
+    run_snapshot_writer,
+    start_metrics_server,
+)
+from internbootcamp.utils.eval_report import (
+    EvaluationStatsAccumulator,
+    calculate_tool_statistics,
+    iter_stat_records,
+    print_console_report,
+    save_csv_report,
+    stats_path_for,
+)
+from internbootcamp.utils.response_cache import ResponseCache, ResponseCacheMiss, payload_cache_key
+from internbootcamp.utils.retry_policy import TOOL_RETRYABLE_STATUS_CODES, RetryBudget, RetryPolicy
+from internbootcamp.utils.result_format import (
+    RESULT_COMPRESSIONS,
+    RESULT_FORMATS,
+    ZSTD_SUFFIX,
+    compact_result,
+    iter_results,
+    result_file_stem,
+)
+from internbootcamp.utils.result_writer import AsyncResultWriter
+from internbootcamp.utils.token_budget import ConversationTokenCounter
+from internbootcamp.utils.resume_index import compute_sample_key, index_path_for, load_completed_index
 from internbootcamp.src.base_tool import BaseTool
 from internbootcamp.src.base_interaction import BaseInteraction
 from internbootcamp.src.base_reward_calculator import BaseRewardCalculator
@@ -24,6 +59,15 @@ import jsonlines
 from PIL import Image
 from internbootcamp.src.img2base64 import encode_image_file_to_base64
 
+def _normalize_parquet_item(item: dict) -> dict:
+    """确保 parquet 加载后的 messages 和 prompt 字段是 Python 列表而不是 numpy 数组"""
+    for field in ("messages", "prompt"):
+        if field in item and hasattr(item[field], 'tolist'):
+            item[field] = item[field].tolist()
+        elif field in item and item[field] is not None and not isinstance(item[field], list):
+            item[field] = list(item[field])
+    return item
+
 def load_dataset(dataset_path, dataset=None):
     """
     加载数据集，支持 JSON、JSONL 和 Parquet 文件格式，并始终返回 list。
@@ -61,28 +105,65 @@ def load_dataset(dataset_path, dataset=None):
             
             # 处理 parquet 加载后的数据类型问题
             for item in dataset:
-                # 确保 messages 和 prompt 字段是 Python 列表而不是 numpy 数组
-                if 'messages' in item and hasattr(item['messages'], 'tolist'):
-                    item['messages'] = item['messages'].tolist()
-                elif 'messages' in item and not isinstance(item['messages'], list):
-                    item['messages'] = list(item['messages'])
-                
-                if 'prompt' in item and hasattr(item['prompt'], 'tolist'):
-                    item['prompt'] = item['prompt'].tolist()
-                elif 'prompt' in item and not isinstance(item['prompt'], list):
-                    item['prompt'] = list(item['prompt'])
+                _normalize_parquet_item(item)
         
         else:
             raise ValueError(f"不支持的文件格式: {ext}")
     
     return dataset
 
+def iter_dataset(dataset_path: str, batch_size: int = 1024) -> Iterator[dict]:
+    """
+    流式加载数据集，逐条产出样本，内存占用与数据集大小无关。
+    
+    - JSONL: 逐行读取
+    - Parquet: 通过 pyarrow 按 batch 读取 row group
+    - JSON: 无法流式解析，整体加载后逐条产出
+    
+    参数:
+        dataset_path (str): 数据集文件路径。
+        batch_size (int): Parquet 每次读取的行数。
+    
+    返回:
+        Iterator[dict]: 样本迭代器。
+    """
+    _, ext = os.path.splitext(dataset_path)
+    ext = ext.lower()
+    
+    if ext == ".jsonl":
+        with jsonlines.open(dataset_path) as reader:
+            for line in reader:
+                yield line
+    
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(dataset_path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size):
+            for item in batch.to_pylist():
+                yield _normalize_parquet_item(item)
+    
+    elif ext == ".json":
+        yield from load_dataset(dataset_path)
+    
+    else:
+        raise ValueError(f"不支持的文件格式: {ext}")
+
+def count_dataset(dataset_path: str) -> Optional[int]:
+    """
+    在不加载数据的前提下获取数据集样本数，无法廉价获取时返回 None（仅 Parquet 可从元数据读取）。
+    """
+    _, ext = os.path.splitext(dataset_path)
+    if ext.lower() == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(dataset_path).metadata.num_rows
+    return None
+
 class BaseEvaluator:
     def __init__(
         self,
         api_key: str,
         reward_calculator: BaseRewardCalculator,
-        api_url: str = None,
+        api_url: Union[str, List[str]] = None,
         api_model: str = None,
         api_extra_headers: dict = None,
         api_extra_params: dict = None,
@@ -90,6 +171,44 @@ class BaseEvaluator:
         max_assistant_turns: int = None,
         max_user_turns: int = None,
         tokenizer_path = None,
+        result_flush_lines: int = 64,
+        result_flush_interval: float = 1.0,
+        result_fsync_interval: Optional[float] = None,
+        resume_key_field: Optional[str] = None,
+        metrics_interval: Optional[float] = None,
+        metrics_port: Optional[int] = None,
+        metrics_host: str = "127.0.0.1",
+        adaptive_concurrency: bool = False,
+        adaptive_min_concurrency: int = 1,
+        adaptive_max_concurrency: Optional[int] = None,
+        endpoint_policy: str = "least_outstanding",
+        endpoint_eject_failures: int = 3,
+        endpoint_eject_seconds: float = 30.0,
+        http_max_connections: Optional[int] = None,
+        http_keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        http_connect_timeout: float = 10.0,
+        http_read_timeout: Optional[float] = 600.0,
+        http_write_timeout: float = 60.0,
+        http_pool_timeout: Optional[float] = 60.0,
+        api_stream: bool = False,
+        stream_stop_regex: Optional[str] = None,
+        sample_time_budget: Optional[float] = None,
+        response_cache_path: Optional[str] = None,
+        response_cache_max_mb: Optional[float] = None,
+        response_cache_mode: str = "readwrite",
+        result_format: str = "full",
+        result_compression: Optional[str] = None,
+        render_workers: int = 4,
+        max_context_tokens: Optional[int] = None,
+        min_completion_tokens: int = 256,
+        api_retry_attempts: int = 5,
+        tool_retry_attempts: int = 16,
+        retry_max_delay: float = 60.0,
+        retry_budget_ratio: Optional[float] = 0.2,
+        retry_budget_min: int = 10,
+        max_parallel_tool_calls: int = 4,
+        eager_tool_create: bool = False,
         **kwargs,
         ):
         self.api_model = api_model
@@ -98,12 +217,173 @@ class BaseEvaluator:
         self.verify_correction_kwargs = verify_correction_kwargs or {}
         self.max_assistant_turns = max_assistant_turns
         self.max_user_turns = max_user_turns
-        self.client = openai.AsyncOpenAI(base_url=api_url, api_key=api_key, default_headers=api_extra_headers, http_client=httpx.AsyncClient(verify=False))
+        self.api_key = api_key
+        # HTTP 连接池：http_max_connections 为 None 时在 run_evaluation 中按 max_concurrent 配置
+        self.http_max_connections = http_max_connections
+        self.http_keepalive_expiry = http_keepalive_expiry
+        self.http2 = http2
+        self.http_timeout = build_timeout(
+            connect=http_connect_timeout,
+            read=http_read_timeout,
+            write=http_write_timeout,
+            pool=http_pool_timeout,
+        )
+        self._http_pool_size = http_max_connections or 100
+        # api_url 支持多个端点（列表或逗号分隔），多端点时由 endpoint_pool 路由请求
+        self.api_urls = parse_api_urls(api_url)
+        # 流式请求：记录 TTFT，并支持 stream_stop_regex（content 匹配后停止生成）；
+        # sample_time_budget 为单个样本的墙钟时间预算（秒），到期后停止并对已有输出评分
+        self.api_stream = api_stream
+        self.stream_stop_regex = re.compile(stream_stop_regex) if stream_stop_regex else None
+        self.sample_time_budget = sample_time_budget
+        # 响应缓存：以 payload 哈希为键缓存模型响应，cache_only 模式下只重放缓存、不请求模型
+        self.response_cache: Optional[ResponseCache] = None
+        if response_cache_path:
+            self.response_cache = ResponseCache(
+                response_cache_path,
+                max_bytes=int(response_cache_max_mb * 1024 * 1024) if response_cache_max_mb else None,
+                mode=response_cache_mode,
+            )
+        self.client = self._create_client(self.api_urls[0])
+        self._clients_closed = False
         self.bootcamp_registry: Dict[str, dict] = {}
         self.reward_calculator = reward_calculator
         self.tokenizer_path = tokenizer_path
         self.tokenizer = self._get_tokenizer()
+        # 上下文渲染（chat template）在线程池中执行，不阻塞事件循环；render_workers 为 0 时在事件循环中执行。
+        # 线程池在首次使用时创建，随 API 客户端一起在 _close_clients 中关闭
+        self.render_workers = render_workers
+        self._render_executor: Optional[ThreadPoolExecutor] = None
+        # 上下文 token 预算：每次请求前估计 prompt token 数，剩余不足 min_completion_tokens 时结束样本（context_exhausted），
+        # 剩余预算小于 max_tokens 时按剩余预算缩小本次请求的 max_tokens
+        self.max_context_tokens = max_context_tokens
+        self.min_completion_tokens = min_completion_tokens
+        # 同一轮中多个工具调用的最大并发数（单个样本内），1 表示按顺序执行
+        self.max_parallel_tool_calls = max_parallel_tool_calls
+        # 工具实例在样本的首次调用时创建并在之后的调用中复用；eager_tool_create 时在样本开始时并发创建
+        self.eager_tool_create = eager_tool_create
+        # 结果写入参数（见 AsyncResultWriter）
+        self.result_flush_lines = result_flush_lines
+        self.result_flush_interval = result_flush_interval
+        self.result_fsync_interval = result_fsync_interval
+        # 断点重试的样本键字段（如 "extra_info.index"），None 表示使用内容哈希
+        self.resume_key_field = resume_key_field
+        # 结果存储格式：compact 只存储一次对话，不存储渲染后的上下文（见 result_format）；
+        # result_compression="zstd" 时新结果文件以 .jsonl.zst 压缩写入
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"不支持的结果格式: {result_format}，可选: {RESULT_FORMATS}")
+        if result_compression is not None and result_compression not in RESULT_COMPRESSIONS:
+            raise ValueError(f"不支持的结果压缩方式: {result_compression}，可选: {RESULT_COMPRESSIONS}")
+        self.result_format = result_format
+        self.result_compression = result_compression
+        # 运行时指标：metrics_interval 秒写一次 <结果文件>.metrics.json，metrics_port 启用本地 HTTP 端点
+        self.metrics = EvaluationMetrics()
+        self.metrics_interval = metrics_interval
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        # 重试策略：只重试 429 / 5xx / 超时 / 连接错误（其他 4xx 立即失败），优先使用服务端的 Retry-After；
+        # 模型请求与工具调用各有一个重试预算（每个请求存入 retry_budget_ratio 个重试令牌），避免重试风暴；
+        # retry_budget_ratio 为 None 时不限制重试总量
+        self.api_retry_policy = RetryPolicy(
+            "api",
+            max_attempts=api_retry_attempts,
+            max_delay=retry_max_delay,
+            budget=RetryBudget(retry_budget_ratio, retry_budget_min) if retry_budget_ratio is not None else None,
+            metrics=self.metrics,
+        )
+        # 工具调用的重试策略，加载工具时交给本评测器的 BaseMCPTool（见 _load_tools_from_yaml），
+        # 带状态码的错误只重试 502/503/504
+        self.tool_retry_policy = RetryPolicy(
+            "tool",
+            max_attempts=tool_retry_attempts,
+            max_delay=retry_max_delay,
+            budget=RetryBudget(retry_budget_ratio, retry_budget_min) if retry_budget_ratio is not None else None,
+            metrics=self.metrics,
+            retryable_status_codes=TOOL_RETRYABLE_STATUS_CODES,
+        )
+        # 自适应并发：API 请求数上限在 [adaptive_min_concurrency, adaptive_max_concurrency] 内按 AIMD 调整，
+        # adaptive_max_concurrency 默认取 run_evaluation 的 max_concurrent
+        self.adaptive_concurrency = adaptive_concurrency
+        self.adaptive_min_concurrency = adaptive_min_concurrency
+        self.adaptive_max_concurrency = adaptive_max_concurrency
+        self.api_limiter: Optional[AdaptiveConcurrencyLimiter] = None
+        self.endpoint_pool: Optional[EndpointPool] = None
+        if len(self.api_urls) > 1:
+            self.endpoint_pool = EndpointPool(
+                self.api_urls,
+                self._create_client,
+                policy=endpoint_policy,
+                eject_failures=endpoint_eject_failures,
+                eject_seconds=endpoint_eject_seconds,
+                metrics=self.metrics,
+            )
+            self.client = self.endpoint_pool.endpoints[0].client
+        self.metrics.add_collector(self._collect_http_pool_metrics)
+        if self.response_cache:
+            self.metrics.add_collector(self._collect_response_cache_metrics)
         
+    def _create_client(self, api_url: Optional[str]) -> openai.AsyncOpenAI:
+        """为单个端点创建 API 客户端"""
+        http_client = build_http_client(
+            self._http_pool_size,
+            keepalive_expiry=self.http_keepalive_expiry,
+            http2=self.http2,
+        )
+        return openai.AsyncOpenAI(base_url=api_url, api_key=self.api_key, default_headers=self.api_extra_headers or None, timeout=self.http_timeout, http_client=http_client, max_retries=0)
+
+    def _response_cache_key(self, payload: dict) -> str:
+        """缓存键：payload 加上会改变响应内容的客户端停止条件"""
+        extra = {}
+        if self.api_stream and self.stream_stop_regex is not None:
+            extra["stream_stop_regex"] = self.stream_stop_regex.pattern
+        return payload_cache_key(payload, extra)
+
+    def _api_clients(self) -> List[openai.AsyncOpenAI]:
+        if self.endpoint_pool:
+            return [endpoint.client for endpoint in self.endpoint_pool.endpoints]
+        return [self.client]
+
+    async def _open_clients(self, max_concurrent: int) -> None:
+        """按并发数配置连接池；连接池大小变化或客户端已关闭时重新创建客户端"""
+        pool_size = self.http_max_connections or max(1, max_concurrent)
+        if not self._clients_closed and pool_size == self._http_pool_size:
+            return
+        await self._close_clients()
+        self._http_pool_size = pool_size
+        if self.endpoint_pool:
+            self.endpoint_pool.replace_clients(self._create_client)
+            self.client = self.endpoint_pool.endpoints[0].client
+        else:
+            self.client = self._create_client(self.api_urls[0])
+        self._clients_closed = False
+
+    async def _close_clients(self) -> None:
+        """关闭 API 客户端及其连接池，以及渲染线程池"""
+        if self._render_executor is not None:
+            self._render_executor.shutdown(wait=False)
+            self._render_executor = None
+        if self._clients_closed:
+            return
+        for client in self._api_clients():
+            try:
+                await client.close()
+            except Exception as e:
+                print(f"⚠️ 关闭 API 客户端失败: {e}")
+        self._clients_closed = True
+
+    def _collect_http_pool_metrics(self) -> None:
+        if self._clients_closed:
+            return
+        http_clients = [getattr(client, "_client", None) for client in self._api_clients()]
+        stats = http_pool_stats([http_client for http_client in http_clients if http_client is not None])
+        for name, value in stats.items():
+            self.metrics.set_gauge(f"http_pool_{name}", value)
+
+    def _collect_response_cache_metrics(self) -> None:
+        # 命中/未命中只由 ResponseCache 计数，这里发布到运行时指标
+        self.metrics.set_counter("response_cache_hits", self.response_cache.hits)
+        self.metrics.set_counter("response_cache_misses", self.response_cache.misses)
+
     def _get_tokenizer(self):
         if not self.tokenizer_path:
             return None
@@ -137,24 +417,75 @@ class BaseEvaluator:
 
         return payload
     
-    @retry(
-        stop=stop_after_attempt(5),
-        wait=wait_exponential(multiplier=1, max=60),
-        reraise=True,
-        before_sleep=lambda retry_state: print(f"重试中... 第{retry_state.attempt_number}次尝试失败: \n{retry_state.outcome.exception()}")
-        )
     async def _call_api(self, payload: dict) -> Dict[str, Any]:
+        cache_key = None
+        if self.response_cache:
+            cache_key = self._response_cache_key(payload)
+            cached = await self.response_cache.aget(cache_key)
+            if cached is not None:
+                # 标记缓存命中：其耗时与 token 不计入 API 延迟、吞吐与报告的分阶段耗时
+                return {**cached, "cached": True}, cached.get("usage") or {}
+            if self.response_cache.mode == "cache_only":
+                raise ResponseCacheMiss("响应缓存未命中 (cache_only 模式)")
+        # 重试由 api_retry_policy 按错误类型控制（客户端自身的重试已关闭，见 _create_client）
+        response_dict = await self.api_retry_policy.call(self._request_completion, payload)
+        if cache_key and self.response_cache.writable:
+            # 因时间预算截断的响应不可复现，不写入缓存
+            finish_reason = (response_dict.get("choices") or [{}])[0].get("finish_reason")
+            if finish_reason != FINISH_REASON_TIME_BUDGET:
+                cached = {key: value for key, value in response_dict.items() if key != "stream_stats"}
+                await self.response_cache.aput(cache_key, cached)
+        # print("DEBUG response", response)
+        # 提取 token usage 信息
+        usage = response_dict.get("usage", {})
+        return response_dict, usage
+
+    async def _request_completion(self, payload: dict) -> Dict[str, Any]:
+        """向模型发送一次请求（不重试），返回响应字典"""
+        limiter = self.api_limiter
+        if limiter:
+            await limiter.acquire()
+        # 多端点时按样本粘性路由
+        endpoint = self.endpoint_pool.acquire(current_routing_key.get()) if self.endpoint_pool else None
+        client = endpoint.client if endpoint else self.client
+        start_time = time.perf_counter()
         try:
-            response = await self.client.chat.completions.create(**payload)
+            if self.api_stream:
+                # api_extra_params 中可能已有 stream / stream_options，合并而不是重复传参；始终要求返回 usage
+                stream_payload = {
+                    **payload,
+                    "stream": True,
+                    "stream_options": {**(payload.get("stream_options") or {}), "include_usage": True},
+                }
+                stream = await client.chat.completions.create(**stream_payload)
+                response_dict, stream_stats = await consume_chat_stream(
+                    stream,
+                    start_time,
+                    stop_regex=self.stream_stop_regex,
+                    deadline=current_sample_deadline.get(),
+                )
+                response_dict["stream_stats"] = stream_stats
+            else:
+                response = await client.chat.completions.create(**payload)
+                response_dict = response.model_dump()
         except Exception as e:
             # print("Error happened when processing playload:")
             # print(payload)
+            if limiter and is_overload_error(e):
+                limiter.on_overload()
+            if endpoint:
+                endpoint_failed = is_overload_error(e) or isinstance(e, openai.APIConnectionError)
+                self.endpoint_pool.release(endpoint, success=not endpoint_failed)
+                endpoint = None
             raise e
-        # print("DEBUG response", response)
-        response_dict = response.model_dump()
-        # 提取 token usage 信息
-        usage = response_dict.get("usage", {})
-        return response_dict, usage
+        finally:
+            if limiter:
+                limiter.release()
+            if endpoint:
+                self.endpoint_pool.release(endpoint, success=True)
+        if limiter:
+            limiter.on_success(time.perf_counter() - start_time)
+        return response_dict
     
     def _load_tools_from_yaml(self, yaml_path: str) -> Tuple[List[Dict], Dict[str, Dict[str, Any]]]:
         """
@@ -168,6 +499,8 @@ class BaseEvaluator:
         for tool_cfg in tools_config:
             try:
                 func_name, schema, tool_instance = load_tool_from_config(tool_cfg)
+                if hasattr(tool_instance, "retry_policy"):
+                    tool_instance.retry_policy = self.tool_retry_policy
                 tool_instances[func_name] = {
                     "instance": tool_instance
                 }
@@ -192,7 +525,7 @@ class BaseEvaluator:
         """
         将messages列表转换为完整的上下文字符串
         
-        优先使用 tokenizer.apply_chat_template，如果没有 tokenizer 则使用自定义格式化
+        优先使用 tokenizer.apply_chat_template，如果没有 tokenizer 则使用自定义格式化（见 context_render.render_messages）
         
         Args:
             messages: 消息列表，每个消息包含role和content字段
@@ -200,72 +533,47 @@ class BaseEvaluator:
         Returns:
             str: 完整的对话上下文字符串
         """
-        # 优先使用 transformers 的 apply_chat_template
-        tokenizer_to_use = self.tokenizer
-        if tokenizer_to_use is not None:
-            try:
-                # 处理 reasoning_content，将其合并到 content 中
-                processed_messages = []
-                for message in messages:
-                    processed_message = message.copy()
-                    # if "reasoning_content" in message:
-                    #     reasoning_content = message["reasoning_content"]
-                    #     content = message.get("content", "")
-                    #     processed_message["content"] = f"<think>\n{reasoning_content}\n</think>\n\n{content}"
-                    #     # 移除 reasoning_content 字段，因为 apply_chat_template 不识别它
-                    #     processed_message.pop("reasoning_content", None)
-                    processed_messages.append(processed_message)
-                
-                # 使用 apply_chat_template 转换，不添加生成提示，不进行分词
-                return tokenizer_to_use.apply_chat_template(
-                    processed_messages,
-                    tools=tools, 
-                    add_generation_prompt=False, 
-                    tokenize=False
-                )
-            except Exception as e:
-                print(f"[WARNING] apply_chat_template 失败，使用回退方案: {e}")
-                # 如果失败，继续使用自定义格式化
-        
-        # 回退方案：自定义格式化
-        context_parts = []
-        for message in messages:
-            role = message.get("role", "")
-            content = message.get("content", "")
-            
-            # 处理reasoning_content（如果存在）
-            if "reasoning_content" in message:
-                reasoning_content = message["reasoning_content"]
-                if reasoning_content is not None and reasoning_content.strip() != "":
-                    content = f"<think>\n{reasoning_content}\n</think>\n\n{content}"
-            
-            # 处理工具调用（tool_calls）
-            if role == "assistant" and "tool_calls" in message and message["tool_calls"]:
-                tool_calls_content = ""
-                for tool_call in message["tool_calls"]:
-                    function_name = tool_call.get("function", {}).get("name", "")
-                    arguments = tool_call.get("function", {}).get("arguments", "")
-                    tool_calls_content += f"Function: {function_name}\nArguments: {arguments}\n\n"
-                
-                # 将工具调用内容用<tool_call>包裹
-                if tool_calls_content:
-                    content = f"{content}\n<tool_call>\n{tool_calls_content.strip()}</tool_call>"
-            
-            # 根据角色格式化消息
-            if role == "user":
-                context_parts.append(f"User:\n{content}\n")
-            elif role == "assistant":
-                context_parts.append(f"Assistant:\n{content}\n")
-            elif role == "system":
-                context_parts.append(f"System:\n{content}\n")
-            elif role == "tool":
-                # 工具响应已经用<tool_response>包裹了
-                context_parts.append(f"<tool_response>\n{content}\n</tool_response>\n")
-            else:
-                # 其他角色
-                context_parts.append(f"{role.capitalize()}:\n{content}\n")
-        
-        return "".join(context_parts)
+        return render_messages(messages, tokenizer=self.tokenizer, tools=tools)
+
+    def _render_contexts_sync(self, messages: List[Dict[str, Any]], prompt_length: int, tools: List[Dict]) -> Tuple[Optional[str], str]:
+        """渲染 full_context 与 response_context（精简格式不存储 full_context，无需渲染）"""
+        return render_contexts(
+            messages,
+            prompt_length,
+            tokenizer=self.tokenizer,
+            tools=tools,
+            need_full=self.result_format == "full",
+        )
+
+    async def _run_in_render_executor(self, func: Callable, *args) -> Any:
+        """在渲染线程池中执行 CPU 密集的模板渲染/分词"""
+        if self.render_workers <= 0:
+            return func(*args)
+        if self._render_executor is None:
+            self._render_executor = ThreadPoolExecutor(max_workers=self.render_workers, thread_name_prefix="render")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._render_executor, func, *args)
+
+    async def _render_contexts(self, messages: List[Dict[str, Any]], prompt_length: int, tools: List[Dict]) -> Tuple[Optional[str], str]:
+        """在渲染线程池中渲染上下文"""
+        return await self._run_in_render_executor(self._render_contexts_sync, messages, prompt_length, tools)
+
+    async def _apply_context_budget(self, payload: dict, token_counter: ConversationTokenCounter) -> Tuple[dict, bool]:
+        """
+        请求前检查上下文 token 预算
+
+        Returns:
+            Tuple[dict, bool]: (本次请求使用的 payload, 是否预算耗尽)
+        """
+        prompt_tokens = await self._run_in_render_executor(token_counter.count, payload["messages"])
+        remaining = self.max_context_tokens - prompt_tokens
+        if remaining < self.min_completion_tokens:
+            return payload, True
+        for key in ("max_completion_tokens", "max_tokens"):
+            if payload.get(key) and payload[key] > remaining:
+                # 为 prompt 留出空间，避免服务端因 prompt + max_tokens 超出上下文长度返回 400
+                return {**payload, key: remaining}, False
+        return payload, False
 
     async def _execute_tool_calls(
         self,
@@ -273,56 +581,47 @@ class BaseEvaluator:
         context_instance_id_dict: Optional[Dict[str, str]] = None,
         sample_extra_info: Dict[str, Any] = None,
         tool_instances: Dict[str, Dict[str, Any]] = None,
+        timer: Optional[PhaseTimer] = None,
         ) -> Tuple[str,List[Dict[str, Any]],float,dict,float]:
         """
         执行工具调用，并支持动态传入额外参数。
+
+        同一轮中的多个工具调用并发执行（最多 max_parallel_tool_calls 个），工具响应按 tool_calls 的顺序返回；
+        同名工具共用一个实例，按调用顺序依次执行。并发时 timer 中各工具阶段为所有调用耗时之和。
         Args:
             tool_calls (List[Dict]): 工具调用列表。
             sample_extra_info (Dict[str, Any]): 样本中的额外信息（如 create_kwargs 等）。
+            timer (PhaseTimer): 样本计时器，记录 tool_create/tool_execute/tool_calc_reward 耗时。
         Returns:
             List[Dict[str, Any]]: 工具调用结果。
         """
-        tool_messages = []
         sample_extra_info = sample_extra_info or {}
         tool_instances = tool_instances or getattr(self, 'tool_instances', {})
+        timer = timer or PhaseTimer()
         tool_reward = 0.0
         tool_metrics = {}
         tool_cumulative_reward = 0.0
-        for tool_call in tool_calls:
-            tool_name = tool_call["function"]["name"]
-            arguments = tool_call["function"]["arguments"]
-            if tool_name not in tool_instances:
-                content = f"Error: 工具 '{tool_name}' 未注册。"
-            else:
-                try:
-                    args = json.loads(arguments)
-                    # 获取工具实例及其额外参数
-                    tool_instance = tool_instances[tool_name]["instance"]
+        if self.max_parallel_tool_calls <= 1 or len(tool_calls) <= 1:
+            outcomes = [
+                await self._execute_tool_call(tool_call, context_instance_id_dict, sample_extra_info, tool_instances, timer)
+                for tool_call in tool_calls
+            ]
+        else:
+            # 同名工具的调用作用于同一实例，用锁保证按顺序执行；不同工具的调用并发执行
+            tool_locks = {tool_call["function"]["name"]: asyncio.Lock() for tool_call in tool_calls}
+            semaphore = asyncio.Semaphore(self.max_parallel_tool_calls)
 
-                    # 动态更新 create_kwargs
-                    if "tools_kwargs" in sample_extra_info and tool_name in sample_extra_info["tools_kwargs"]:
-                        create_kwargs = sample_extra_info["tools_kwargs"][tool_name].get("create_kwargs", {})
-                    else:
-                        create_kwargs = {}
+            async def _run(tool_call: Dict):
+                async with tool_locks[tool_call["function"]["name"]]:
+                    async with semaphore:
+                        return await self._execute_tool_call(tool_call, context_instance_id_dict, sample_extra_info, tool_instances, timer)
 
-                    # 调用工具的 create 和 execute 方法
-                    create_result = await tool_instance.create(context_instance_id_dict[tool_name], **create_kwargs)
-                    # 兼容返回一个值或两个值的情况
-                    if isinstance(create_result, tuple):
-                        current_instance_id, current_tool_create_response = create_result
-                    else:
-                        current_instance_id = create_result
-                        current_tool_create_response = None
-                    context_instance_id_dict[tool_name] = current_instance_id
-                    tool_result = await tool_instance.execute(current_instance_id, args)
-                    # 计算工具累计奖励
-                    tool_cumulative_reward = await tool_instance.calc_reward(current_instance_id)
-                    tool_response, tool_reward, tool_metrics = tool_result
-                    content = str(tool_response)
-                except Exception as e:
-                    # import traceback
-                    # traceback.print_exc()
-                    content = f"Error calling {tool_name}: {str(e)}"
+            outcomes = await asyncio.gather(*(_run(tool_call) for tool_call in tool_calls))
+        tool_messages = []
+        for tool_call, (content, tool_result) in zip(tool_calls, outcomes):
+            if tool_result is not None:
+                # 与顺序执行一致：奖励与指标取最后一个成功执行的工具调用
+                tool_reward, tool_metrics, tool_cumulative_reward = tool_result
             tool_messages.append({
                 "role": "tool",
                 "content": content,
@@ -330,11 +629,103 @@ class BaseEvaluator:
             })
         return context_instance_id_dict,tool_messages,tool_reward,tool_metrics,tool_cumulative_reward
 
+    async def _execute_tool_call(
+        self,
+        tool_call: Dict,
+        context_instance_id_dict: Dict[str, str],
+        sample_extra_info: Dict[str, Any],
+        tool_instances: Dict[str, Dict[str, Any]],
+        timer: PhaseTimer,
+        ) -> Tuple[str, Optional[Tuple[float, dict, float]]]:
+        """
+        执行单个工具调用
+
+        Returns:
+            Tuple[str, Optional[Tuple[float, dict, float]]]: (工具响应内容, (tool_reward, tool_metrics, tool_cumulative_reward))，
+            调用失败时后者为 None
+        """
+        tool_name = tool_call["function"]["name"]
+        arguments = tool_call["function"]["arguments"]
+        if tool_name not in tool_instances:
+            return f"Error: 工具 '{tool_name}' 未注册。", None
+        try:
+            args = json.loads(arguments)
+            # 获取工具实例
+            tool_instance = tool_instances[tool_name]["instance"]
+
+            # 每个样本的每个工具只创建一次实例，之后的调用复用
+            tool_start = time.perf_counter()
+            current_instance_id = context_instance_id_dict.get(tool_name)
+            if current_instance_id is None:
+                current_instance_id = await self._create_tool_instance(tool_name, context_instance_id_dict, sample_extra_info, tool_instances, timer)
+            with timer.span("tool_execute"):
+                tool_result = await tool_instance.execute(current_instance_id, args)
+            # 计算工具累计奖励
+            with timer.span("tool_calc_reward"):
+                tool_cumulative_reward = await tool_instance.calc_reward(current_instance_id)
+            tool_response, tool_reward, tool_metrics = tool_result
+            self.metrics.record_tool_latency(tool_name, time.perf_counter() - tool_start)
+            return str(tool_response), (tool_reward, tool_metrics, tool_cumulative_reward)
+        except Exception as e:
+            # import traceback
+            # traceback.print_exc()
+            return f"Error calling {tool_name}: {str(e)}", None
+
+    async def _create_tool_instance(
+        self,
+        tool_name: str,
+        context_instance_id_dict: Dict[str, str],
+        sample_extra_info: Dict[str, Any],
+        tool_instances: Dict[str, Dict[str, Any]],
+        timer: PhaseTimer,
+        ) -> str:
+        """为样本创建工具实例，实例 id 记录到 context_instance_id_dict"""
+        tool_instance = tool_instances[tool_name]["instance"]
+        # 动态更新 create_kwargs
+        if "tools_kwargs" in sample_extra_info and tool_name in sample_extra_info["tools_kwargs"]:
+            create_kwargs = sample_extra_info["tools_kwargs"][tool_name].get("create_kwargs", {})
+        else:
+            create_kwargs = {}
+        with timer.span("tool_create"):
+            create_result = await tool_instance.create(context_instance_id_dict.get(tool_name), **create_kwargs)
+        # 兼容返回一个值或两个值的情况
+        if isinstance(create_result, tuple):
+            current_instance_id, current_tool_create_response = create_result
+        else:
+            current_instance_id = create_result
+            current_tool_create_response = None
+        context_instance_id_dict[tool_name] = current_instance_id
+        return current_instance_id
+
+    async def _create_tool_instances(
+        self,
+        tool_names: Iterable[str],
+        context_instance_id_dict: Dict[str, str],
+        sample_extra_info: Dict[str, Any],
+        tool_instances: Dict[str, Dict[str, Any]],
+        timer: PhaseTimer,
+        ) -> None:
+        """样本开始时并发创建所需工具的实例（eager_tool_create）；创建失败的工具在首次调用时再创建"""
+        tool_names = [tool_name for tool_name in tool_names if tool_name in tool_instances and context_instance_id_dict.get(tool_name) is None]
+        results = await asyncio.gather(
+            *(self._create_tool_instance(tool_name, context_instance_id_dict, sample_extra_info, tool_instances, timer) for tool_name in tool_names),
+            return_exceptions=True,
+        )
+        for tool_name, result in zip(tool_names, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ 创建工具实例失败 ({tool_name})，将在首次调用时重试: {result}")
+
     async def _evaluate_one(
         self,
         input_data: dict,
         ) -> dict:
         
+        # 分阶段计时，结果写入 timing 字段
+        timer = PhaseTimer()
+        # 样本时间预算，流式请求到期时会提前停止
+        deadline = time.monotonic() + self.sample_time_budget if self.sample_time_budget else None
+        current_sample_deadline.set(deadline)
+        time_budget_exhausted = False
         data_source = input_data.get("data_source", None)
         
         
@@ -401,6 +792,10 @@ class BaseEvaluator:
         })
         # print("DEBUG payload", payload)
         all_payloads = [payload]
+        token_counter = ConversationTokenCounter(self.tokenizer, needed_tools) if self.max_context_tokens else None
+        context_exhausted = False
+        # 由响应缓存返回的 API 调用次数
+        cached_api_calls = 0
         try:
             turn_record = {}
             context_instance_id_dict = {}
@@ -411,11 +806,16 @@ class BaseEvaluator:
             if tool_instances:
                 for tool_name in tool_instances:
                     context_instance_id_dict[tool_name] = None
+                if self.eager_tool_create:
+                    # 样本开始时一次性创建所需工具的实例（未指定 tools_kwargs 时为全部工具）
+                    needed_tool_names = [tool["function"]["name"] for tool in needed_tools] or list(tool_instances)
+                    await self._create_tool_instances(needed_tool_names, context_instance_id_dict, extra_info, tool_instances, timer)
             if interaction_instance:
-                if "interaction_kwargs" in input_data["extra_info"]:
-                    interaction_instance_id = await interaction_instance.start_interaction(identity=input_data["extra_info"]["interaction_kwargs"]["identity"])
-                else:
-                     interaction_instance_id = await interaction_instance.start_interaction()
+                with timer.span("interaction"):
+                    if "interaction_kwargs" in input_data["extra_info"]:
+                        interaction_instance_id = await interaction_instance.start_interaction(identity=input_data["extra_info"]["interaction_kwargs"]["identity"])
+                    else:
+                        interaction_instance_id = await interaction_instance.start_interaction()
             else:
                 interaction_instance_id = None
             # 循环控制逻辑：基于assistant和user轮次
@@ -429,7 +829,26 @@ class BaseEvaluator:
                 current_tool_calls_executed = 0
                 while self.max_user_turns is None or user_turn_count < self.max_user_turns:
                     # print("DEBUG payload", payload)
-                    raw_response, usage = await self._call_api(payload)
+                    if token_counter is not None:
+                        payload, context_exhausted = await self._apply_context_budget(payload, token_counter)
+                        if context_exhausted:
+                            self.metrics.inc("context_exhausted")
+                            break
+                    api_start = time.perf_counter()
+                    self.metrics.api_started()
+                    try:
+                        with timer.span("api_wait"):
+                            raw_response, usage = await self._call_api(payload)
+                    except Exception:
+                        self.metrics.api_finished(time.perf_counter() - api_start)
+                        raise
+                    cached = raw_response.pop("cached", False)
+                    cached_api_calls += cached
+                    self.metrics.api_finished(time.perf_counter() - api_start, usage, cached=cached)
+                    stream_stats = raw_response.get("stream_stats")
+                    if stream_stats and stream_stats.get("ttft") is not None:
+                        timer.add("ttft", stream_stats["ttft"])
+                        self.metrics.record_stream(stream_stats["ttft"], stream_stats.get("inter_token_latency"))
                     if prompt_tokens == None:
                         prompt_tokens = usage.get("prompt_tokens", 0)
 
@@ -456,6 +875,8 @@ class BaseEvaluator:
                     #     return message
                     
                     messages.append(message)  
+                    if token_counter is not None:
+                        token_counter.observe_usage(usage, len(messages))
                     tool_calls = message.get("tool_calls", [])
                     
                     # 记录assistant轮次（每次调用API都算作一次assistant轮次）
@@ -468,6 +889,12 @@ class BaseEvaluator:
                     }
                     if self.max_assistant_turns is not None and assistant_turn_count >= self.max_assistant_turns:
                         break
+                    # 时间预算耗尽：本轮输出可能不完整，不再执行工具
+                    if raw_response["choices"][0].get("finish_reason") == FINISH_REASON_TIME_BUDGET or (
+                        deadline is not None and time.monotonic() >= deadline
+                    ):
+                        time_budget_exhausted = True
+                        break
                     
                     if not tool_calls:
                         # 如果assistant没有工具调用，当轮interaction结束
@@ -477,7 +904,7 @@ class BaseEvaluator:
                         current_tool_calls_executed += len(tool_calls)
                     # 提取样本中的额外信息
                     sample_extra_info = input_data.get("extra_info", {})
-                    context_instance_id_dict,tool_messages,tool_reward,tool_metrics,tool_cumulative_reward = await self._execute_tool_calls(tool_calls, context_instance_id_dict, sample_extra_info, tool_instances)
+                    context_instance_id_dict,tool_messages,tool_reward,tool_metrics,tool_cumulative_reward = await self._execute_tool_calls(tool_calls, context_instance_id_dict, sample_extra_info, tool_instances, timer=timer)
                     
                     messages.extend(tool_messages)
                     user_turn_count += len(tool_messages)
@@ -489,13 +916,20 @@ class BaseEvaluator:
                     all_payloads.append(payload)
                 
                 # 记录当前轮次的统计信息
-                turn_record[f"interaction_turn_{interaction_turn}"]["tool_calls_executed"] = current_tool_calls_executed
+                if f"interaction_turn_{interaction_turn}" in turn_record:
+                    turn_record[f"interaction_turn_{interaction_turn}"]["tool_calls_executed"] = current_tool_calls_executed
+                if context_exhausted:
+                    break
                 if self.max_assistant_turns is not None and assistant_turn_count >= self.max_assistant_turns:
                     break
+                if time_budget_exhausted or (deadline is not None and time.monotonic() >= deadline):
+                    time_budget_exhausted = True
+                    break
 
                 # User响应轮次（通过interaction_instance）
                 if interaction_instance:
-                    should_terminate_sequence, response_content, current_turn_score, additional_data = await interaction_instance.generate_response(interaction_instance_id, messages)
+                    with timer.span("interaction"):
+                        should_terminate_sequence, response_content, current_turn_score, additional_data = await interaction_instance.generate_response(interaction_instance_id, messages)
                     if should_terminate_sequence:
                         break
                     else:
@@ -514,18 +948,18 @@ class BaseEvaluator:
             for tool_name,instance_id in context_instance_id_dict.items():
                 if instance_id:
                     tool_instance = tool_instances[tool_name]["instance"]
-                    await tool_instance.release(instance_id)
+                    with timer.span("tool_release"):
+                        await tool_instance.release(instance_id)
 
             
             # 将整个消息上下文转换为字符串用于extract_output
-            full_context = self._messages_to_context(messages,tools=needed_tools)
-            if "prompt" in input_data:
-                response_context = self._messages_to_context(messages[len(input_data["prompt"]):])
-            elif "messages" in input_data:
-                response_context = self._messages_to_context(messages[len(input_data["messages"]):])
+            with timer.span("render"):
+                prompt_length = len(input_data["prompt"]) if "prompt" in input_data else len(input_data["messages"])
+                full_context, response_context = await self._render_contexts(messages, prompt_length, needed_tools)
             # print("DEBUG full_context", full_context)
-            score = reward_calculator.verify_score(model_output=response_context, identity=input_data["reward_model"]["ground_truth"], **self.verify_correction_kwargs) if reward_calculator else None
-            extracted_output = reward_calculator.extract_output(response_context)
+            with timer.span("scoring"):
+                score = reward_calculator.verify_score(model_output=response_context, identity=input_data["reward_model"]["ground_truth"], **self.verify_correction_kwargs) if reward_calculator else None
+                extracted_output = reward_calculator.extract_output(response_context)
             # has reached_max_turns?
             reached_max_turns = (
                 (self.max_assistant_turns is not None and assistant_turn_count >= self.max_assistant_turns) or
@@ -540,6 +974,9 @@ class BaseEvaluator:
                 "ground_truth": input_data["reward_model"]["ground_truth"],
                 "score": score,
                 "reached_max_turns": reached_max_turns,
+                "time_budget_exhausted": time_budget_exhausted,
+                "context_exhausted": context_exhausted,
+                "cached_api_calls": cached_api_calls,
                 "turn_record": turn_record,
                 "success": True,
                 "full_context": full_context,
@@ -551,6 +988,7 @@ class BaseEvaluator:
                     "completion_tokens": total_completion_tokens,
                     "total_tokens": total_tokens,
                 },
+                "timing": timer.as_dict(),
                 "evaluation_config": {
                     "model": self.api_model,
                     "api_extra_params": self.api_extra_params,
@@ -570,6 +1008,7 @@ class BaseEvaluator:
                 "score": 0,
                 "error": str(e),
                 "reached_max_turns": False,
+                "cached_api_calls": cached_api_calls,
                 "turn_record": turn_record,
                 "success": False,
                 "prompt_tokens": prompt_tokens,
@@ -579,6 +1018,7 @@ class BaseEvaluator:
                     "completion_tokens": total_completion_tokens if 'total_completion_tokens' in locals() else 0,
                     "total_tokens": total_tokens if 'total_tokens' in locals() else 0
                 },
+                "timing": timer.as_dict(),
                 "evaluation_config": {
                     "model": self.api_model,
                     "api_extra_params": self.api_extra_params,
@@ -590,55 +1030,127 @@ class BaseEvaluator:
 
     async def _evaluate_batch(
         self,
-        input_list: List[dict],
+        input_list: Iterable[dict],
         max_concurrent: int = 1,
-        output_path: Optional[str] = None  # 新增参数
+        output_path: Optional[str] = None,  # 新增参数
+        total: Optional[int] = None,
+        return_results: bool = True,
+        completed_keys: Optional[set] = None,
+        stats_accumulator: Optional[EvaluationStatsAccumulator] = None,
         ) -> List[dict]:
-        results = []
-        
-        # 创建信号量控制并发数
-        semaphore = asyncio.Semaphore(max_concurrent)
-        results = [None] * len(input_list)
+        """
+        并发评测一批样本。
 
+        采用生产者/消费者模型：生产者从 input_list（列表或 iter_dataset 返回的迭代器）中
+        读取样本放入有界队列，max_concurrent 个常驻消费者从队列中取样本评测。
+        内存占用只与 max_concurrent 相关，与数据集大小无关。
 
-        # 创建进度条和锁
+        Args:
+            input_list: 样本列表或迭代器
+            max_concurrent: 消费者数量（最大并发数）
+            output_path: 结果写入路径（JSONL），由 AsyncResultWriter 批量追加写入
+            total: 样本总数（仅用于进度条，未知时为 None）
+            return_results: 是否在内存中保留并返回全部结果；为 False 时结果写盘后即丢弃，返回空列表
+            completed_keys: 断点重试时已完成样本的键集合，命中的样本直接跳过
+            stats_accumulator: 报告统计累加器，每条结果写入后更新
+        """
+        if total is None and hasattr(input_list, "__len__"):
+            total = len(input_list)
+        max_concurrent = max(1, max_concurrent)
+        results = {}
+
+        # 创建进度条
         progress_bar = tqdm(
-            total=len(input_list), 
+            total=total, 
             desc="Evaling...",
             colour="cyan",
             dynamic_ncols=True,  # 允许动态调整宽度
             unit_scale=False
         )
-        progress_lock = asyncio.Lock()
-        file_write_lock = asyncio.Lock()
-
-        async def worker(idx, input_data):
-            async with semaphore:
-                result = await self._evaluate_one(input_data)
-                results[idx] = result
-                if output_path:
-                    async with file_write_lock:
-                        with open(output_path, "a", encoding="utf-8") as f:
-                            try:
-                                f.write(json.dumps(result, ensure_ascii=False) + "\n")
-                            except Exception as e:
-                                print(f"❌ 写入结果失败: {e}")
-                                print(f"❌ 写入结果: {result}")
-                
+
+        # 有界队列：生产者最多领先消费者 max_concurrent 个样本
+        input_queue = asyncio.Queue(maxsize=max_concurrent)
+
+        async def producer():
+            for idx, input_data in enumerate(input_list):
+                sample_key = compute_sample_key(input_data, self.resume_key_field)
+                if completed_keys and sample_key in completed_keys:
+                    continue
+                await input_queue.put((idx, sample_key, input_data))
+            # 每个消费者一个结束标记；只在正常结束时放入（此时消费者仍在取数据），
+            # 生产者出错或被取消时由下方的 finally 取消全部任务，不能在已满的队列上等待
+            for _ in range(max_concurrent):
+                await input_queue.put(None)
+
+        async def consumer():
+            while True:
+                item = await input_queue.get()
+                if item is None:
+                    break
+                idx, sample_key, input_data = item
+                result = None
+                self.metrics.sample_started()
+                # 同一样本的多轮 API 请求路由到同一端点
+                routing_token = current_routing_key.set(sample_key)
+                try:
+                    result = await self._evaluate_one(input_data)
+                finally:
+                    current_routing_key.reset(routing_token)
+                    if self.endpoint_pool:
+                        self.endpoint_pool.forget(sample_key)
+                    self.metrics.sample_finished(result)
+                if isinstance(result, dict):
+                    result["sample_key"] = sample_key
+                    if self.result_format == "compact":
+                        result = compact_result(result)
+                if result_writer:
+                    await result_writer.write(result)
+                if stats_accumulator is not None:
+                    stats_accumulator.update(result)
+                if return_results:
+                    results[idx] = result
                 # 任务完成时立即更新进度条
-                async with progress_lock:
-                    progress_bar.update(1)
+                progress_bar.update(1)
 
-        # 创建所有任务
-        tasks = [worker(idx, input_data) for idx, input_data in enumerate(input_list)]
-        
-        # 等待所有任务完成
-        await asyncio.gather(*tasks)
-        
-        # 关闭进度条
-        progress_bar.close()
+        # 单一写入任务负责结果落盘，消费者只需把结果放入写入队列
+        result_writer = None
+        if output_path:
+            result_writer = AsyncResultWriter(
+                output_path,
+                flush_lines=self.result_flush_lines,
+                flush_interval=self.result_flush_interval,
+                fsync_interval=self.result_fsync_interval,
+                index_path=index_path_for(output_path),
+                stats_path=stats_path_for(output_path),
+            )
+            await result_writer.start()
+
+        producer_task = asyncio.create_task(producer())
+        consumers = [asyncio.create_task(consumer()) for _ in range(max_concurrent)]
+        try:
+            await asyncio.gather(producer_task, *consumers)
+        finally:
+            tasks = [producer_task, *consumers]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if result_writer:
+                await result_writer.close()
+            # 关闭进度条
+            progress_bar.close()
         
-        return results
+        return [results[idx] for idx in sorted(results)]
+
+    def _result_suffix(self) -> str:
+        """新结果文件在 .jsonl 之后的压缩后缀"""
+        return ZSTD_SUFFIX if self.result_compression == "zstd" else ""
+
+    @staticmethod
+    def _iter_result_file(result_path: str) -> Iterator[dict]:
+        """逐行流式读取结果文件"""
+        if not result_path or not os.path.exists(result_path):
+            return
+        yield from iter_results(result_path)
 
     def _load_bootcamp_registry(self, bootcamp_registry: str):
         with jsonlines.open(bootcamp_registry) as reader:
@@ -672,7 +1184,10 @@ class BaseEvaluator:
         yaml_interaction_path: Optional[str] = None,
         max_concurrent: int = 1,
         bootcamp_registry: Optional[str] = None,
-        resume_from_result_path: Optional[str] = None
+        resume_from_result_path: Optional[str] = None,
+        stream_dataset: bool = False,
+        return_results: bool = True,
+        report_interval: Optional[float] = None,
         ) -> List[dict]:
         """
         启动完整评测流程
@@ -683,6 +1198,9 @@ class BaseEvaluator:
         - tool_registry: 自定义工具注册表（可选）
         - output_dir: 结果保存路径（JSONL）
         - yaml_tool_path: 工具 YAML 配置路径（如果传入，会覆盖当前 tools）
+        - stream_dataset: 流式读取 dataset_path，不把整个数据集加载到内存
+        - return_results: 是否在内存中保留并返回全部结果；为 False 时返回空列表
+        - report_interval: 评测过程中每隔多少秒刷新一次 CSV 报告，None 表示只在结束时生成
         """
         # 加载工具配置（可选）
         if yaml_tool_path:
@@ -696,95 +1214,168 @@ class BaseEvaluator:
         if bootcamp_registry:
             self._load_bootcamp_registry(bootcamp_registry)
         # 加载数据集
+        dataset_size = None
         if dataset_path and not dataset:
-            dataset = load_dataset(dataset_path)
+            if stream_dataset:
+                dataset = iter_dataset(dataset_path)
+                dataset_size = count_dataset(dataset_path)
+            else:
+                dataset = load_dataset(dataset_path)
 
         if not dataset:
             raise ValueError("必须提供 dataset 或 dataset_path")
 
-        # 断点重试逻辑
-        completed_inputs = set()
-        original_dataset_size = len(dataset)
+        # 断点重试逻辑：通过样本键索引跳过已完成的样本
+        completed_keys = set()
+        # 报告统计随结果写入在线累加，结束时无需重新读取结果文件
+        stats_accumulator = EvaluationStatsAccumulator()
+        if dataset_size is None and hasattr(dataset, "__len__"):
+            dataset_size = len(dataset)
         
         if resume_from_result_path and os.path.exists(resume_from_result_path):
             print(f"🔄 检测到断点重试模式，正在从 {resume_from_result_path} 加载已完成的结果...")
             try:
-                with open(resume_from_result_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            result = json.loads(line.strip())
-                            if result.get("input"):
-                                # 将input转换为字符串作为唯一标识
-                                input_key = json.dumps(result["input"], sort_keys=True, ensure_ascii=False)
-                                completed_inputs.add(input_key)
-                print(f"📊 已完成 {len(completed_inputs)} 个样本，剩余 {original_dataset_size - len(completed_inputs)} 个样本需要评测")
-                # 过滤已完成的样本
-                filtered_dataset = []
-                for item in dataset:
-                    item_key = json.dumps(item, sort_keys=True, ensure_ascii=False)
-                    if item_key not in completed_inputs:
-                        filtered_dataset.append(item)
-                dataset = filtered_dataset
+                completed_keys, indexed_count = load_completed_index(resume_from_result_path, self.resume_key_field)
+                for record in iter_stat_records(resume_from_result_path):
+                    stats_accumulator.update(record)
+                # 按记录数比较：重复样本在索引与统计旁路文件中各占一行，键集合会去重
+                if stats_accumulator.sample_count != indexed_count:
+                    # 统计旁路文件与索引不一致（如结果文件被手动截断），从结果文件重建
+                    print("⚠️ 统计旁路文件与结果文件不一致，正在从结果文件重建...")
+                    os.remove(stats_path_for(resume_from_result_path))
+                    stats_accumulator = EvaluationStatsAccumulator()
+                    for record in iter_stat_records(resume_from_result_path):
+                        stats_accumulator.update(record)
+                if dataset_size is not None:
+                    print(f"📊 已完成 {len(completed_keys)} 个样本，剩余约 {max(dataset_size - len(completed_keys), 0)} 个样本需要评测")
+                    dataset_size = max(dataset_size - len(completed_keys), 0)
+                else:
+                    print(f"📊 已完成 {len(completed_keys)} 个样本，剩余样本将在读取时过滤")
                 # 使用现有文件路径作为输出路径
                 output_path = resume_from_result_path
             except Exception as e:
                 print(f"⚠️ 读取已完成结果时发生错误: {e}，将重新开始评测")
-                completed_inputs = set()
-                output_path = os.path.join(output_dir, f"{self.api_model.replace('/', '-').strip('-')}/eval_results_{format_time_now()}.jsonl")
+                completed_keys = set()
+                stats_accumulator = EvaluationStatsAccumulator()
+                output_path = os.path.join(output_dir, f"{self.api_model.replace('/', '-').strip('-')}/eval_results_{format_time_now()}.jsonl{self._result_suffix()}")
         else:
             # 正常模式，生成新的输出文件
-            output_path = os.path.join(output_dir, f"{self.api_model.replace('/', '-').strip('-')}/eval_results_{format_time_now()}.jsonl")
+            output_path = os.path.join(output_dir, f"{self.api_model.replace('/', '-').strip('-')}/eval_results_{format_time_now()}.jsonl{self._result_suffix()}")
         
-        print(f"🚀 Starting evaluation with {len(dataset)} samples...")
+        if dataset_size is not None:
+            print(f"🚀 Starting evaluation with {dataset_size} samples...")
+        else:
+            print(f"🚀 Starting evaluation with streaming dataset...")
         
         # 清空或创建输出文件
         if not resume_from_result_path or not os.path.exists(output_path):
             if output_path and os.path.exists(output_path):
                 open(output_path, "w", encoding="utf-8").close()
+                for sidecar_path in (index_path_for(output_path), stats_path_for(output_path)):
+                    if os.path.exists(sidecar_path):
+                        os.remove(sidecar_path)
         
         # Create result file
         if output_path and not os.path.exists(os.path.dirname(output_path)):
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
         print(f"💾 Evaluation results will be saved to: {output_path}")
         
-        if len(dataset) == 0:
+        summary_path = result_file_stem(output_path) + ".csv"
+        basic_info = self._report_basic_info(dataset_path, yaml_tool_path, output_path)
+
+        # 定期任务（报告刷新、指标快照）的退出事件
+        refresh_stop = asyncio.Event()
+
+        async def refresh_report():
+            # 长时间评测期间定期刷新 CSV 报告；通过事件退出，保证不会覆盖最终报告
+            while not refresh_stop.is_set():
+                try:
+                    await asyncio.wait_for(refresh_stop.wait(), report_interval)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    report_data = stats_accumulator.build_report(basic_info)
+                    report_data["retry_stats"] = self._retry_stats()
+                    await asyncio.to_thread(self._save_csv_report, summary_path, report_data)
+                except Exception as e:
+                    print(f"⚠️ 刷新评测报告失败: {e}")
+
+        refresh_task = asyncio.create_task(refresh_report()) if report_interval else None
+
+        # 按并发数配置 HTTP 连接池
+        await self._open_clients(max_concurrent)
+
+        # 运行时指标
+        self.metrics.reset()
+        self.api_retry_policy.reset()
+        self.tool_retry_policy.reset()
+        if self.response_cache:
+            self.response_cache.reset_stats()
+        if self.adaptive_concurrency:
+            self.api_limiter = AdaptiveConcurrencyLimiter(
+                min_limit=self.adaptive_min_concurrency,
+                max_limit=self.adaptive_max_concurrency or max_concurrent,
+                metrics=self.metrics,
+            )
+            print(f"🎚️ 自适应并发已启用: API 并发上限范围 [{self.api_limiter.min_limit}, {self.api_limiter.max_limit}]")
+        metrics_server = None
+        collector_task = None
+        if self.metrics_port:
+            # 采集函数读取事件循环持有的连接池等状态，在事件循环中定期采集，HTTP 线程只读取采集结果
+            collector_task = asyncio.create_task(run_metrics_collector(self.metrics, COLLECT_INTERVAL, refresh_stop))
+            metrics_server = start_metrics_server(self.metrics, self.metrics_port, self.metrics_host)
+        metrics_task = None
+        if self.metrics_interval:
+            metrics_path = result_file_stem(output_path) + ".metrics.json"
+            print(f"📈 运行时指标将定期写入: {metrics_path}")
+            metrics_task = asyncio.create_task(
+                run_snapshot_writer(self.metrics, metrics_path, self.metrics_interval, refresh_stop)
+            )
+        try:
+            results = await self._evaluate_batch(
+                dataset,
+                max_concurrent=max_concurrent,
+                output_path=output_path,
+                total=dataset_size,
+                return_results=return_results,
+                completed_keys=completed_keys,
+                stats_accumulator=stats_accumulator,
+            )
+        finally:
+            refresh_stop.set()
+            if refresh_task:
+                await refresh_task
+            if metrics_task:
+                await metrics_task
+            if collector_task:
+                await collector_task
+            if metrics_server:
+                metrics_server.shutdown()
+                metrics_server.server_close()
+            if self.api_limiter:
+                print(f"🎚️ 评测结束时的 API 并发上限: {int(self.api_limiter.limit)}")
+                self.api_limiter = None
+            await self._close_clients()
+            # 工具调用（BaseMCPTool）共用的 aiohttp 连接池
+            await close_shared_aiohttp_sessions()
+            if self.response_cache:
+                print(f"🗄️ 响应缓存 {self.response_cache.path}: 命中 {self.response_cache.hits} 次，未命中 {self.response_cache.misses} 次")
+                self.response_cache.close()
+            if self.endpoint_pool:
+                for endpoint_stats in self.endpoint_pool.stats():
+                    print(f"🌐 端点 {endpoint_stats['url']}: 请求 {endpoint_stats['total_requests']} 次，失败 {endpoint_stats['total_failures']} 次")
+        if completed_keys and dataset_size == 0:
             print("✅ 所有样本已完成评测!")
-            # 加载完整结果用于报告生成
-            results = []
-            if os.path.exists(output_path):
-                with open(output_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            results.append(json.loads(line.strip()))
-        else:
-            results = await self._evaluate_batch(dataset, max_concurrent=max_concurrent, output_path=output_path)
-        summary_path = output_path.replace(".jsonl", ".csv")
         
-        # 如果是断点重试模式，确保加载所有结果用于统计
-        if resume_from_result_path and len(completed_inputs) > 0:
-            # 重新加载完整结果
-            all_results = []
-            if os.path.exists(output_path):
-                with open(output_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip():
-                            all_results.append(json.loads(line.strip()))
-            results = all_results
+        # 如果是断点重试模式，返回值包含之前已完成的结果
+        if return_results and len(completed_keys) > 0:
+            results = list(self._iter_result_file(output_path))
         
         # Save evaluation report, record accuracy, evaluation set, evaluation parameters, etc.
-        # Calculate accuracy
-        total = len(results)
-        score_sum = sum(
-            r.get("score", 0)
-            for r in results
-            if r.get("success") and isinstance(r.get("score"), (int, float))
-        )
-        avg_score = score_sum / total if total > 0 else 0
-
         # Generate detailed evaluation report
-        report_data = self._generate_evaluation_report(
-            results, dataset_path, yaml_tool_path, output_path, avg_score, total
-        )
+        report_data = stats_accumulator.build_report(basic_info)
+        report_data["retry_stats"] = self._retry_stats()
         
         # Save CSV report
         self._save_csv_report(summary_path, report_data)
@@ -794,526 +1385,70 @@ class BaseEvaluator:
 
         return results
 
+    def _retry_stats(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """本次评测中模型请求与工具调用按错误类型统计的错误数与重试数"""
+        return {
+            "api": self.api_retry_policy.snapshot(),
+            "tool": self.tool_retry_policy.snapshot(),
+        }
+
+    def _report_basic_info(self, dataset_path: Optional[str], yaml_tool_path: Optional[str], output_path: str) -> dict:
+        """评测报告中的基础信息"""
+        return {
+            "model": getattr(self, "api_model", "Unknown"),
+            "dataset_path": dataset_path if dataset_path else "Passed-in dataset",
+            "tool_config": yaml_tool_path if yaml_tool_path else "Default",
+            "output_path": output_path,
+            "max_assistant_turns": self.max_assistant_turns,
+            "max_user_turns": self.max_user_turns,
+            "api_extra_params": getattr(self, "api_extra_params", {}),
+            "api_extra_headers": getattr(self, "api_extra_headers", {}),
+        }
+
     def _generate_evaluation_report(
         self, 
-        results: List[dict], 
+        results: Iterable[dict], 
         dataset_path: Optional[str], 
         yaml_tool_path: Optional[str], 
         output_path: str, 
-        avg_score: float, 
-        total: int
+        avg_score: Optional[float] = None, 
+        total: Optional[int] = None
     ) -> dict:
         """
         Generate detailed evaluation report data
+
+        results is consumed in a single pass, so it may be a generator over the result file.
+        avg_score and total are computed from results when not provided.
         
         Returns:
             dict: Dictionary containing all report data
         """
-        # Basic statistics
-        success_count = sum(1 for r in results if r.get("success"))
-        error_count = total - success_count
-        
-        # Group statistics by data_source (one-to-many relationship: one data_source corresponds to multiple generators)
-        data_source_stats = {}
-        
-        # Detailed failure analysis
-        error_analysis = {"errors": [], "error_types": {}}
-        
+        accumulator = EvaluationStatsAccumulator()
         for r in results:
-            # Get data_source and generator_name
-            data_source = r.get("input", {}).get("data_source", "Unknown")
-            generator_name = r.get("input", {}).get("extra_info", {}).get("generator_name", "")
-            
-            # Initialize data_source statistics
-            if data_source not in data_source_stats:
-                data_source_stats[data_source] = {
-                    "total_count": 0,
-                    "success_count": 0, 
-                    "error_count": 0,
-                    "total_score": 0,
-                    "avg_score": 0,
-                    "max_score": float('-inf'),  # 最高分数
-                    "min_score": float('inf'),   # 最低分数
-                    "total_assistant_turns": 0,  # 总assistant轮数
-                    "avg_assistant_turns": 0,    # 平均assistant轮数
-                    "total_tool_calls": 0,       # 总工具调用次数
-                    "avg_tool_calls": 0,         # 平均工具调用次数
-                    "total_interaction_turns": 0,  # 总interaction轮数
-                    "avg_interaction_turns": 0,    # 平均interaction轮数
-                    "total_initial_prompt_tokens": 0,           # 初始 prompt tokens
-                    "avg_initial_prompt_tokens": 0,      # 平均初始 prompt tokens
-                    "total_global_seq_tokens": 0,  # 总 global sequence tokens
-                    "avg_global_seq_tokens": 0,    # 平均 global sequence tokens
-                    "total_cumulative_prompt_tokens": 0,    # 总 combined prompt tokens
-                    "total_completion_tokens": 0,  # 总 completion tokens
-                    "total_tokens": 0,           # 总 tokens
-                    "avg_cumulative_prompt_tokens": 0,      # 平均 prompt tokens
-                    "avg_completion_tokens": 0,  # 平均 completion tokens
-                    "avg_tokens": 0,             # 平均 tokens
-                    "generators": {}  # All generators under this data source
-                }
-            
-            # Initialize generator statistics
-            if generator_name and generator_name not in data_source_stats[data_source]["generators"]:
-                data_source_stats[data_source]["generators"][generator_name] = {
-                    "total_count": 0,
-                    "success_count": 0, 
-                    "error_count": 0,
-                    "total_score": 0,
-                    "avg_score": 0,
-                    "max_score": float('-inf'),  # 最高分数
-                    "min_score": float('inf'),   # 最低分数
-                    "total_assistant_turns": 0,  # 总assistant轮数
-                    "avg_assistant_turns": 0,    # 平均assistant轮数
-                    "total_tool_calls": 0,       # 总工具调用次数
-                    "avg_tool_calls": 0,         # 平均工具调用次数
-                    "total_interaction_turns": 0,  # 总interaction轮数
-                    "avg_interaction_turns": 0,    # 平均interaction轮数
-                    "total_initial_prompt_tokens": 0,           # 初始 prompt tokens
-                    "avg_initial_prompt_tokens": 0,      # 平均初始 prompt tokens
-                    "total_global_seq_tokens": 0,  # 总 global sequence tokens
-                    "avg_global_seq_tokens": 0,    # 平均 global sequence tokens
-                    "total_cumulative_prompt_tokens": 0,    # 总 combined prompt tokens
-                    "total_completion_tokens": 0,  # 总 completion tokens
-                    "total_tokens": 0,           # 总 tokens
-                    "avg_cumulative_prompt_tokens": 0,      # 平均 prompt tokens
-                    "avg_completion_tokens": 0,  # 平均 completion tokens
-                    "avg_tokens": 0,             # 平均 tokens
-                }
-            
-            # Update data_source level statistics
-            data_source_stats[data_source]["total_count"] += 1
-            
-            if r.get("success"):
-                data_source_stats[data_source]["success_count"] += 1
-                current_score = r.get("score", 0)
-                if isinstance(current_score, (int, float)):
-                    data_source_stats[data_source]["total_score"] += current_score
-                    # 更新最高分和最低分
-                    data_source_stats[data_source]["max_score"] = max(
-                        data_source_stats[data_source]["max_score"], 
-                        current_score
-                    )
-                    data_source_stats[data_source]["min_score"] = min(
-                        data_source_stats[data_source]["min_score"], 
-                        current_score
-                    )
-                
-                # 计算工具调用统计数据
-                assistant_turns, tool_calls, interaction_turns = self._calculate_tool_statistics(r.get("turn_record", {}))
-                data_source_stats[data_source]["total_assistant_turns"] += assistant_turns
-                data_source_stats[data_source]["total_tool_calls"] += tool_calls
-                data_source_stats[data_source]["total_interaction_turns"] += interaction_turns
-                
-                # sample token usage statistics
-                data_source_stats[data_source]["total_initial_prompt_tokens"] += r.get("prompt_tokens", 0)
-                data_source_stats[data_source]["total_global_seq_tokens"] += r.get("global_seq_tokens", 0)
-
-                # 累计 token usage使用统计
-                token_usage = r.get("token_usage", {})
-                data_source_stats[data_source]["total_global_seq_tokens"] += token_usage.get("global_seq_tokens", 0)
-                data_source_stats[data_source]["total_cumulative_prompt_tokens"] += token_usage.get("prompt_tokens", 0)
-                data_source_stats[data_source]["total_completion_tokens"] += token_usage.get("completion_tokens", 0)
-                data_source_stats[data_source]["total_tokens"] += token_usage.get("total_tokens", 0)
-                
-                # Update generator level statistics
-                if generator_name:
-                    data_source_stats[data_source]["generators"][generator_name]["total_count"] += 1
-                    data_source_stats[data_source]["generators"][generator_name]["success_count"] += 1
-                    if isinstance(current_score, (int, float)):
-                        data_source_stats[data_source]["generators"][generator_name]["total_score"] += current_score
-                        # 更新生成器的最高分和最低分
-                        data_source_stats[data_source]["generators"][generator_name]["max_score"] = max(
-                            data_source_stats[data_source]["generators"][generator_name]["max_score"], 
-                            current_score
-                        )
-                        data_source_stats[data_source]["generators"][generator_name]["min_score"] = min(
-                            data_source_stats[data_source]["generators"][generator_name]["min_score"], 
-                            current_score
-                        )
-                    
-                    # 更新生成器的工具调用统计数据
-                    data_source_stats[data_source]["generators"][generator_name]["total_assistant_turns"] += assistant_turns
-                    data_source_stats[data_source]["generators"][generator_name]["total_tool_calls"] += tool_calls
-                    data_source_stats[data_source]["generators"][generator_name]["total_interaction_turns"] += interaction_turns
-                    # 累计生成器的 token 使用统计
-                    data_source_stats[data_source]["generators"][generator_name]["total_initial_prompt_tokens"] += r.get("prompt_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_global_seq_tokens"] += r.get("global_seq_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_cumulative_prompt_tokens"] += token_usage.get("prompt_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_completion_tokens"] += token_usage.get("completion_tokens", 0)
-                    data_source_stats[data_source]["generators"][generator_name]["total_tokens"] += token_usage.get("total_tokens", 0)
-            else:
-                data_source_stats[data_source]["error_count"] += 1
-                
-                # Update generator level statistics
-                if generator_name:
-                    data_source_stats[data_source]["generators"][generator_name]["total_count"] += 1
-                    data_source_stats[data_source]["generators"][generator_name]["error_count"] += 1
-                
-                # Record error information
-                error_info = {
-                    "data_source": data_source,
-                    "generator_name": generator_name,
-                    "error": r.get("error", "Unknown error"),
-                    "input_id": r.get("input", {}).get("id", "Unknown")
-                }
-                error_analysis["errors"].append(error_info)
-                
-                # 统计错误类型
-                error_type = str(r.get("error", "Unknown error"))[:50]
-                error_analysis["error_types"][error_type] = error_analysis["error_types"].get(error_type, 0) + 1
-        
-        # 计算平均分和平均工具调用统计
-        for data_source, stats in data_source_stats.items():
-            # 计算 data_source 层级平均分
-            if stats["success_count"] > 0:
-                stats["avg_score"] = stats["total_score"] / stats["success_count"]
-                stats["avg_assistant_turns"] = stats["total_assistant_turns"] / stats["success_count"]
-                stats["avg_tool_calls"] = stats["total_tool_calls"] / stats["success_count"]
-                stats["avg_cumulative_prompt_tokens"] = stats["total_cumulative_prompt_tokens"] / stats["success_count"]
-                stats["avg_completion_tokens"] = stats["total_completion_tokens"] / stats["success_count"]
-                stats["avg_tokens"] = stats["total_tokens"] / stats["success_count"]
-                stats["avg_interaction_turns"] = stats["total_interaction_turns"] / stats["success_count"]
-                stats["avg_initial_prompt_tokens"] = stats["total_initial_prompt_tokens"] / stats["success_count"]
-                stats["avg_global_seq_tokens"] = stats["total_global_seq_tokens"] / stats["success_count"]
-            else:
-                # 如果没有成功样本，重置最大最小分数
-                stats["max_score"] = 0
-                stats["min_score"] = 0
-                stats["avg_assistant_turns"] = 0
-                stats["avg_tool_calls"] = 0
-                stats["avg_interaction_turns"] = 0
-                stats["avg_cumulative_prompt_tokens"] = 0
-                stats["avg_completion_tokens"] = 0
-                stats["avg_tokens"] = 0
-                stats["avg_initial_prompt_tokens"] = 0
-                stats["avg_global_seq_tokens"] = 0
-            
-            # 计算各 generator 平均分和平均工具调用统计
-            for generator_name, gen_stats in stats["generators"].items():
-                if gen_stats["success_count"] > 0:
-                    gen_stats["avg_score"] = gen_stats["total_score"] / gen_stats["success_count"]
-                    gen_stats["avg_assistant_turns"] = gen_stats["total_assistant_turns"] / gen_stats["success_count"]
-                    gen_stats["avg_tool_calls"] = gen_stats["total_tool_calls"] / gen_stats["success_count"]
-                    gen_stats["avg_cumulative_prompt_tokens"] = gen_stats["total_cumulative_prompt_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_completion_tokens"] = gen_stats["total_completion_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_tokens"] = gen_stats["total_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_interaction_turns"] = gen_stats["total_interaction_turns"] / gen_stats["success_count"]
-                    gen_stats["avg_initial_prompt_tokens"] = gen_stats["total_initial_prompt_tokens"] / gen_stats["success_count"]
-                    gen_stats["avg_global_seq_tokens"] = gen_stats["total_global_seq_tokens"] / gen_stats["success_count"]
-                else:
-                    gen_stats["max_score"] = 0
-                    gen_stats["min_score"] = 0
-                    gen_stats["avg_assistant_turns"] = 0
-                    gen_stats["avg_tool_calls"] = 0
-                    gen_stats["avg_interaction_turns"] = 0
-                    gen_stats["avg_cumulative_prompt_tokens"] = 0
-                    gen_stats["avg_completion_tokens"] = 0
-                    gen_stats["avg_tokens"] = 0
-                    gen_stats["avg_initial_prompt_tokens"] = 0
-                    gen_stats["avg_global_seq_tokens"] = 0
-        # 汇总报告数据
-        report_data = {
-            "basic_info": {
-                "model": getattr(self, "api_model", "Unknown"),
-                "dataset_path": dataset_path if dataset_path else "Passed-in dataset",
-                "tool_config": yaml_tool_path if yaml_tool_path else "Default",
-                "output_path": output_path,
-                "max_assistant_turns": self.max_assistant_turns,
-                "max_user_turns": self.max_user_turns,
-                "api_extra_params": getattr(self, "api_extra_params", {}),
-                "api_extra_headers": getattr(self, "api_extra_headers", {}),
-            },
-            "overall_stats": {
-                "total_samples": total,
-                "success_count": success_count,
-                "error_count": error_count,
-                "success_rate": success_count / total if total > 0 else 0,
-                "overall_avg_score": avg_score,
-            },
-            "data_source_stats": data_source_stats,
-            "error_analysis": error_analysis
-        }
-        
-        return report_data
+            accumulator.update(r)
+        return accumulator.build_report(
+            self._report_basic_info(dataset_path, yaml_tool_path, output_path),
+            avg_score=avg_score,
+            total=total,
+        )
     
-    def _calculate_tool_statistics(self, turn_record: dict) -> Tuple[int, int]:
+    def _calculate_tool_statistics(self, turn_record: dict) -> Tuple[int, int, int]:
         """
         计算工具相关统计数据
         
-        Args:
-            turn_record: 包含每轮交互记录的字典
-            
         Returns:
-            Tuple[int, int]: (总assistant轮数, 总工具调用次数)
+            Tuple[int, int, int]: (总assistant轮数, 总工具调用次数, 总interaction轮数)
         """
-        total_assistant_turns = 0
-        total_tool_calls = 0
-        total_interaction_turns = 0
-        for turn_key, turn_data in turn_record.items():
-            if turn_key.startswith("interaction_turn_"):
-                total_assistant_turns += turn_data.get("assistant_turns", 0)
-                total_tool_calls += turn_data.get("tool_calls_executed", 0)
-                total_interaction_turns += 1
-        return total_assistant_turns, total_tool_calls, total_interaction_turns
+        return calculate_tool_statistics(turn_record)
 
     def _save_csv_report(self, summary_path: str, report_data: dict) -> None:
         """
         保存结构化的 CSV 评测报告
         """
-        with open(summary_path, "w", encoding="utf-8", newline="") as f:
-            writer = csv.writer(f)
-            
-            # 1. Basic Evaluation Information
-            writer.writerow(["Basic Evaluation Information"])
-            writer.writerow(["Item", "Value"])
-            for key, value in report_data["basic_info"].items():
-                key_en = {
-                    "model": "Evaluation Model",
-                    "dataset_path": "Dataset Path", 
-                    "tool_config": "Tool Configuration",
-                    "output_path": "Output Path",
-                    "max_tool_turns": "Max Tool Turns",
-                    "max_assistant_turns": "Max Assistant Turns",
-                    "max_user_turns": "Max User Turns"
-                }.get(key, key)
-                writer.writerow([key_en, value])
-            
-            writer.writerow([])  # 空行分隔
-            
-            # 2. Overall Statistics
-            writer.writerow(["Overall Statistics"])
-            writer.writerow(["Metric", "Value"])
-            overall = report_data["overall_stats"]
-            writer.writerow(["Total Samples", overall["total_samples"]])
-            writer.writerow(["Successful Samples", overall["success_count"]])
-            writer.writerow(["Failed Samples", overall["error_count"]])
-            writer.writerow(["Success Rate", f"{overall['success_rate']:.2%}"])
-            writer.writerow(["Overall Average Score", f"{overall['overall_avg_score']:.4f}"])
-            
-            writer.writerow([])  # 空行分隔
-            
-            # 3. Data Source Summary Statistics
-            if report_data["data_source_stats"]:
-                writer.writerow(["Data Source Summary Statistics"])
-                writer.writerow(["Data Source", "Total Samples", '',"Success Count", "Failed Count", "Success Rate", 
-                            "Average Score", "Max Score", "Min Score", "Avg Assistant Turns", "Avg Tool Calls", "Avg Interaction Turns", "Avg Initial Prompt Tokens", "Avg Completion Tokens", "Avg Global Sequence Tokens",
-                            "Avg Cumulative Prompt Tokens", "Avg Total Tokens"])
-                
-                for data_source, stats in report_data["data_source_stats"].items():
-                    success_rate = stats["success_count"] / stats["total_count"] if stats["total_count"] > 0 else 0
-                    writer.writerow([
-                        data_source,
-                        stats["total_count"],
-                        '',
-                        stats["success_count"], 
-                        stats["error_count"],
-                        f"{success_rate:.2%}",
-                        f"{stats['avg_score']:.4f}",
-                        f"{stats['max_score']:.4f}",
-                        f"{stats['min_score']:.4f}",
-                        f"{stats['avg_assistant_turns']:.2f}",
-                        f"{stats['avg_tool_calls']:.2f}",
-                        f"{stats['avg_interaction_turns']:.2f}",
-                        f"{stats['avg_initial_prompt_tokens']:.2f}",
-                        f"{stats['avg_completion_tokens']:.2f}",
-                        f"{stats['avg_global_seq_tokens']:.2f}",
-                        f"{stats['avg_cumulative_prompt_tokens']:.2f}",
-                        f"{stats['avg_tokens']:.2f}",
-                    ])
-                
-                writer.writerow([])  # 空行分隔
-                
-                # 4. Generator Detailed Statistics (Flattened Table)
-                writer.writerow(["Generator Detailed Statistics"])
-                writer.writerow(["Data Source", "Generator Name", "Sample Count", "Success Count", "Failed Count", 
-                            "Success Rate", "Average Score", "Max Score", "Min Score", "Avg Assistant Turns", "Avg Tool Calls", "Avg Interaction Turns",
-                            "Avg Initial Prompt Tokens", "Avg Completion Tokens", "Avg Cumulative Prompt Tokens","Avg Global Sequence Tokens",
-                            "Avg Total Tokens"])
-                
-                for data_source, stats in report_data["data_source_stats"].items():
-                    if stats["generators"]:
-                        # 按generator_name字典序排序Generator
-                        sorted_generators = sorted(stats["generators"].items(), key=lambda x: x[0])
-                        for generator_name, gen_stats in sorted_generators:
-                            gen_success_rate = gen_stats["success_count"] / gen_stats["total_count"] if gen_stats["total_count"] > 0 else 0
-                            writer.writerow([
-                                data_source,
-                                generator_name,
-                                gen_stats["total_count"],
-                                gen_stats["success_count"],
-                                gen_stats["error_count"],
-                                f"{gen_success_rate:.2%}",
-                                f"{gen_stats['avg_score']:.4f}",
-                                f"{gen_stats['max_score']:.4f}",
-                                f"{gen_stats['min_score']:.4f}",
-                                f"{gen_stats['avg_assistant_turns']:.2f}",
-                                f"{gen_stats['avg_tool_calls']:.2f}",
-                                f"{gen_stats['avg_interaction_turns']:.2f}",
-                                f"{gen_stats['avg_initial_prompt_tokens']:.2f}",
-                                f"{gen_stats['avg_completion_tokens']:.2f}",
-                                f"{gen_stats['avg_global_seq_tokens']:.2f}",
-                                f"{gen_stats['avg_cumulative_prompt_tokens']:.2f}",
-                                f"{gen_stats['avg_tokens']:.2f}",
-                            ])
-                    else:
-                        # 如果没有生成器信息，显示数据源本身
-                        ds_success_rate = stats["success_count"] / stats["total_count"] if stats["total_count"] > 0 else 0
-                        writer.writerow([
-                            data_source,
-                            "N/A",
-                            stats["total_count"],
-                            stats["success_count"],
-                            stats["error_count"],
-                            f"{ds_success_rate:.2%}",
-                            f"{stats['avg_score']:.4f}",
-                            f"{stats['max_score']:.4f}",
-                            f"{stats['min_score']:.4f}",
-                            f"{stats['avg_assistant_turns']:.2f}",
-                            f"{stats['avg_tool_calls']:.2f}",
-                            f"{stats['avg_interaction_turns']:.2f}",
-                            f"{stats['avg_initial_prompt_tokens']:.2f}",
-                            f"{stats['avg_completion_tokens']:.2f}",
-                            f"{stats['avg_global_seq_tokens']:.2f}",
-                            f"{stats['avg_cumulative_prompt_tokens']:.2f}",
-                            f"{stats['avg_completion_tokens']:.2f}",
-                            f"{stats['avg_tokens']:.2f}",
-                            f"{stats['avg_interaction_turns']:.2f}"
-                        ])
-                
-                writer.writerow([])  # 空行分隔
-            
-            # 5. Error Analysis
-            if report_data["error_analysis"]["errors"]:
-                writer.writerow(["Error Type Statistics"])
-                writer.writerow(["Error Type", "Occurrence Count"])
-                for error_type, count in report_data["error_analysis"]["error_types"].items():
-                    writer.writerow([error_type, count])
-                
-                writer.writerow([])  # 空行分隔
-                
-                writer.writerow(["Detailed Error Information"])
-                writer.writerow(["Generator Name", "Data Source", "Sample ID", "Error Message"])
-                for error in report_data["error_analysis"]["errors"]:
-                    writer.writerow([
-                        error["generator_name"] if error["generator_name"] else "N/A", 
-                        error["data_source"], 
-                        error["input_id"], 
-                        error["error"]
-                    ])
+        save_csv_report(summary_path, report_data)
 
     def _print_console_report(self, report_data: dict) -> None:
         """
         Print formatted console report
         """
-        # Output file path
-        print(f"\n💾 Evaluation report saved to: {report_data['basic_info']['output_path'].replace('.jsonl', '.csv')}")
-        
-        # Overall Summary Section
-        overall = report_data["overall_stats"]
-        print(f"\n{'='*100}")
-        print(f"{'📊 EVALUATION SUMMARY':^100}")
-        print(f"{'='*100}")
-        print(f"  ✅ Overall Status     : {overall['success_count']}/{overall['total_samples']} successful (Success Rate: {overall['success_rate']:.1%})")
-        print(f"  📈 Average Score      : {overall['overall_avg_score']:.4f}")
-        print(f"{'='*100}")
-        
-        # Statistics grouped by data source (hierarchical structure)
-        if report_data["data_source_stats"]:
-            print(f"\n{'='*159}")
-            print(f"{'📋 STATISTICS BY DATA SOURCE':^159}")
-            print(f"{'='*159}")
-            
-            # Define column widths for consistency
-            col_widths = {
-                'source': 20,
-                'samples': 10,
-                'success': 10,
-                'avg_score': 12,
-                'max_score': 12,
-                'min_score': 12,
-                'avg_assistant_turns': 20,
-                'avg_tool_calls': 15,
-                'avg_completion_tokens': 20,
-                'avg_interaction_turns': 20,
-            }
-            
-            # Table header
-            header = (f"{'Data Source':<{col_widths['source']}} "
-                     f"{'Samples':>{col_widths['samples']}} "
-                     f"{'Success':>{col_widths['success']}} "
-                     f"{'Avg-Score':>{col_widths['avg_score']}} "
-                     f"{'Max-Score':>{col_widths['max_score']}} "
-                     f"{'Min-Score':>{col_widths['min_score']}} "
-                     f"{'Avg-Assistant-Turns':>{col_widths['avg_assistant_turns']}} "
-                     f"{'Avg-Tool-Calls':>{col_widths['avg_tool_calls']}} "
-                     f"{'Avg-Interaction-Turns':>{col_widths['avg_interaction_turns']}} "
-                     f"{'Avg-Completion-Tokens':>{col_widths['avg_completion_tokens']}}")
-            print(header)
-            print(f"{'-'*159}")
-            
-            # 为数字列居中对齐，通过在列宽基础上向右偏移列宽/2
-            def center_value(val_str, width):
-                # 居中对齐字符串
-                return f"{val_str:^{width}}"
-            
-            for data_source, stats in report_data["data_source_stats"].items():
-                success_rate = stats["success_count"] / stats["total_count"] if stats["total_count"] > 0 else 0
-
-                row = (
-                    f"{data_source:<{col_widths['source']}} "
-                    f"{center_value(str(stats['total_count']), col_widths['samples'])} "
-                    f"{center_value(f'{success_rate:.1%}', col_widths['success'])} "
-                    f"{center_value(f'{stats['avg_score']:.4f}', col_widths['avg_score'])} "
-                    f"{center_value(f'{stats['max_score']:.4f}', col_widths['max_score'])} "
-                    f"{center_value(f'{stats['min_score']:.4f}', col_widths['min_score'])} "
-                    f"{center_value(f'{stats['avg_assistant_turns']:.2f}', col_widths['avg_assistant_turns'])} "
-                    f"{center_value(f'{stats['avg_tool_calls']:.2f}', col_widths['avg_tool_calls'])} "
-                    f"{center_value(f'{stats['avg_interaction_turns']:.2f}', col_widths['avg_interaction_turns'])} "
-                    f"{center_value(f'{stats['avg_completion_tokens']:.2f}', col_widths['avg_completion_tokens'])}"
-                )
-                print(row)
-                
-                # If there are generator subdivisions, show generator statistics
-                if stats["generators"]:
-                    # Generator breakdown separator
-                    separator_line = f"  {'└─ Generators:':<{col_widths['source']-2}}"
-                    print(separator_line)
-                    
-                    # 按generator_name字典序排序Generator
-                    sorted_generators = sorted(stats["generators"].items(), key=lambda x: x[0])
-                    for idx, (generator_name, gen_stats) in enumerate(sorted_generators):
-                        gen_success_rate = gen_stats["success_count"] / gen_stats["total_count"] if gen_stats["total_count"] > 0 else 0
-                        is_last = (idx == len(stats["generators"]) - 1)
-                        prefix = "  ● "
-                        
-                        # Adjust generator name width to account for prefix
-                        gen_name_width = col_widths['source'] - len(prefix)
-
-                        gen_row = (
-                            f"{prefix}{generator_name:<{gen_name_width}} "
-                            f"{center_value(str(gen_stats['total_count']), col_widths['samples'])} "
-                            f"{center_value(f'{gen_success_rate:.1%}', col_widths['success'])} "
-                            f"{center_value(f'{gen_stats['avg_score']:.4f}', col_widths['avg_score'])} "
-                            f"{center_value(f'{gen_stats['max_score']:.4f}', col_widths['max_score'])} "
-                            f"{center_value(f'{gen_stats['min_score']:.4f}', col_widths['min_score'])} "
-                            f"{center_value(f'{gen_stats['avg_assistant_turns']:.2f}', col_widths['avg_assistant_turns'])} "
-                            f"{center_value(f'{gen_stats['avg_tool_calls']:.2f}', col_widths['avg_tool_calls'])} "
-                            f"{center_value(f'{gen_stats['avg_interaction_turns']:.2f}', col_widths['avg_interaction_turns'])} "
-                            f"{center_value(f'{gen_stats['avg_completion_tokens']:.2f}', col_widths['avg_completion_tokens'])}"
-                        )
-                        print(gen_row)
-                    print(f"{'-'*159}")
-            
-            print(f"{'='*159}")
-        
-        # Error Summary Section
-        if report_data["error_analysis"]["errors"]:
-            print(f"\n{'='*100}")
-            print(f"{'⚠️  ERROR SUMMARY':^100}")
-            print(f"{'='*100}")
-            print(f"  Total Errors: {len(report_data['error_analysis']['errors'])}")
-            print(f"\n  Main Error Types:")
-            for error_type, count in list(report_data["error_analysis"]["error_types"].items())[:3]:
-                print(f"    • {error_type:<80} ({count} occurrence{'s' if count > 1 else ''})")
-            print(f"{'='*100}")
+        print_console_report(report_data)
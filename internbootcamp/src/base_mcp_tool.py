@@ -16,30 +16,111 @@ import asyncio
 import json
 import logging
 import os
-from typing import Any, Optional
+import weakref
+from typing import Any, Callable, Optional
 from uuid import uuid4
 
 import aiohttp
 import httpx
 import requests
 from fastmcp.exceptions import ClientError
-from tenacity import retry, stop_after_attempt, wait_exponential
 from verl.tools.schemas import OpenAIFunctionToolSchema, ToolResponse
 from verl.tools.utils.mcp_clients.McpClientManager import ClientManager
 from verl.utils.rollout_trace import rollout_trace_op
 
+from internbootcamp.utils.http_pool import shared_aiohttp_session
+from internbootcamp.utils.retry_policy import (
+    TOOL_RETRYABLE_STATUS_CODES,
+    RetryPolicy,
+    StatusCodeError,
+    retry_after_seconds,
+)
+
 from .base_tool import BaseTool
 
 logger = logging.getLogger(__name__)
 logger.setLevel(os.getenv("VERL_LOGGING_LEVEL", "WARN"))
 
 
+class _ToolRequestBatcher:
+    """Coalesce tool-server operations issued within a short window into one /execute_batch request.
+
+    Results are matched to callers by position; a failed batch request propagates its exception to
+    every caller, so each caller's retry policy handles it as it would a single request.
+    """
+
+    def __init__(self, url: str, window: float, max_size: int, timeout: Optional[float], session_factory: Callable[[], aiohttp.ClientSession]):
+        self.url = url
+        self.session_factory = session_factory
+        self.window = window
+        self.max_size = max_size
+        self.timeout = timeout
+        self._pending: list[tuple[dict, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._send_tasks: set[asyncio.Task] = set()
+
+    async def submit(self, operation: dict) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((operation, future))
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._send_tasks.add(task)
+            task.add_done_callback(self._send_tasks.discard)
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            session = self.session_factory()
+            async with session.post(self.url + "/execute_batch", json={"operations": [operation for operation, _ in batch]}, timeout=timeout) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    raise StatusCodeError(response.status, text, retry_after_seconds(response))
+                results = (await response.json())["results"]
+            if len(results) != len(batch):
+                raise ValueError(f"Invalid batch response: expected {len(batch)} results, got {len(results)}")
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
 class BaseMCPTool(BaseTool):
     def __init__(self, config: dict, tool_schema: OpenAIFunctionToolSchema):
         super().__init__(config, tool_schema)
         self._instance_dict = {}
         self.timeout = config.get("timeout_per_query")
         self.mcp_server_url = config.get("mcp_server_url")
+        # batch_window_ms > 0 时，窗口内的 create/execute/calc_reward/release 合并为一次 /execute_batch 请求
+        self.batch_window_ms = config.get("batch_window_ms", 0)
+        self.batch_max_size = config.get("batch_max_size", 64)
+        # 每个事件循环一个合并器
+        self._batchers = weakref.WeakKeyDictionary()
+        # 连接池：同一进程中连接参数相同的工具共用一个长期存活的 session（见 http_pool.shared_aiohttp_session）
+        self.pool_max_connections = config.get("pool_max_connections", 256)
+        self.pool_keepalive_timeout = config.get("pool_keepalive_timeout", 30.0)
+        self.pool_dns_cache_ttl = config.get("pool_dns_cache_ttl", 300)
+        # execute 的重试策略；评测器加载工具时替换为自己的策略（共享其重试次数、预算与指标）
+        # 未由评测器替换时默认最多尝试 16 次（与原先 tenacity 的 stop_after_attempt(16) 一致）
+        self.retry_policy = RetryPolicy(
+            "tool",
+            max_attempts=config.get("retry_attempts", 16),
+            retryable_status_codes=TOOL_RETRYABLE_STATUS_CODES,
+        )
 
         logger.info(f"Initialized BaseMCPTool with config: {config}")
 
@@ -58,6 +139,23 @@ class BaseMCPTool(BaseTool):
         """Return the OpenAI tool schema."""
         return self.tool_schema
 
+    def _session(self) -> aiohttp.ClientSession:
+        """Return the process-wide pooled session for the current event loop, created lazily."""
+        return shared_aiohttp_session(
+            limit=self.pool_max_connections,
+            keepalive_timeout=self.pool_keepalive_timeout,
+            dns_cache_ttl=self.pool_dns_cache_ttl,
+        )
+
+    async def _batched(self, op: str, instance_id: str, **fields) -> Any:
+        """Send one operation through the per-loop batcher and return its result."""
+        loop = asyncio.get_running_loop()
+        batcher = self._batchers.get(loop)
+        if batcher is None:
+            batcher = _ToolRequestBatcher(self.mcp_server_url, self.batch_window_ms / 1000, self.batch_max_size, self.timeout, self._session)
+            self._batchers[loop] = batcher
+        return await batcher.submit({"op": op, "instance_id": instance_id, **fields})
+
     async def create(self, instance_id: Optional[str] = None, identity: dict = None, **kwargs) -> tuple[str, ToolResponse]:
         """Create a tool instance.
 
@@ -75,48 +173,63 @@ class BaseMCPTool(BaseTool):
             except:
                 print(f"[DEBUG BaseMCPTool] Error in create: identity is not a dict. identity: {identity}")
                 return None
+        if instance_id is not None and instance_id in self._instance_dict:
+            # 实例已在远端创建，复用，不重复请求 /create
+            return instance_id, ToolResponse()
         if instance_id is None:
             instance_id = str(uuid4())
-        self._instance_dict[instance_id] =identity
         
         # Call API to create instance on remote server
+        if self.batch_window_ms:
+            result = await self._batched("create", instance_id, identity=identity)
+            if not (isinstance(result, dict) and result.get("success")):
+                raise RuntimeError(f"Failed to call API create: {result}")
+            self._instance_dict[instance_id] = identity
+            return instance_id, ToolResponse()
         try:
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=None) as session:
-                async with session.post(
-                    self.mcp_server_url + "/create", 
-                    json={"instance_id": instance_id, "identity": identity}
-                ) as response:
-                    # Optional: check response status if needed
-                    pass
+            # 与原先 ClientSession(timeout=None) 一致，使用 aiohttp 的默认超时
+            async with self._session().post(
+                self.mcp_server_url + "/create", 
+                json={"instance_id": instance_id, "identity": identity},
+                timeout=aiohttp.client.DEFAULT_TIMEOUT,
+            ) as response:
+                # Optional: check response status if needed
+                pass
         except Exception as e:
             print(f"Failed to call API create: {e}")
             import traceback
             traceback.print_exc()
             raise e
+        # 远端创建成功后才记录，创建失败时下次调用会重新创建
+        self._instance_dict[instance_id] =identity
         
         return instance_id, ToolResponse()
 
-    @retry(stop=stop_after_attempt(16), 
-           wait=wait_exponential(multiplier=1, max=60), 
-           reraise=True,
-           before_sleep=lambda retry_state: print(f"Tool call retrying, failed attempt {retry_state.attempt_number}: \n{retry_state.outcome.exception()}"))
-    async def _call_tool(self, instance_id, parameters) -> tuple[str, dict]:
-        err_msg = ""
+    async def _post_execute(self, instance_id, parameters) -> tuple[str, float, dict]:
+        """Send one /execute request without retrying; non-200 responses raise StatusCodeError."""
+        if self.batch_window_ms:
+            result = await self._batched("execute", instance_id, parameters=dict(parameters) if parameters is not None else {})
+            if not isinstance(result, list) or len(result) != 3:
+                raise ValueError(f"failed to call tool: {result}")
+            return result
         params_with_instance = dict(parameters) if parameters is not None else {}
         params_with_instance["instance_id"] = instance_id
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with self._session().post(self.mcp_server_url + "/execute", json=params_with_instance, timeout=timeout) as response:
+            # 确保响应是 JSON
+            if response.status != 200:
+                text = await response.text()
+                raise StatusCodeError(response.status, text, retry_after_seconds(response))
+            result = await response.json()
+            if len(result) != 3:
+                raise ValueError(f"failed to call tool: {result}")
+            return result
+
+    async def _call_tool(self, instance_id, parameters) -> tuple[str, dict]:
+        err_msg = ""
         try:
-            timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(self.mcp_server_url + "/execute", json=params_with_instance) as response:
-                    # 确保响应是 JSON
-                    if response.status != 200:
-                        text = await response.text()
-                        raise ValueError(f"Bad status: {response.status}, response: {text}")
-                    result = await response.json()
-                    if len(result) != 3:
-                        raise ValueError(f"failed to call tool: {result}")
-                    return result
+            # 只重试超时、连接错误与 502/503/504（见 retry_policy），其他错误立即返回错误信息
+            return await self.retry_policy.call(self._post_execute, instance_id, parameters)
         except asyncio.TimeoutError as e:
             err_msg = f"Request time out: {e}"
         except aiohttp.ContentTypeError as e:
@@ -127,7 +240,7 @@ class BaseMCPTool(BaseTool):
             err_msg = f"Tool call failed: {e}"
         except aiohttp.ClientError as e:
             err_msg = f"Connection failed: {e}"
-        except ValueError as e:  # JSON 解析错误或其他验证错误
+        except (ValueError, StatusCodeError) as e:  # JSON 解析错误或其他验证错误
             err_msg = f"Invalid response: {e}"
         except Exception as e:
             import traceback
@@ -161,14 +274,16 @@ class BaseMCPTool(BaseTool):
 
     async def calc_reward(self, instance_id: str, **kwargs) -> str:
         try:
+            if self.batch_window_ms:
+                return float(await self._batched("calc_reward", instance_id))
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    self.mcp_server_url + "/calc_reward", 
-                    json={"instance_id": instance_id}
-                ) as response:
-                    text = await response.text()
-                    return float(text)
+            async with self._session().post(
+                self.mcp_server_url + "/calc_reward", 
+                json={"instance_id": instance_id},
+                timeout=timeout,
+            ) as response:
+                text = await response.text()
+                return float(text)
         except Exception as e:
             return 0.0
 
@@ -176,13 +291,16 @@ class BaseMCPTool(BaseTool):
         if instance_id in self._instance_dict:
             del self._instance_dict[instance_id]
         try:
+            if self.batch_window_ms:
+                await self._batched("release", instance_id)
+                return True
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    self.mcp_server_url + "/release", 
-                    json={"instance_id": instance_id}
-                ) as response:
-                    pass  # Response handled
+            async with self._session().post(
+                self.mcp_server_url + "/release", 
+                json={"instance_id": instance_id},
+                timeout=timeout,
+            ) as response:
+                pass  # Response handled
         except Exception as e:
             print(f"Failed to call API release: {e}")
         return True
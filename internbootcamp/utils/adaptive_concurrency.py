@@ -0,0 +1,163 @@
+"""
+API 请求自适应并发控制（AIMD）
+
+AdaptiveConcurrencyLimiter 限制同时进行的 API 请求数，并根据服务端反馈动态调整上限：
+- 慢启动：尚未出现过载时，每个成功请求使上限 +1（每个窗口约翻倍）
+- 加性增：之后每完成一个窗口（limit 个）的健康请求，上限 +increase_step
+- 乘性减：遇到 429/5xx/超时，上限乘以 decrease_factor；一个冷却期内（默认为当前平均延迟）只减一次
+- 延迟保护：短期平均延迟超过长期平均延迟的 latency_tolerance 倍时暂停增长
+
+示例用法:
+    limiter = AdaptiveConcurrencyLimiter(min_limit=4, max_limit=256)
+    await limiter.acquire()
+    try:
+        response = await client.chat.completions.create(...)
+    except Exception as e:
+        if is_overload_error(e):
+            limiter.on_overload()
+        raise
+    else:
+        limiter.on_success(latency)
+    finally:
+        limiter.release()
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+
+import httpx
+import openai
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """是否为服务端过载类错误（429、5xx、超时）"""
+    if isinstance(error, (openai.RateLimitError, openai.InternalServerError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    if isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    return False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD 自适应并发限制器（仅在单个事件循环内使用）
+
+    Args:
+        min_limit: 并发上限的最小值
+        max_limit: 并发上限的最大值
+        initial_limit: 初始并发上限，默认为 min_limit
+        increase_step: 每个健康窗口增加的并发数
+        decrease_factor: 过载时的乘性减小系数
+        latency_tolerance: 短期/长期平均延迟之比超过该值时暂停增长，None 表示不检查延迟
+        cooldown: 两次减小之间的最短间隔（秒），None 表示使用当前短期平均延迟
+        metrics: EvaluationMetrics，用于发布当前并发窗口
+    """
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        initial_limit: Optional[int] = None,
+        increase_step: int = 1,
+        decrease_factor: float = 0.5,
+        latency_tolerance: Optional[float] = 2.0,
+        cooldown: Optional[float] = None,
+        metrics=None,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        initial_limit = initial_limit if initial_limit is not None else self.min_limit
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.metrics = metrics
+        self.in_flight = 0
+        self.slow_start = True
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        # 短期（约 10 个请求）与长期（约 200 个请求）的延迟指数滑动平均
+        self._latency_short: Optional[float] = None
+        self._latency_long: Optional[float] = None
+        self._publish()
+
+    # ---- 并发槽位 ----
+
+    async def acquire(self) -> None:
+        """获取一个请求槽位，达到当前上限时等待"""
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 槽位已分配但调用方被取消，归还槽位
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self) -> None:
+        """归还请求槽位"""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    # ---- 反馈 ----
+
+    def on_success(self, latency: float) -> None:
+        """请求成功，latency 为本次请求耗时（秒）"""
+        if self._latency_short is None:
+            self._latency_short = self._latency_long = latency
+        else:
+            self._latency_short += 0.1 * (latency - self._latency_short)
+            self._latency_long += 0.005 * (latency - self._latency_long)
+
+        if (
+            self.latency_tolerance is not None
+            and self._latency_long
+            and self._latency_short > self.latency_tolerance * self._latency_long
+        ):
+            # 延迟明显升高，暂停增长
+            return
+        if self.slow_start:
+            self.limit = min(self.max_limit, self.limit + 1)
+        else:
+            self.limit = min(self.max_limit, self.limit + self.increase_step / max(self.limit, 1.0))
+        self._publish()
+        self._wake_waiters()
+
+    def on_overload(self) -> None:
+        """请求遇到 429/5xx/超时"""
+        if self.metrics is not None:
+            self.metrics.inc("api_overload_errors")
+        now = time.monotonic()
+        cooldown = self.cooldown if self.cooldown is not None else (self._latency_short or 1.0)
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self.slow_start = False
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self._publish()
+
+    def _publish(self) -> None:
+        if self.metrics is not None:
+            self.metrics.set_gauge("api_concurrency_limit", int(self.limit))
@@ -0,0 +1,217 @@
+"""
+流式 chat completions 组装
+
+将流式返回的增量（content / reasoning_content / tool_calls）组装为与非流式接口
+response.model_dump() 结构一致的字典，同时记录首 token 延迟（TTFT）与 token 间延迟，
+并支持客户端提前停止：
+- stop_regex：content 中出现匹配（如 \\boxed{...}）后立即停止，content 截断到匹配结束处
+- deadline：样本级时间预算（time.monotonic() 时间点），到期后停止并保留已生成的部分
+"""
+
+import asyncio
+import contextvars
+import re
+import time
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Union
+
+# 当前样本的时间预算截止点（time.monotonic()），由 _evaluate_one 设置
+current_sample_deadline: contextvars.ContextVar = contextvars.ContextVar("current_sample_deadline", default=None)
+
+# 客户端提前停止时的 finish_reason
+FINISH_REASON_STOP_REGEX = "stop_regex"
+FINISH_REASON_TIME_BUDGET = "time_budget"
+
+# stop_regex 的搜索窗口（字符数），匹配内容需位于已生成文本的末尾窗口内
+STOP_REGEX_WINDOW = 4096
+
+
+def _get(obj: Any, key: str, default: Any = None) -> Any:
+    """兼容 pydantic 对象与字典的字段读取（包括 reasoning_content 等服务端扩展字段）"""
+    if obj is None:
+        return default
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+class ChatStreamAssembler:
+    """按 chunk 组装流式响应（只处理第一个 choice）"""
+
+    def __init__(self):
+        self.id = None
+        self.model = None
+        self.created = None
+        self.role = "assistant"
+        self.content_parts: List[str] = []
+        self.reasoning_parts: List[str] = []
+        self.tool_calls: Dict[int, dict] = {}
+        self.finish_reason = None
+        self.usage = None
+
+    def add_chunk(self, chunk: Any) -> Tuple[str, bool]:
+        """
+        合并一个 chunk
+
+        Returns:
+            Tuple[str, bool]: (本 chunk 新增的 content 文本, 是否包含生成内容的增量)
+        """
+        self.id = self.id or _get(chunk, "id")
+        self.model = self.model or _get(chunk, "model")
+        self.created = self.created or _get(chunk, "created")
+        usage = _get(chunk, "usage")
+        if usage:
+            self.usage = usage if isinstance(usage, dict) else usage.model_dump()
+        choices = _get(chunk, "choices") or []
+        if not choices:
+            return "", False
+        choice = choices[0]
+        if _get(choice, "finish_reason"):
+            self.finish_reason = _get(choice, "finish_reason")
+        delta = _get(choice, "delta")
+        if delta is None:
+            return "", False
+        if _get(delta, "role"):
+            self.role = _get(delta, "role")
+        has_delta = False
+        reasoning = _get(delta, "reasoning_content")
+        if reasoning:
+            self.reasoning_parts.append(reasoning)
+            has_delta = True
+        for tool_call in _get(delta, "tool_calls") or []:
+            self._add_tool_call_delta(tool_call)
+            has_delta = True
+        content = _get(delta, "content")
+        if content:
+            self.content_parts.append(content)
+            return content, True
+        return "", has_delta
+
+    def _add_tool_call_delta(self, delta: Any) -> None:
+        index = _get(delta, "index", 0)
+        tool_call = self.tool_calls.setdefault(index, {
+            "id": None,
+            "type": "function",
+            "function": {"name": "", "arguments": ""},
+        })
+        if _get(delta, "id"):
+            tool_call["id"] = _get(delta, "id")
+        if _get(delta, "type"):
+            tool_call["type"] = _get(delta, "type")
+        function = _get(delta, "function")
+        if function is not None:
+            if _get(function, "name"):
+                tool_call["function"]["name"] += _get(function, "name")
+            if _get(function, "arguments"):
+                tool_call["function"]["arguments"] += _get(function, "arguments")
+
+    @property
+    def content(self) -> str:
+        return "".join(self.content_parts)
+
+    def truncate_content(self, end: int) -> None:
+        """将 content 截断到 end 位置"""
+        self.content_parts = [self.content[:end]]
+
+    def to_response_dict(self) -> dict:
+        """组装为与非流式 response.model_dump() 一致的结构"""
+        message = {
+            "role": self.role,
+            "content": self.content if self.content_parts else None,
+            "tool_calls": [self.tool_calls[index] for index in sorted(self.tool_calls)] or None,
+        }
+        if self.reasoning_parts:
+            message["reasoning_content"] = "".join(self.reasoning_parts)
+        return {
+            "id": self.id,
+            "object": "chat.completion",
+            "created": self.created,
+            "model": self.model,
+            "choices": [{"index": 0, "message": message, "finish_reason": self.finish_reason}],
+            "usage": self.usage,
+        }
+
+
+async def consume_chat_stream(
+    stream: Any,
+    start_time: float,
+    stop_regex: Optional[Union[str, Pattern]] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[dict, dict]:
+    """
+    读取流式响应并组装
+
+    Args:
+        stream: client.chat.completions.create(stream=True) 返回的异步流
+        start_time: 请求发出时刻（time.perf_counter()），用于计算 TTFT
+        stop_regex: 客户端停止条件，content 匹配后停止
+        deadline: 时间预算截止点（time.monotonic()），到期后停止
+
+    Returns:
+        Tuple[dict, dict]: (响应字典, 流统计 {"ttft", "inter_token_latency", "chunks"})
+    """
+    if isinstance(stop_regex, str):
+        stop_regex = re.compile(stop_regex)
+    assembler = ChatStreamAssembler()
+    first_token_time = None
+    last_token_time = None
+    token_chunks = 0
+    stopped_reason = None
+    content_length = 0
+    tail = ""
+    iterator = stream.__aiter__()
+    try:
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    stopped_reason = FINISH_REASON_TIME_BUDGET
+                    break
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), timeout)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                stopped_reason = FINISH_REASON_TIME_BUDGET
+                break
+            new_content, has_delta = assembler.add_chunk(chunk)
+            if has_delta:
+                now = time.perf_counter()
+                if first_token_time is None:
+                    first_token_time = now
+                last_token_time = now
+                token_chunks += 1
+            if new_content and stop_regex is not None and not assembler.tool_calls:
+                # 只在末尾窗口内搜索，避免每个 chunk 都扫描全文
+                content_length += len(new_content)
+                tail = (tail + new_content)[-(STOP_REGEX_WINDOW + len(new_content)):]
+                match = stop_regex.search(tail)
+                if match:
+                    assembler.truncate_content(content_length - len(tail) + match.end())
+                    stopped_reason = FINISH_REASON_STOP_REGEX
+                    break
+    finally:
+        if stopped_reason is not None:
+            close = getattr(stream, "close", None)
+            if close is not None:
+                await close()
+
+    if stopped_reason is not None:
+        assembler.finish_reason = stopped_reason
+    response_dict = assembler.to_response_dict()
+    if not response_dict["usage"]:
+        # 提前停止时服务端不会返回 usage，按 chunk 数估计 completion tokens
+        response_dict["usage"] = {
+            "prompt_tokens": 0,
+            "completion_tokens": token_chunks,
+            "total_tokens": token_chunks,
+            "estimated": True,
+        }
+    stream_stats = {
+        "ttft": first_token_time - start_time if first_token_time is not None else None,
+        "inter_token_latency": (
+            (last_token_time - first_token_time) / (token_chunks - 1) if token_chunks > 1 else None
+        ),
+        "chunks": token_chunks,
+    }
+    return response_dict, stream_stats
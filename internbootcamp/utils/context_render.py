@@ -0,0 +1,123 @@
+"""
+对话上下文渲染
+
+将 messages 列表渲染为上下文字符串：优先使用 tokenizer.apply_chat_template，
+没有 tokenizer 或模板渲染失败时使用自定义格式化。评测时（BaseEvaluator._messages_to_context）
+与事后从精简结果中按需渲染（见 result_format.expand_result）共用同一实现。
+
+render_contexts 一次得到 full_context 与 response_context：自定义格式化是逐条消息拼接的，
+每条消息只渲染一次，response_context 直接取 full_context 的回复部分；chat template 不保证前缀
+稳定（如未提供 system 消息时模板会插入默认 system prompt、历史轮次的思考内容可能被裁剪），
+因此 response_context 仍单独渲染，与评分语义保持一致。
+
+使用 chat template 时不缓存渲染结果，也不做逐轮增量渲染：
+- 上下文只在样本最后一轮结束后渲染一次，不存在可复用的逐轮渲染
+- 模板对 prompt 的渲染结果不一定是完整渲染的前缀（原因同上），拼接缓存的 prompt 渲染会改变 full_context
+- 各样本的 prompt 不同，跨样本缓存 prompt 渲染几乎不会命中
+渲染开销通过在线程池中执行（BaseEvaluator._render_contexts）移出事件循环。
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def render_messages(messages: List[Dict[str, Any]], tokenizer: Any = None, tools: Optional[List[Dict]] = None) -> str:
+    """
+    将messages列表转换为完整的上下文字符串
+
+    Args:
+        messages: 消息列表，每个消息包含role和content字段
+        tokenizer: 带 chat template 的 tokenizer，None 时使用自定义格式化
+        tools: 工具 schema 列表（仅 chat template 使用）
+
+    Returns:
+        str: 完整的对话上下文字符串
+    """
+    tools = tools or []
+    # 优先使用 transformers 的 apply_chat_template
+    if tokenizer is not None:
+        try:
+            # 复制消息，避免模板渲染修改原始消息
+            processed_messages = [message.copy() for message in messages]
+            # 使用 apply_chat_template 转换，不添加生成提示，不进行分词
+            return tokenizer.apply_chat_template(
+                processed_messages,
+                tools=tools,
+                add_generation_prompt=False,
+                tokenize=False
+            )
+        except Exception as e:
+            print(f"[WARNING] apply_chat_template 失败，使用回退方案: {e}")
+            # 如果失败，继续使用自定义格式化
+
+    # 回退方案：自定义格式化
+    return "".join(render_message_fallback(message) for message in messages)
+
+
+def render_contexts(
+    messages: List[Dict[str, Any]],
+    prompt_length: int,
+    tokenizer: Any = None,
+    tools: Optional[List[Dict]] = None,
+    need_full: bool = True,
+) -> Tuple[Optional[str], str]:
+    """
+    渲染完整上下文与回复部分的上下文
+
+    Args:
+        messages: 完整的消息列表（prompt + 回复）
+        prompt_length: prompt 消息条数
+        tokenizer: 带 chat template 的 tokenizer，None 时使用自定义格式化
+        tools: 工具 schema 列表（仅用于完整上下文）
+        need_full: 是否需要完整上下文，False 时只渲染回复部分
+
+    Returns:
+        Tuple[Optional[str], str]: (full_context, response_context)
+    """
+    if tokenizer is None:
+        parts = [render_message_fallback(message) for message in messages[prompt_length:]]
+        response_context = "".join(parts)
+        if not need_full:
+            return None, response_context
+        prompt_context = "".join(render_message_fallback(message) for message in messages[:prompt_length])
+        return prompt_context + response_context, response_context
+    full_context = render_messages(messages, tokenizer=tokenizer, tools=tools) if need_full else None
+    response_context = render_messages(messages[prompt_length:], tokenizer=tokenizer)
+    return full_context, response_context
+
+
+def render_message_fallback(message: Dict[str, Any]) -> str:
+    """自定义格式化单条消息（回退方案）"""
+    role = message.get("role", "")
+    content = message.get("content", "")
+
+    # 处理reasoning_content（如果存在）
+    if "reasoning_content" in message:
+        reasoning_content = message["reasoning_content"]
+        if reasoning_content is not None and reasoning_content.strip() != "":
+            content = f"<think>\n{reasoning_content}\n</think>\n\n{content}"
+
+    # 处理工具调用（tool_calls）
+    if role == "assistant" and "tool_calls" in message and message["tool_calls"]:
+        tool_calls_content = ""
+        for tool_call in message["tool_calls"]:
+            function_name = tool_call.get("function", {}).get("name", "")
+            arguments = tool_call.get("function", {}).get("arguments", "")
+            tool_calls_content += f"Function: {function_name}\nArguments: {arguments}\n\n"
+
+        # 将工具调用内容用<tool_call>包裹
+        if tool_calls_content:
+            content = f"{content}\n<tool_call>\n{tool_calls_content.strip()}</tool_call>"
+
+    # 根据角色格式化消息
+    if role == "user":
+        return f"User:\n{content}\n"
+    elif role == "assistant":
+        return f"Assistant:\n{content}\n"
+    elif role == "system":
+        return f"System:\n{content}\n"
+    elif role == "tool":
+        # 工具响应已经用<tool_response>包裹了
+        return f"<tool_response>\n{content}\n</tool_response>\n"
+    else:
+        # 其他角色
+        return f"{role.capitalize()}:\n{content}\n"
@@ -13,6 +13,8 @@ from typing import Callable, List, Dict, Any, Optional, Union
 from pathlib import Path
 from collections import defaultdict
 
+from internbootcamp.utils.result_format import expand_result, is_zstd_path, iter_results, result_file_stem
+
 
 class DataPostProcessor:
     """
@@ -174,7 +176,7 @@ class DataPostProcessor:
         处理 jsonl 文件
         
         Args:
-            input_path: 输入文件路径
+            input_path: 输入文件路径（支持 .jsonl.zst 压缩文件与精简格式结果，读取时还原为完整格式的消息）
             output_path: 输出文件路径（可选）。如果不提供，将自动生成为 input_path_processed.jsonl
             verbose: 是否打印详细信息
         
@@ -184,7 +186,9 @@ class DataPostProcessor:
         input_path = Path(input_path)
         
         # 如果未提供输出路径，自动生成
-        if output_path is None:
+        if output_path is None and is_zstd_path(str(input_path)):
+            output_path = Path(f"{result_file_stem(str(input_path))}_processed.jsonl")
+        elif output_path is None:
             output_path = input_path.parent / f"{input_path.stem}_processed{input_path.suffix}"
         else:
             output_path = Path(output_path)
@@ -199,11 +203,11 @@ class DataPostProcessor:
             print(f"📖 正在读取输入文件: {input_path}")
         
         # 处理数据
-        with jsonlines.open(input_path) as reader, \
-             jsonlines.open(output_path, mode='w') as writer:
+        with jsonlines.open(output_path, mode='w') as writer:
             
-            for line in reader:
+            for line in iter_results(str(input_path)):
                 self.stats['total_input'] += 1
+                line = expand_result(line)
                 
                 # 应用过滤器
                 if not self._apply_filters(line):
@@ -0,0 +1,173 @@
+"""
+多推理服务端点负载均衡
+
+EndpointPool 管理多个 OpenAI 兼容端点（如多个 vLLM 副本），为每次 API 请求选择端点：
+- 路由策略：least_outstanding（进行中请求数最少）或 p2c（随机取两个，选进行中请求数少的）
+- 健康剔除：连续 eject_failures 次连接错误/5xx/超时后，端点被剔除 eject_seconds 秒，到期后自动恢复
+- 粘性路由：同一样本（routing key）的多轮请求固定发往同一端点，保持服务端前缀缓存命中；
+  端点被剔除时重新选择
+
+示例用法:
+    pool = EndpointPool(["http://a:8000/v1", "http://b:8000/v1"], client_factory)
+    endpoint = pool.acquire(routing_key)
+    try:
+        response = await endpoint.client.chat.completions.create(...)
+        pool.release(endpoint, success=True)
+    except Exception as e:
+        pool.release(endpoint, success=not is_overload_error(e))
+        raise
+    ...
+    pool.forget(routing_key)
+"""
+
+import contextvars
+import random
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Union
+
+ROUTING_POLICIES = ("least_outstanding", "p2c")
+
+# 当前样本的路由键，由评测任务在处理每个样本前设置
+current_routing_key: contextvars.ContextVar = contextvars.ContextVar("current_routing_key", default=None)
+
+
+def parse_api_urls(api_url: Union[str, Sequence[str], None]) -> List[Optional[str]]:
+    """将逗号分隔的字符串或列表解析为端点列表；未指定时返回 [None]（使用默认 OpenAI API）"""
+    if api_url is None:
+        return [None]
+    if isinstance(api_url, str):
+        urls = [url.strip() for url in api_url.split(",")]
+    else:
+        urls = [str(url).strip() for url in api_url]
+    urls = [url for url in urls if url]
+    return urls or [None]
+
+
+class Endpoint:
+    """单个推理服务端点及其负载/健康状态"""
+
+    def __init__(self, url: str, client: Any):
+        self.url = url
+        self.client = client
+        self.outstanding = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def __repr__(self) -> str:
+        return f"Endpoint({self.url}, outstanding={self.outstanding})"
+
+
+class EndpointPool:
+    """
+    端点池（仅在单个事件循环内使用，无需加锁）
+
+    Args:
+        urls: 端点地址列表
+        client_factory: 根据地址创建 API 客户端的函数
+        policy: 路由策略，least_outstanding 或 p2c
+        eject_failures: 连续失败多少次后剔除端点
+        eject_seconds: 剔除时长（秒）
+        metrics: EvaluationMetrics，用于发布健康端点数和剔除次数
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        client_factory: Callable[[str], Any],
+        policy: str = "least_outstanding",
+        eject_failures: int = 3,
+        eject_seconds: float = 30.0,
+        metrics=None,
+    ):
+        if policy not in ROUTING_POLICIES:
+            raise ValueError(f"不支持的路由策略: {policy}，可选: {ROUTING_POLICIES}")
+        if not urls:
+            raise ValueError("端点列表不能为空")
+        self.endpoints = [Endpoint(url, client_factory(url)) for url in urls]
+        self.policy = policy
+        self.eject_failures = max(1, eject_failures)
+        self.eject_seconds = eject_seconds
+        self.metrics = metrics
+        self._sticky: Dict[Hashable, Endpoint] = {}
+
+    def replace_clients(self, client_factory: Callable[[str], Any]) -> None:
+        """重新创建所有端点的客户端（旧客户端需由调用方关闭）"""
+        for endpoint in self.endpoints:
+            endpoint.client = client_factory(endpoint.url)
+
+    def acquire(self, routing_key: Optional[Hashable] = None) -> Endpoint:
+        """为一次请求选择端点并计入进行中请求数"""
+        now = time.monotonic()
+        endpoint = self._sticky.get(routing_key) if routing_key is not None else None
+        if endpoint is None or not endpoint.is_healthy(now):
+            endpoint = self._choose(now)
+            if routing_key is not None:
+                self._sticky[routing_key] = endpoint
+        endpoint.outstanding += 1
+        endpoint.total_requests += 1
+        return endpoint
+
+    def release(self, endpoint: Endpoint, success: bool = True) -> None:
+        """
+        请求结束
+
+        Args:
+            endpoint: acquire 返回的端点
+            success: 是否应视为端点健康（客户端错误如 400 不应计入端点失败）
+        """
+        endpoint.outstanding = max(0, endpoint.outstanding - 1)
+        if success:
+            endpoint.consecutive_failures = 0
+            return
+        endpoint.total_failures += 1
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.eject_failures and len(self.endpoints) > 1:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            endpoint.consecutive_failures = 0
+            print(f"⚠️ 端点 {endpoint.url} 连续失败 {self.eject_failures} 次，剔除 {self.eject_seconds:.0f} 秒")
+            if self.metrics is not None:
+                self.metrics.inc("endpoint_ejections")
+        self._publish()
+
+    def forget(self, routing_key: Optional[Hashable]) -> None:
+        """样本结束后移除其粘性路由"""
+        if routing_key is not None:
+            self._sticky.pop(routing_key, None)
+
+    def _choose(self, now: float) -> Endpoint:
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.is_healthy(now)]
+        if not healthy:
+            # 全部被剔除时选择最早恢复的端点，避免评测中断
+            return min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)
+        if len(healthy) == 1:
+            return healthy[0]
+        if self.policy == "p2c":
+            first, second = random.sample(healthy, 2)
+            return first if first.outstanding <= second.outstanding else second
+        # least_outstanding：进行中请求数相同时随机选择，避免总是压在第一个端点上
+        min_outstanding = min(endpoint.outstanding for endpoint in healthy)
+        return random.choice([endpoint for endpoint in healthy if endpoint.outstanding == min_outstanding])
+
+    def _publish(self) -> None:
+        if self.metrics is not None:
+            now = time.monotonic()
+            self.metrics.set_gauge("healthy_endpoints", sum(endpoint.is_healthy(now) for endpoint in self.endpoints))
+
+    def stats(self) -> List[dict]:
+        """各端点的请求统计"""
+        now = time.monotonic()
+        return [
+            {
+                "url": endpoint.url,
+                "outstanding": endpoint.outstanding,
+                "total_requests": endpoint.total_requests,
+                "total_failures": endpoint.total_failures,
+                "healthy": endpoint.is_healthy(now),
+            }
+            for endpoint in self.endpoints
+        ]
@@ -0,0 +1,431 @@
+"""
+评测运行时指标
+
+EvaluationMetrics 在评测过程中实时记录：
+- 样本吞吐（samples/s）、成功/失败数、进行中的样本数
+- 进行中的 API 请求数，API 延迟 p50/p95/p99
+- 工具调用延迟（按工具名统计 p50/p95/p99）
+- token 吞吐（tokens/s，来自 API 返回的 usage）
+- 按 data_source 统计的滑动平均分
+
+PhaseTimer 记录单个样本内各阶段的耗时，写入结果的 timing 字段并在 CSV 报告中汇总。
+
+指标可通过两种方式导出：
+- 定期写入 JSON 快照文件（run_snapshot_writer）
+- 本地 HTTP 端点（start_metrics_server）：/metrics 为 Prometheus 文本格式，/metrics.json 为 JSON
+
+采集函数（add_collector）读取的是事件循环持有的状态（连接池、响应缓存等），只能在事件循环中
+调用 collect()（由 run_snapshot_writer / run_metrics_collector 定期执行）；HTTP 线程只读取
+上一次采集的结果，不会直接访问这些对象。
+
+示例用法:
+    metrics = EvaluationMetrics()
+    server = start_metrics_server(metrics, port=9400)
+    collector_task = asyncio.create_task(run_metrics_collector(metrics, 1.0, stop_event))
+    ...
+    server.shutdown()
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "internbootcamp_eval"
+
+# 只启用 HTTP 端点时，事件循环中运行采集函数的间隔（秒）
+COLLECT_INTERVAL = 1.0
+
+# 单样本耗时阶段（秒）
+# api_wait: 等待模型响应；ttft: 首 token 延迟（流式请求）；tool_*: 工具各阶段；
+# interaction: interaction 的 start/generate_response；render: 上下文渲染；scoring: 评分与答案提取
+TIMING_PHASES = (
+    "api_wait",
+    "ttft",
+    "tool_create",
+    "tool_execute",
+    "tool_calc_reward",
+    "tool_release",
+    "interaction",
+    "render",
+    "scoring",
+    "total",
+)
+
+
+class PhaseTimer:
+    """
+    单个样本的分阶段计时器
+
+    示例用法:
+        timer = PhaseTimer()
+        with timer.span("api_wait"):
+            response = await call_api()
+        result["timing"] = timer.as_dict()
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """累计 with 块的耗时到 phase（块内可以 await）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, float]:
+        """各阶段累计耗时及样本总耗时 total"""
+        timing = {phase: round(seconds, 6) for phase, seconds in self.durations.items()}
+        timing["total"] = round(time.perf_counter() - self._start, 6)
+        return timing
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    """计算 p50/p95/p99（最近邻法）"""
+    if not values:
+        return {f"p{int(q * 100)}": 0.0 for q in QUANTILES}
+    values = sorted(values)
+    result = {}
+    for q in QUANTILES:
+        idx = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+        result[f"p{int(q * 100)}"] = values[idx]
+    return result
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class EvaluationMetrics:
+    """
+    评测运行时指标（线程安全，供事件循环写入、HTTP 线程读取）
+
+    采集函数只在事件循环中由 collect() 调用，snapshot() 可在任意线程调用。
+
+    Args:
+        latency_window: 每类延迟保留的最近样本数，分位数基于该窗口计算
+        rate_window: 吞吐速率的统计时间窗口（秒）
+        score_window: 每个 data_source 滑动平均分的样本数
+    """
+
+    def __init__(self, latency_window: int = 2048, rate_window: float = 60.0, score_window: int = 200):
+        self.latency_window = latency_window
+        self.rate_window = rate_window
+        self.score_window = score_window
+        self._lock = threading.Lock()
+        # 生成快照前调用的采集函数，用于刷新需要主动读取的仪表（如连接池使用情况）
+        self._collectors: List[Callable[[], None]] = []
+        self.reset()
+
+    def reset(self) -> None:
+        """清空所有指标，开始新的评测时调用"""
+        with self._lock:
+            self.start_time = time.time()
+            self.samples_success = 0
+            self.samples_failed = 0
+            self.in_flight_samples = 0
+            self.in_flight_api = 0
+            self.api_calls = 0
+            # 由响应缓存返回的调用，不计入 api_calls、延迟与 token 吞吐
+            self.api_cached_calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.total_tokens = 0
+            self._api_latency: Deque[float] = deque(maxlen=self.latency_window)
+            self._ttft: Deque[float] = deque(maxlen=self.latency_window)
+            self._inter_token_latency: Deque[float] = deque(maxlen=self.latency_window)
+            self._tool_latency: Dict[str, Deque[float]] = {}
+            self._scores: Dict[str, Deque[float]] = {}
+            # (完成时间, 样本数, token 数)，用于计算滑动窗口速率
+            self._events: Deque[Tuple[float, int, int]] = deque()
+            # 供其他组件扩展的计数器与仪表（如并发窗口、连接池使用率、重试次数）
+            self.counters: Dict[str, float] = {}
+            self.gauges: Dict[str, float] = {}
+
+    # ---- 记录 ----
+
+    def sample_started(self) -> None:
+        with self._lock:
+            self.in_flight_samples += 1
+
+    def sample_finished(self, result: Optional[dict]) -> None:
+        """样本评测完成（result 为 _evaluate_one 的返回值）"""
+        now = time.time()
+        with self._lock:
+            self.in_flight_samples = max(0, self.in_flight_samples - 1)
+            if not isinstance(result, dict) or not result.get("success"):
+                self.samples_failed += 1
+            else:
+                self.samples_success += 1
+                score = result.get("score")
+                if isinstance(score, (int, float)):
+                    data_source = (result.get("input") or {}).get("data_source", "Unknown")
+                    if data_source not in self._scores:
+                        self._scores[data_source] = deque(maxlen=self.score_window)
+                    self._scores[data_source].append(score)
+            self._events.append((now, 1, 0))
+            self._trim_events(now)
+
+    def api_started(self) -> None:
+        with self._lock:
+            self.in_flight_api += 1
+
+    def api_finished(self, latency: float, usage: Optional[dict] = None, cached: bool = False) -> None:
+        """一次 API 调用完成（含失败重试后的最终结果）；cached 为 True 表示响应来自缓存，只计数"""
+        now = time.time()
+        usage = usage or {}
+        with self._lock:
+            self.in_flight_api = max(0, self.in_flight_api - 1)
+            if cached:
+                self.api_cached_calls += 1
+                return
+            self.api_calls += 1
+            self._api_latency.append(latency)
+            self.prompt_tokens += usage.get("prompt_tokens", 0) or 0
+            self.completion_tokens += usage.get("completion_tokens", 0) or 0
+            tokens = usage.get("total_tokens", 0) or 0
+            self.total_tokens += tokens
+            self._events.append((now, 0, tokens))
+            self._trim_events(now)
+
+    def record_stream(self, ttft: float, inter_token_latency: Optional[float] = None) -> None:
+        """记录流式请求的首 token 延迟与平均 token 间延迟"""
+        with self._lock:
+            self._ttft.append(ttft)
+            if inter_token_latency is not None:
+                self._inter_token_latency.append(inter_token_latency)
+
+    def record_tool_latency(self, tool_name: str, latency: float) -> None:
+        with self._lock:
+            if tool_name not in self._tool_latency:
+                self._tool_latency[tool_name] = deque(maxlen=self.latency_window)
+            self._tool_latency[tool_name].append(latency)
+
+    def inc(self, name: str, value: float = 1) -> None:
+        """累加自定义计数器"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_counter(self, name: str, value: float) -> None:
+        """设置自定义计数器的当前值（用于由组件自身计数、在采集函数中发布的计数器）"""
+        with self._lock:
+            self.counters[name] = value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """设置自定义仪表值"""
+        with self._lock:
+            self.gauges[name] = value
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """注册采集函数，由 collect() 调用（采集函数内可调用 set_gauge/set_counter）"""
+        self._collectors.append(collector)
+
+    def collect(self) -> None:
+        """运行全部采集函数，刷新其发布的仪表与计数器；必须在事件循环所在线程调用"""
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                pass
+
+    def _trim_events(self, now: float) -> None:
+        while self._events and now - self._events[0][0] > self.rate_window:
+            self._events.popleft()
+
+    # ---- 导出 ----
+
+    def snapshot(self) -> dict:
+        """当前指标快照（采集函数发布的值为上一次 collect() 的结果）"""
+        now = time.time()
+        with self._lock:
+            self._trim_events(now)
+            elapsed = max(now - self.start_time, 1e-6)
+            window = min(self.rate_window, elapsed)
+            window_samples = sum(event[1] for event in self._events)
+            window_tokens = sum(event[2] for event in self._events)
+            samples_done = self.samples_success + self.samples_failed
+            return {
+                "timestamp": now,
+                "elapsed_seconds": elapsed,
+                "samples": {
+                    "done": samples_done,
+                    "success": self.samples_success,
+                    "failed": self.samples_failed,
+                    "in_flight": self.in_flight_samples,
+                    "per_second": window_samples / window,
+                    "per_second_overall": samples_done / elapsed,
+                },
+                "api": {
+                    "calls": self.api_calls,
+                    "cached_calls": self.api_cached_calls,
+                    "in_flight": self.in_flight_api,
+                    "latency_seconds": _percentiles(list(self._api_latency)),
+                    "ttft_seconds": _percentiles(list(self._ttft)),
+                    "inter_token_latency_seconds": _percentiles(list(self._inter_token_latency)),
+                },
+                "tools": {
+                    tool_name: {
+                        "calls_in_window": len(latencies),
+                        "latency_seconds": _percentiles(list(latencies)),
+                    }
+                    for tool_name, latencies in self._tool_latency.items()
+                },
+                "tokens": {
+                    "prompt": self.prompt_tokens,
+                    "completion": self.completion_tokens,
+                    "total": self.total_tokens,
+                    "per_second": window_tokens / window,
+                    "per_second_overall": self.total_tokens / elapsed,
+                },
+                "rolling_avg_score": {
+                    data_source: sum(scores) / len(scores)
+                    for data_source, scores in self._scores.items() if scores
+                },
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式"""
+        snap = self.snapshot()
+        with self._lock:
+            has_stream = bool(self._ttft)
+        lines = []
+
+        def add(name, value, labels=None, metric_type=None):
+            full_name = f"{METRIC_PREFIX}_{name}"
+            if metric_type:
+                lines.append(f"# TYPE {full_name} {metric_type}")
+            label_str = ""
+            if labels:
+                label_str = "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items()) + "}"
+            lines.append(f"{full_name}{label_str} {value}")
+
+        add("samples_total", snap["samples"]["success"], {"status": "success"}, "counter")
+        add("samples_total", snap["samples"]["failed"], {"status": "failed"})
+        add("samples_in_flight", snap["samples"]["in_flight"], metric_type="gauge")
+        add("samples_per_second", snap["samples"]["per_second"], metric_type="gauge")
+        add("api_calls_total", snap["api"]["calls"], metric_type="counter")
+        add("api_cached_calls_total", snap["api"]["cached_calls"], metric_type="counter")
+        add("api_in_flight", snap["api"]["in_flight"], metric_type="gauge")
+        lines.append(f"# TYPE {METRIC_PREFIX}_api_latency_seconds summary")
+        for quantile, value in zip(QUANTILES, snap["api"]["latency_seconds"].values()):
+            add("api_latency_seconds", value, {"quantile": quantile})
+        if has_stream:
+            lines.append(f"# TYPE {METRIC_PREFIX}_api_ttft_seconds summary")
+            for quantile, value in zip(QUANTILES, snap["api"]["ttft_seconds"].values()):
+                add("api_ttft_seconds", value, {"quantile": quantile})
+            lines.append(f"# TYPE {METRIC_PREFIX}_api_inter_token_latency_seconds summary")
+            for quantile, value in zip(QUANTILES, snap["api"]["inter_token_latency_seconds"].values()):
+                add("api_inter_token_latency_seconds", value, {"quantile": quantile})
+        if snap["tools"]:
+            lines.append(f"# TYPE {METRIC_PREFIX}_tool_latency_seconds summary")
+        for tool_name, tool_stats in snap["tools"].items():
+            for quantile, value in zip(QUANTILES, tool_stats["latency_seconds"].values()):
+                add("tool_latency_seconds", value, {"tool": tool_name, "quantile": quantile})
+        add("tokens_total", snap["tokens"]["prompt"], {"type": "prompt"}, "counter")
+        add("tokens_total", snap["tokens"]["completion"], {"type": "completion"})
+        add("tokens_total", snap["tokens"]["total"], {"type": "total"})
+        add("tokens_per_second", snap["tokens"]["per_second"], metric_type="gauge")
+        if snap["rolling_avg_score"]:
+            lines.append(f"# TYPE {METRIC_PREFIX}_rolling_avg_score gauge")
+        for data_source, score in snap["rolling_avg_score"].items():
+            add("rolling_avg_score", score, {"data_source": data_source})
+        for name, value in snap["counters"].items():
+            add(name, value, metric_type="counter")
+        for name, value in snap["gauges"].items():
+            add(name, value, metric_type="gauge")
+        return "\n".join(lines) + "\n"
+
+
+def write_snapshot(metrics: EvaluationMetrics, snapshot_path: str) -> None:
+    """原子地写入 JSON 快照文件"""
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(metrics.snapshot(), f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, snapshot_path)
+
+
+async def run_snapshot_writer(
+    metrics: EvaluationMetrics,
+    snapshot_path: str,
+    interval: float,
+    stop_event: asyncio.Event,
+) -> None:
+    """每隔 interval 秒采集并写入一次快照，stop_event 置位后写入最后一次快照并退出"""
+    while not stop_event.is_set():
+        try:
+            await asyncio.wait_for(stop_event.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+        # 采集在事件循环中进行，写文件放到线程中
+        metrics.collect()
+        try:
+            await asyncio.to_thread(write_snapshot, metrics, snapshot_path)
+        except Exception as e:
+            print(f"⚠️ 写入指标快照失败: {e}")
+
+
+async def run_metrics_collector(
+    metrics: EvaluationMetrics,
+    interval: float,
+    stop_event: asyncio.Event,
+) -> None:
+    """每隔 interval 秒在事件循环中运行一次采集函数，供 HTTP 端点读取，stop_event 置位后退出"""
+    while not stop_event.is_set():
+        metrics.collect()
+        try:
+            await asyncio.wait_for(stop_event.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+    metrics.collect()
+
+
+def start_metrics_server(metrics: EvaluationMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    在后台线程中启动指标 HTTP 服务
+
+    Returns:
+        ThreadingHTTPServer: 调用 shutdown() 和 server_close() 停止服务
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+                content_type = "application/json; charset=utf-8"
+            elif self.path.startswith("/metrics"):
+                body = metrics.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 不输出访问日志，避免干扰进度条
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="eval-metrics-server", daemon=True)
+    thread.start()
+    print(f"📈 指标服务已启动: http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,722 @@
+"""
+评测报告统计
+
+- EvaluationStatsAccumulator：在线累加器，每写入一条结果更新一次，状态大小只与
+  data_source/generator 分组数（以及失败样本数）相关，生成报告时无需重新读取结果文件
+- 统计旁路文件（<result_path>.stats，JSONL 格式）：只保存报告需要的字段，断点重试和离线重建
+  报告时读取该文件即可，无需解析完整的 messages/context
+- save_csv_report / print_console_report：CSV 报告与控制台报告输出
+
+离线重建报告:
+    python -m internbootcamp.utils.eval_report <eval_results.jsonl> [--summary-path xxx.csv]
+"""
+
+import copy
+import csv
+import json
+import os
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from internbootcamp.utils.eval_metrics import TIMING_PHASES
+from internbootcamp.utils.result_format import open_result_lines, result_file_stem
+
+STATS_SUFFIX = ".stats"
+
+
+def stats_path_for(result_path: str) -> str:
+    """获取结果文件对应的统计旁路文件路径"""
+    return result_path + STATS_SUFFIX
+
+
+def calculate_tool_statistics(turn_record: dict) -> Tuple[int, int, int]:
+    """
+    计算工具相关统计数据
+
+    Args:
+        turn_record: 包含每轮交互记录的字典
+
+    Returns:
+        Tuple[int, int, int]: (总assistant轮数, 总工具调用次数, 总interaction轮数)
+    """
+    total_assistant_turns = 0
+    total_tool_calls = 0
+    total_interaction_turns = 0
+    for turn_key, turn_data in (turn_record or {}).items():
+        if turn_key.startswith("interaction_turn_"):
+            total_assistant_turns += turn_data.get("assistant_turns", 0)
+            total_tool_calls += turn_data.get("tool_calls_executed", 0)
+            total_interaction_turns += 1
+    return total_assistant_turns, total_tool_calls, total_interaction_turns
+
+
+def extract_stat_fields(result: dict) -> dict:
+    """
+    从完整结果中提取报告所需字段，写入统计旁路文件
+
+    turn_record 折叠为 tool_stats，返回的记录可直接传给 EvaluationStatsAccumulator.update
+    """
+    input_data = result.get("input") or {}
+    extra_info = input_data.get("extra_info") or {}
+    assistant_turns, tool_calls, interaction_turns = calculate_tool_statistics(result.get("turn_record", {}))
+    record = {
+        "success": result.get("success", False),
+        "score": result.get("score"),
+        "input": {
+            "data_source": input_data.get("data_source", "Unknown"),
+            "id": input_data.get("id", "Unknown"),
+            "extra_info": {"generator_name": extra_info.get("generator_name", "")},
+        },
+        "tool_stats": {
+            "assistant_turns": assistant_turns,
+            "tool_calls": tool_calls,
+            "interaction_turns": interaction_turns,
+        },
+        "prompt_tokens": result.get("prompt_tokens", 0),
+        "global_seq_tokens": result.get("global_seq_tokens", 0),
+        "token_usage": result.get("token_usage", {}),
+        "timing": result.get("timing", {}),
+    }
+    if result.get("context_exhausted"):
+        record["context_exhausted"] = True
+    if result.get("cached_api_calls"):
+        record["cached_api_calls"] = result["cached_api_calls"]
+    if not record["success"]:
+        record["error"] = result.get("error", "Unknown error")
+    if result.get("sample_key"):
+        record["sample_key"] = result["sample_key"]
+    if result.get("evaluation_config"):
+        record["evaluation_config"] = result["evaluation_config"]
+    return record
+
+
+def _new_group_stats() -> dict:
+    return {
+        "total_count": 0,
+        "success_count": 0,
+        "error_count": 0,
+        "total_score": 0,
+        "avg_score": 0,
+        "max_score": float('-inf'),  # 最高分数
+        "min_score": float('inf'),   # 最低分数
+        "total_assistant_turns": 0,  # 总assistant轮数
+        "avg_assistant_turns": 0,    # 平均assistant轮数
+        "total_tool_calls": 0,       # 总工具调用次数
+        "avg_tool_calls": 0,         # 平均工具调用次数
+        "total_interaction_turns": 0,  # 总interaction轮数
+        "avg_interaction_turns": 0,    # 平均interaction轮数
+        "total_initial_prompt_tokens": 0,      # 初始 prompt tokens
+        "avg_initial_prompt_tokens": 0,        # 平均初始 prompt tokens
+        "total_global_seq_tokens": 0,  # 总 global sequence tokens
+        "avg_global_seq_tokens": 0,    # 平均 global sequence tokens
+        "total_cumulative_prompt_tokens": 0,   # 总 combined prompt tokens
+        "total_completion_tokens": 0,  # 总 completion tokens
+        "total_tokens": 0,             # 总 tokens
+        "avg_cumulative_prompt_tokens": 0,     # 平均 prompt tokens
+        "avg_completion_tokens": 0,    # 平均 completion tokens
+        "avg_tokens": 0,               # 平均 tokens
+        "context_exhausted_count": 0,  # 因上下文 token 预算耗尽而结束的样本数
+        "timing_count": 0,     # 带 timing 字段的样本数（不含命中响应缓存的样本）
+        "total_timing": {},    # 各阶段累计耗时（秒）
+        "avg_timing": {},      # 各阶段平均耗时（秒/样本）
+    }
+
+
+def _finalize_group_stats(stats: dict) -> None:
+    """计算平均值；没有成功样本时重置最大最小分数"""
+    if stats["timing_count"] > 0:
+        stats["avg_timing"] = {
+            phase: seconds / stats["timing_count"] for phase, seconds in stats["total_timing"].items()
+        }
+    success_count = stats["success_count"]
+    if success_count > 0:
+        stats["avg_score"] = stats["total_score"] / success_count
+        stats["avg_assistant_turns"] = stats["total_assistant_turns"] / success_count
+        stats["avg_tool_calls"] = stats["total_tool_calls"] / success_count
+        stats["avg_cumulative_prompt_tokens"] = stats["total_cumulative_prompt_tokens"] / success_count
+        stats["avg_completion_tokens"] = stats["total_completion_tokens"] / success_count
+        stats["avg_tokens"] = stats["total_tokens"] / success_count
+        stats["avg_interaction_turns"] = stats["total_interaction_turns"] / success_count
+        stats["avg_initial_prompt_tokens"] = stats["total_initial_prompt_tokens"] / success_count
+        stats["avg_global_seq_tokens"] = stats["total_global_seq_tokens"] / success_count
+    else:
+        stats["max_score"] = 0
+        stats["min_score"] = 0
+        stats["avg_assistant_turns"] = 0
+        stats["avg_tool_calls"] = 0
+        stats["avg_interaction_turns"] = 0
+        stats["avg_cumulative_prompt_tokens"] = 0
+        stats["avg_completion_tokens"] = 0
+        stats["avg_tokens"] = 0
+        stats["avg_initial_prompt_tokens"] = 0
+        stats["avg_global_seq_tokens"] = 0
+
+
+class EvaluationStatsAccumulator:
+    """
+    评测统计在线累加器
+
+    示例用法:
+        accumulator = EvaluationStatsAccumulator()
+        for result in results:
+            accumulator.update(result)
+        report_data = accumulator.build_report(basic_info)
+    """
+
+    def __init__(self):
+        self.sample_count = 0
+        self.success_count = 0
+        self.score_sum = 0
+        self.context_exhausted_count = 0
+        # 命中响应缓存的样本数（其耗时不计入分阶段耗时统计）
+        self.cached_count = 0
+        # Group statistics by data_source (one-to-many relationship: one data_source corresponds to multiple generators)
+        self.data_source_stats: Dict[str, dict] = {}
+        # Detailed failure analysis
+        self.error_analysis = {"errors": [], "error_types": {}}
+
+    def update(self, r: dict) -> None:
+        """累加一条结果（完整结果或 extract_stat_fields 的输出均可）"""
+        if not isinstance(r, dict):
+            return
+        self.sample_count += 1
+        if r.get("success"):
+            self.success_count += 1
+            if isinstance(r.get("score"), (int, float)):
+                self.score_sum += r.get("score", 0)
+
+        # Get data_source and generator_name
+        data_source = r.get("input", {}).get("data_source", "Unknown")
+        generator_name = r.get("input", {}).get("extra_info", {}).get("generator_name", "")
+
+        if data_source not in self.data_source_stats:
+            self.data_source_stats[data_source] = {**_new_group_stats(), "generators": {}}
+        ds_stats = self.data_source_stats[data_source]
+        if generator_name and generator_name not in ds_stats["generators"]:
+            ds_stats["generators"][generator_name] = _new_group_stats()
+        gen_stats = ds_stats["generators"][generator_name] if generator_name else None
+
+        ds_stats["total_count"] += 1
+
+        # 分阶段耗时（成功与失败样本都统计）；命中响应缓存的样本没有真实的 API 耗时，不计入
+        timing = r.get("timing")
+        if r.get("cached_api_calls"):
+            self.cached_count += 1
+        elif isinstance(timing, dict) and timing:
+            for group_stats in (ds_stats, gen_stats):
+                if group_stats is None:
+                    continue
+                group_stats["timing_count"] += 1
+                for phase, seconds in timing.items():
+                    if isinstance(seconds, (int, float)):
+                        group_stats["total_timing"][phase] = group_stats["total_timing"].get(phase, 0) + seconds
+
+        if r.get("success"):
+            ds_stats["success_count"] += 1
+            current_score = r.get("score", 0)
+            if isinstance(current_score, (int, float)):
+                ds_stats["total_score"] += current_score
+                ds_stats["max_score"] = max(ds_stats["max_score"], current_score)
+                ds_stats["min_score"] = min(ds_stats["min_score"], current_score)
+
+            # 计算工具调用统计数据
+            if "tool_stats" in r:
+                tool_stats = r["tool_stats"]
+                assistant_turns = tool_stats.get("assistant_turns", 0)
+                tool_calls = tool_stats.get("tool_calls", 0)
+                interaction_turns = tool_stats.get("interaction_turns", 0)
+            else:
+                assistant_turns, tool_calls, interaction_turns = calculate_tool_statistics(r.get("turn_record", {}))
+            ds_stats["total_assistant_turns"] += assistant_turns
+            ds_stats["total_tool_calls"] += tool_calls
+            ds_stats["total_interaction_turns"] += interaction_turns
+
+            # sample token usage statistics
+            ds_stats["total_initial_prompt_tokens"] += (r.get("prompt_tokens") or 0)
+            ds_stats["total_global_seq_tokens"] += (r.get("global_seq_tokens") or 0)
+
+            # 累计 token usage使用统计
+            token_usage = r.get("token_usage", {})
+            ds_stats["total_global_seq_tokens"] += token_usage.get("global_seq_tokens", 0)
+            ds_stats["total_cumulative_prompt_tokens"] += token_usage.get("prompt_tokens", 0)
+            ds_stats["total_completion_tokens"] += token_usage.get("completion_tokens", 0)
+            ds_stats["total_tokens"] += token_usage.get("total_tokens", 0)
+            context_exhausted = 1 if r.get("context_exhausted") else 0
+            ds_stats["context_exhausted_count"] += context_exhausted
+            self.context_exhausted_count += context_exhausted
+
+            # Update generator level statistics
+            if gen_stats is not None:
+                gen_stats["total_count"] += 1
+                gen_stats["success_count"] += 1
+                if isinstance(current_score, (int, float)):
+                    gen_stats["total_score"] += current_score
+                    gen_stats["max_score"] = max(gen_stats["max_score"], current_score)
+                    gen_stats["min_score"] = min(gen_stats["min_score"], current_score)
+                gen_stats["total_assistant_turns"] += assistant_turns
+                gen_stats["total_tool_calls"] += tool_calls
+                gen_stats["total_interaction_turns"] += interaction_turns
+                gen_stats["total_initial_prompt_tokens"] += (r.get("prompt_tokens") or 0)
+                gen_stats["total_global_seq_tokens"] += (r.get("global_seq_tokens") or 0)
+                gen_stats["total_cumulative_prompt_tokens"] += token_usage.get("prompt_tokens", 0)
+                gen_stats["total_completion_tokens"] += token_usage.get("completion_tokens", 0)
+                gen_stats["total_tokens"] += token_usage.get("total_tokens", 0)
+                gen_stats["context_exhausted_count"] += context_exhausted
+        else:
+            ds_stats["error_count"] += 1
+            if gen_stats is not None:
+                gen_stats["total_count"] += 1
+                gen_stats["error_count"] += 1
+
+            # Record error information
+            self.error_analysis["errors"].append({
+                "data_source": data_source,
+                "generator_name": generator_name,
+                "error": r.get("error", "Unknown error"),
+                "input_id": r.get("input", {}).get("id", "Unknown")
+            })
+            # 统计错误类型
+            error_type = str(r.get("error", "Unknown error"))[:50]
+            self.error_analysis["error_types"][error_type] = self.error_analysis["error_types"].get(error_type, 0) + 1
+
+    def build_report(
+        self,
+        basic_info: dict,
+        avg_score: Optional[float] = None,
+        total: Optional[int] = None,
+    ) -> dict:
+        """
+        根据当前累加状态生成报告数据，不修改累加器本身，可在评测过程中多次调用
+
+        Returns:
+            dict: 包含 basic_info/overall_stats/data_source_stats/error_analysis 的报告数据
+        """
+        if total is None:
+            total = self.sample_count
+        if avg_score is None:
+            avg_score = self.score_sum / total if total > 0 else 0
+
+        data_source_stats = copy.deepcopy(self.data_source_stats)
+        for stats in data_source_stats.values():
+            _finalize_group_stats(stats)
+            for gen_stats in stats["generators"].values():
+                _finalize_group_stats(gen_stats)
+
+        return {
+            "basic_info": basic_info,
+            "overall_stats": {
+                "total_samples": total,
+                "success_count": self.success_count,
+                "error_count": total - self.success_count,
+                "success_rate": self.success_count / total if total > 0 else 0,
+                "overall_avg_score": avg_score,
+                "context_exhausted_count": self.context_exhausted_count,
+                "cached_count": self.cached_count,
+            },
+            "data_source_stats": data_source_stats,
+            "error_analysis": {
+                "errors": list(self.error_analysis["errors"]),
+                "error_types": dict(self.error_analysis["error_types"]),
+            },
+        }
+
+
+def iter_stat_records(result_path: str) -> Iterator[dict]:
+    """
+    逐条读取结果文件的统计记录
+
+    优先读取统计旁路文件；旁路文件不存在时（如旧版本生成的结果文件）流式扫描结果文件，
+    提取统计字段并据此重建旁路文件。
+    """
+    stats_path = stats_path_for(result_path)
+    if os.path.exists(stats_path):
+        with open(stats_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    if not os.path.exists(result_path):
+        return
+    tmp_path = stats_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        for line in open_result_lines(result_path):
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            if not isinstance(result, dict):
+                continue
+            record = extract_stat_fields(result)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            yield record
+    os.replace(tmp_path, stats_path)
+
+
+def basic_info_from_config(evaluation_config: Optional[dict], output_path: str, dataset_path: Optional[str] = None, yaml_tool_path: Optional[str] = None) -> dict:
+    """根据结果中的 evaluation_config 构造报告的 basic_info"""
+    evaluation_config = evaluation_config or {}
+    return {
+        "model": evaluation_config.get("model", "Unknown"),
+        "dataset_path": dataset_path if dataset_path else "Passed-in dataset",
+        "tool_config": yaml_tool_path if yaml_tool_path else "Default",
+        "output_path": output_path,
+        "max_assistant_turns": evaluation_config.get("max_assistant_turns"),
+        "max_user_turns": evaluation_config.get("max_user_turns"),
+        "api_extra_params": evaluation_config.get("api_extra_params", {}),
+        "api_extra_headers": evaluation_config.get("api_extra_headers", {}),
+    }
+
+
+def rebuild_report(
+    result_path: str,
+    summary_path: Optional[str] = None,
+    dataset_path: Optional[str] = None,
+    yaml_tool_path: Optional[str] = None,
+    print_report: bool = True,
+) -> dict:
+    """
+    从已有结果文件重建评测报告（不调用模型）
+
+    Args:
+        result_path: 结果文件路径（.jsonl）
+        summary_path: CSV 报告路径，默认与结果文件同名
+        dataset_path / yaml_tool_path: 仅用于报告中的 basic_info 展示
+        print_report: 是否打印控制台报告
+
+    Returns:
+        dict: 报告数据
+    """
+    accumulator = EvaluationStatsAccumulator()
+    evaluation_config = None
+    for record in iter_stat_records(result_path):
+        if evaluation_config is None and record.get("evaluation_config"):
+            evaluation_config = record["evaluation_config"]
+        accumulator.update(record)
+
+    basic_info = basic_info_from_config(evaluation_config, result_path, dataset_path, yaml_tool_path)
+    report_data = accumulator.build_report(basic_info)
+    save_csv_report(summary_path or result_file_stem(result_path) + ".csv", report_data)
+    if print_report:
+        print_console_report(report_data)
+    return report_data
+
+
+def save_csv_report(summary_path: str, report_data: dict) -> None:
+    """
+    保存结构化的 CSV 评测报告
+    """
+    with open(summary_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+
+        # 1. Basic Evaluation Information
+        writer.writerow(["Basic Evaluation Information"])
+        writer.writerow(["Item", "Value"])
+        for key, value in report_data["basic_info"].items():
+            key_en = {
+                "model": "Evaluation Model",
+                "dataset_path": "Dataset Path", 
+                "tool_config": "Tool Configuration",
+                "output_path": "Output Path",
+                "max_tool_turns": "Max Tool Turns",
+                "max_assistant_turns": "Max Assistant Turns",
+                "max_user_turns": "Max User Turns"
+            }.get(key, key)
+            writer.writerow([key_en, value])
+
+        writer.writerow([])  # 空行分隔
+
+        # 2. Overall Statistics
+        writer.writerow(["Overall Statistics"])
+        writer.writerow(["Metric", "Value"])
+        overall = report_data["overall_stats"]
+        writer.writerow(["Total Samples", overall["total_samples"]])
+        writer.writerow(["Successful Samples", overall["success_count"]])
+        writer.writerow(["Failed Samples", overall["error_count"]])
+        writer.writerow(["Success Rate", f"{overall['success_rate']:.2%}"])
+        writer.writerow(["Overall Average Score", f"{overall['overall_avg_score']:.4f}"])
+        writer.writerow(["Context Exhausted Samples", overall.get("context_exhausted_count", 0)])
+        writer.writerow(["Cached Samples", overall.get("cached_count", 0)])
+
+        writer.writerow([])  # 空行分隔
+
+        # 3. Data Source Summary Statistics
+        if report_data["data_source_stats"]:
+            writer.writerow(["Data Source Summary Statistics"])
+            writer.writerow(["Data Source", "Total Samples", '',"Success Count", "Failed Count", "Success Rate", 
+                        "Average Score", "Max Score", "Min Score", "Avg Assistant Turns", "Avg Tool Calls", "Avg Interaction Turns", "Avg Initial Prompt Tokens", "Avg Completion Tokens", "Avg Global Sequence Tokens",
+                        "Avg Cumulative Prompt Tokens", "Avg Total Tokens", "Context Exhausted"])
+
+            for data_source, stats in report_data["data_source_stats"].items():
+                success_rate = stats["success_count"] / stats["total_count"] if stats["total_count"] > 0 else 0
+                writer.writerow([
+                    data_source,
+                    stats["total_count"],
+                    '',
+                    stats["success_count"], 
+                    stats["error_count"],
+                    f"{success_rate:.2%}",
+                    f"{stats['avg_score']:.4f}",
+                    f"{stats['max_score']:.4f}",
+                    f"{stats['min_score']:.4f}",
+                    f"{stats['avg_assistant_turns']:.2f}",
+                    f"{stats['avg_tool_calls']:.2f}",
+                    f"{stats['avg_interaction_turns']:.2f}",
+                    f"{stats['avg_initial_prompt_tokens']:.2f}",
+                    f"{stats['avg_completion_tokens']:.2f}",
+                    f"{stats['avg_global_seq_tokens']:.2f}",
+                    f"{stats['avg_cumulative_prompt_tokens']:.2f}",
+                    f"{stats['avg_tokens']:.2f}",
+                    stats.get("context_exhausted_count", 0),
+                ])
+
+            writer.writerow([])  # 空行分隔
+
+            # 4. Generator Detailed Statistics (Flattened Table)
+            writer.writerow(["Generator Detailed Statistics"])
+            writer.writerow(["Data Source", "Generator Name", "Sample Count", "Success Count", "Failed Count", 
+                        "Success Rate", "Average Score", "Max Score", "Min Score", "Avg Assistant Turns", "Avg Tool Calls", "Avg Interaction Turns",
+                        "Avg Initial Prompt Tokens", "Avg Completion Tokens", "Avg Cumulative Prompt Tokens","Avg Global Sequence Tokens",
+                        "Avg Total Tokens", "Context Exhausted"])
+
+            for data_source, stats in report_data["data_source_stats"].items():
+                if stats["generators"]:
+                    # 按generator_name字典序排序Generator
+                    sorted_generators = sorted(stats["generators"].items(), key=lambda x: x[0])
+                    for generator_name, gen_stats in sorted_generators:
+                        gen_success_rate = gen_stats["success_count"] / gen_stats["total_count"] if gen_stats["total_count"] > 0 else 0
+                        writer.writerow([
+                            data_source,
+                            generator_name,
+                            gen_stats["total_count"],
+                            gen_stats["success_count"],
+                            gen_stats["error_count"],
+                            f"{gen_success_rate:.2%}",
+                            f"{gen_stats['avg_score']:.4f}",
+                            f"{gen_stats['max_score']:.4f}",
+                            f"{gen_stats['min_score']:.4f}",
+                            f"{gen_stats['avg_assistant_turns']:.2f}",
+                            f"{gen_stats['avg_tool_calls']:.2f}",
+                            f"{gen_stats['avg_interaction_turns']:.2f}",
+                            f"{gen_stats['avg_initial_prompt_tokens']:.2f}",
+                            f"{gen_stats['avg_completion_tokens']:.2f}",
+                            f"{gen_stats['avg_global_seq_tokens']:.2f}",
+                            f"{gen_stats['avg_cumulative_prompt_tokens']:.2f}",
+                            f"{gen_stats['avg_tokens']:.2f}",
+                            gen_stats.get("context_exhausted_count", 0),
+                        ])
+                else:
+                    # 如果没有生成器信息，显示数据源本身
+                    ds_success_rate = stats["success_count"] / stats["total_count"] if stats["total_count"] > 0 else 0
+                    writer.writerow([
+                        data_source,
+                        "N/A",
+                        stats["total_count"],
+                        stats["success_count"],
+                        stats["error_count"],
+                        f"{ds_success_rate:.2%}",
+                        f"{stats['avg_score']:.4f}",
+                        f"{stats['max_score']:.4f}",
+                        f"{stats['min_score']:.4f}",
+                        f"{stats['avg_assistant_turns']:.2f}",
+                        f"{stats['avg_tool_calls']:.2f}",
+                        f"{stats['avg_interaction_turns']:.2f}",
+                        f"{stats['avg_initial_prompt_tokens']:.2f}",
+                        f"{stats['avg_completion_tokens']:.2f}",
+                        f"{stats['avg_global_seq_tokens']:.2f}",
+                        f"{stats['avg_cumulative_prompt_tokens']:.2f}",
+                        f"{stats['avg_completion_tokens']:.2f}",
+                        f"{stats['avg_tokens']:.2f}",
+                        f"{stats['avg_interaction_turns']:.2f}"
+                    ])
+
+            writer.writerow([])  # 空行分隔
+
+            # 5. Phase Timing Statistics
+            if any(stats["timing_count"] for stats in report_data["data_source_stats"].values()):
+                writer.writerow(["Phase Timing Statistics (avg seconds per sample)"])
+                writer.writerow(["Data Source", "Generator Name", "Timed Samples", *[f"Avg {phase}" for phase in TIMING_PHASES]])
+                for data_source, stats in report_data["data_source_stats"].items():
+                    rows = [("ALL", stats)] + sorted(stats["generators"].items(), key=lambda x: x[0])
+                    for generator_name, group_stats in rows:
+                        if not group_stats["timing_count"]:
+                            continue
+                        writer.writerow([
+                            data_source,
+                            generator_name,
+                            group_stats["timing_count"],
+                            *[f"{group_stats['avg_timing'].get(phase, 0):.4f}" for phase in TIMING_PHASES],
+                        ])
+
+                writer.writerow([])  # 空行分隔
+
+        # 6. Retry Statistics（按错误类型统计的模型请求与工具调用重试）
+        retry_stats = report_data.get("retry_stats") or {}
+        if any(retry_stats.values()):
+            writer.writerow(["Retry Statistics"])
+            writer.writerow(["Scope", "Error Class", "Errors", "Retries", "Budget Exhausted"])
+            for scope, class_stats in retry_stats.items():
+                for error_class, stats in sorted(class_stats.items()):
+                    writer.writerow([scope, error_class, stats["errors"], stats["retries"], stats["budget_exhausted"]])
+            writer.writerow([])  # 空行分隔
+
+        # 7. Error Analysis
+        if report_data["error_analysis"]["errors"]:
+            writer.writerow(["Error Type Statistics"])
+            writer.writerow(["Error Type", "Occurrence Count"])
+            for error_type, count in report_data["error_analysis"]["error_types"].items():
+                writer.writerow([error_type, count])
+
+            writer.writerow([])  # 空行分隔
+
+            writer.writerow(["Detailed Error Information"])
+            writer.writerow(["Generator Name", "Data Source", "Sample ID", "Error Message"])
+            for error in report_data["error_analysis"]["errors"]:
+                writer.writerow([
+                    error["generator_name"] if error["generator_name"] else "N/A", 
+                    error["data_source"], 
+                    error["input_id"], 
+                    error["error"]
+                ])
+
+
+def print_console_report(report_data: dict) -> None:
+    """
+    Print formatted console report
+    """
+    # Output file path
+    print(f"\n💾 Evaluation report saved to: {result_file_stem(report_data['basic_info']['output_path'])}.csv")
+
+    # Overall Summary Section
+    overall = report_data["overall_stats"]
+    print(f"\n{'='*100}")
+    print(f"{'📊 EVALUATION SUMMARY':^100}")
+    print(f"{'='*100}")
+    print(f"  ✅ Overall Status     : {overall['success_count']}/{overall['total_samples']} successful (Success Rate: {overall['success_rate']:.1%})")
+    print(f"  📈 Average Score      : {overall['overall_avg_score']:.4f}")
+    if overall.get("context_exhausted_count"):
+        print(f"  📏 Context Exhausted  : {overall['context_exhausted_count']} samples ended by the context token budget")
+    if overall.get("cached_count"):
+        print(f"  🗄️ Cached Samples     : {overall['cached_count']} samples replayed from the response cache (excluded from timing)")
+    for scope, class_stats in (report_data.get("retry_stats") or {}).items():
+        if class_stats:
+            retries = sum(stats["retries"] for stats in class_stats.values())
+            detail = ", ".join(f"{error_class}: {stats['errors']}" for error_class, stats in sorted(class_stats.items()))
+            print(f"  🔁 {scope.upper() + ' Retries':<19}: {retries} retries (errors by class - {detail})")
+    print(f"{'='*100}")
+
+    # Statistics grouped by data source (hierarchical structure)
+    if report_data["data_source_stats"]:
+        print(f"\n{'='*159}")
+        print(f"{'📋 STATISTICS BY DATA SOURCE':^159}")
+        print(f"{'='*159}")
+
+        # Define column widths for consistency
+        col_widths = {
+            'source': 20,
+            'samples': 10,
+            'success': 10,
+            'avg_score': 12,
+            'max_score': 12,
+            'min_score': 12,
+            'avg_assistant_turns': 20,
+            'avg_tool_calls': 15,
+            'avg_completion_tokens': 20,
+            'avg_interaction_turns': 20,
+        }
+
+        # Table header
+        header = (f"{'Data Source':<{col_widths['source']}} "
+                 f"{'Samples':>{col_widths['samples']}} "
+                 f"{'Success':>{col_widths['success']}} "
+                 f"{'Avg-Score':>{col_widths['avg_score']}} "
+                 f"{'Max-Score':>{col_widths['max_score']}} "
+                 f"{'Min-Score':>{col_widths['min_score']}} "
+                 f"{'Avg-Assistant-Turns':>{col_widths['avg_assistant_turns']}} "
+                 f"{'Avg-Tool-Calls':>{col_widths['avg_tool_calls']}} "
+                 f"{'Avg-Interaction-Turns':>{col_widths['avg_interaction_turns']}} "
+                 f"{'Avg-Completion-Tokens':>{col_widths['avg_completion_tokens']}}")
+        print(header)
+        print(f"{'-'*159}")
+
+        # 为数字列居中对齐，通过在列宽基础上向右偏移列宽/2
+        def center_value(val_str, width):
+            # 居中对齐字符串
+            return f"{val_str:^{width}}"
+
+        for data_source, stats in report_data["data_source_stats"].items():
+            success_rate = stats["success_count"] / stats["total_count"] if stats["total_count"] > 0 else 0
+
+            row = (
+                f"{data_source:<{col_widths['source']}} "
+                f"{center_value(str(stats['total_count']), col_widths['samples'])} "
+                f"{center_value(f'{success_rate:.1%}', col_widths['success'])} "
+                f"{center_value(f'{stats['avg_score']:.4f}', col_widths['avg_score'])} "
+                f"{center_value(f'{stats['max_score']:.4f}', col_widths['max_score'])} "
+                f"{center_value(f'{stats['min_score']:.4f}', col_widths['min_score'])} "
+                f"{center_value(f'{stats['avg_assistant_turns']:.2f}', col_widths['avg_assistant_turns'])} "
+                f"{center_value(f'{stats['avg_tool_calls']:.2f}', col_widths['avg_tool_calls'])} "
+                f"{center_value(f'{stats['avg_interaction_turns']:.2f}', col_widths['avg_interaction_turns'])} "
+                f"{center_value(f'{stats['avg_completion_tokens']:.2f}', col_widths['avg_completion_tokens'])}"
+            )
+            print(row)
+
+            # If there are generator subdivisions, show generator statistics
+            if stats["generators"]:
+                # Generator breakdown separator
+                separator_line = f"  {'└─ Generators:':<{col_widths['source']-2}}"
+                print(separator_line)
+
+                # 按generator_name字典序排序Generator
+                sorted_generators = sorted(stats["generators"].items(), key=lambda x: x[0])
+                for idx, (generator_name, gen_stats) in enumerate(sorted_generators):
+                    gen_success_rate = gen_stats["success_count"] / gen_stats["total_count"] if gen_stats["total_count"] > 0 else 0
+                    is_last = (idx == len(stats["generators"]) - 1)
+                    prefix = "  ● "
+
+                    # Adjust generator name width to account for prefix
+                    gen_name_width = col_widths['source'] - len(prefix)
+
+                    gen_row = (
+                        f"{prefix}{generator_name:<{gen_name_width}} "
+                        f"{center_value(str(gen_stats['total_count']), col_widths['samples'])} "
+                        f"{center_value(f'{gen_success_rate:.1%}', col_widths['success'])} "
+                        f"{center_value(f'{gen_stats['avg_score']:.4f}', col_widths['avg_score'])} "
+                        f"{center_value(f'{gen_stats['max_score']:.4f}', col_widths['max_score'])} "
+                        f"{center_value(f'{gen_stats['min_score']:.4f}', col_widths['min_score'])} "
+                        f"{center_value(f'{gen_stats['avg_assistant_turns']:.2f}', col_widths['avg_assistant_turns'])} "
+                        f"{center_value(f'{gen_stats['avg_tool_calls']:.2f}', col_widths['avg_tool_calls'])} "
+                        f"{center_value(f'{gen_stats['avg_interaction_turns']:.2f}', col_widths['avg_interaction_turns'])} "
+                        f"{center_value(f'{gen_stats['avg_completion_tokens']:.2f}', col_widths['avg_completion_tokens'])}"
+                    )
+                    print(gen_row)
+                print(f"{'-'*159}")
+
+        print(f"{'='*159}")
+
+    # Error Summary Section
+    if report_data["error_analysis"]["errors"]:
+        print(f"\n{'='*100}")
+        print(f"{'⚠️  ERROR SUMMARY':^100}")
+        print(f"{'='*100}")
+        print(f"  Total Errors: {len(report_data['error_analysis']['errors'])}")
+        print(f"\n  Main Error Types:")
+        for error_type, count in list(report_data["error_analysis"]["error_types"].items())[:3]:
+            print(f"    • {error_type:<80} ({count} occurrence{'s' if count > 1 else ''})")
+        print(f"{'='*100}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="从评测结果文件重建评测报告")
+    parser.add_argument("result_path", type=str, help="评测结果文件路径（.jsonl）")
+    parser.add_argument("--summary-path", type=str, default=None, help="CSV 报告输出路径，默认与结果文件同名")
+    parser.add_argument("--dataset-path", type=str, default=None, help="数据集路径（仅用于报告展示）")
+    parser.add_argument("--tool-config", type=str, default=None, help="工具配置路径（仅用于报告展示）")
+    args = parser.parse_args()
+
+    rebuild_report(
+        args.result_path,
+        summary_path=args.summary_path,
+        dataset_path=args.dataset_path,
+        yaml_tool_path=args.tool_config,
+    )
@@ -0,0 +1,194 @@
+"""
+评测 API 客户端的 HTTP 连接池配置
+
+httpx.AsyncClient 默认最多 100 个连接、20 个 keep-alive 连接，并发数较大时会在连接池排队
+并频繁重建连接。这里根据并发数显式配置连接池，并提供连接池使用情况统计。
+
+工具调用（BaseMCPTool）与工具服务器 Master 的转发使用 aiohttp：AiohttpSessionPool 按事件循环缓存
+长期存活的 ClientSession（连接复用、keep-alive、DNS 缓存），避免每次请求都新建 session 与 TCP 连接。
+"""
+
+import asyncio
+import weakref
+from typing import Dict, Hashable, Iterable, List, Optional
+
+import httpx
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+
+def build_http_client(
+    max_connections: int,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+    verify: bool = False,
+) -> httpx.AsyncClient:
+    """
+    创建连接池大小与并发数匹配的 httpx.AsyncClient
+
+    Args:
+        max_connections: 最大连接数（keep-alive 连接数与之相同，避免请求结束后关闭连接再重建）
+        keepalive_expiry: 空闲连接保持时间（秒）
+        http2: 是否启用 HTTP/2（需要安装 h2，未安装时回退到 HTTP/1.1）
+        verify: 是否校验 TLS 证书
+    """
+    if http2 and not H2_AVAILABLE:
+        print("⚠️ 未安装 h2 (pip install httpx[http2])，HTTP/2 已禁用")
+        http2 = False
+    max_connections = max(1, max_connections)
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    return httpx.AsyncClient(verify=verify, limits=limits, http2=http2)
+
+
+def build_timeout(
+    connect: float = 10.0,
+    read: Optional[float] = 600.0,
+    write: float = 60.0,
+    pool: Optional[float] = 60.0,
+) -> httpx.Timeout:
+    """分阶段超时：建立连接、读取响应（两次收到数据的最大间隔）、发送请求、等待连接池空闲连接"""
+    return httpx.Timeout(connect=connect, read=read, write=write, pool=pool)
+
+
+def http_pool_stats(clients: Iterable[httpx.AsyncClient]) -> dict:
+    """
+    汇总连接池使用情况
+
+    Returns:
+        dict: max_connections（上限）、connections（已建立）、active（使用中）、idle（空闲）、
+        waiting（等待连接的请求数）、utilization（active / max_connections）
+    """
+    stats = {"max_connections": 0, "connections": 0, "active": 0, "idle": 0, "waiting": 0}
+    for client in clients:
+        # httpcore 连接池未公开统计接口，按其内部结构读取，读取失败时跳过
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        if pool is None:
+            continue
+        try:
+            connections = list(pool.connections)
+            active = sum(1 for connection in connections if not connection.is_idle())
+            stats["max_connections"] += pool._max_connections or 0
+            stats["connections"] += len(connections)
+            stats["active"] += active
+            stats["idle"] += len(connections) - active
+            stats["waiting"] += sum(1 for request in pool._requests if request.connection is None)
+        except Exception:
+            continue
+    stats["utilization"] = stats["active"] / stats["max_connections"] if stats["max_connections"] else 0.0
+    return stats
+
+
+def build_aiohttp_session(
+    limit: int = 256,
+    limit_per_host: int = 0,
+    keepalive_timeout: float = 30.0,
+    dns_cache_ttl: Optional[int] = 300,
+) -> "aiohttp.ClientSession":
+    """
+    创建长期复用的 aiohttp.ClientSession（需在事件循环中调用）
+
+    Args:
+        limit: 最大连接数，0 表示不限制
+        limit_per_host: 每个目标主机的最大连接数，0 表示不限制
+        keepalive_timeout: 空闲连接保持时间（秒）
+        dns_cache_ttl: DNS 缓存时间（秒），None 表示永久缓存
+
+    session 不设置总超时，由各请求自行指定。
+    """
+    if not AIOHTTP_AVAILABLE:
+        raise ImportError("需要安装 aiohttp (pip install aiohttp)")
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=dns_cache_ttl,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None))
+
+
+class AiohttpSessionPool:
+    """
+    按事件循环与键缓存 aiohttp.ClientSession（session 不能跨事件循环使用），首次使用时创建
+
+    示例用法:
+        pool = AiohttpSessionPool(limit_per_host=64)
+        session = pool.get(worker_url)
+        async with session.post(url, json=data) as response:
+            ...
+        await pool.close()
+    """
+
+    def __init__(self, **session_kwargs):
+        self.session_kwargs = session_kwargs
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, aiohttp.ClientSession]]" = weakref.WeakKeyDictionary()
+
+    def get(self, key: Hashable = None, **session_kwargs) -> "aiohttp.ClientSession":
+        """获取当前事件循环中 key 对应的 session；session_kwargs 覆盖池的默认连接参数（仅在创建时生效）"""
+        loop = asyncio.get_running_loop()
+        sessions = self._sessions.setdefault(loop, {})
+        session = sessions.get(key)
+        if session is None or session.closed:
+            session = build_aiohttp_session(**{**self.session_kwargs, **session_kwargs})
+            sessions[key] = session
+        return session
+
+    def keys(self) -> List[Hashable]:
+        """当前事件循环中已创建 session 的键"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return []
+        return list(self._sessions.get(loop) or {})
+
+    async def close(self, *keys: Hashable) -> None:
+        """关闭当前事件循环中 keys 对应的 session，不指定 keys 时关闭全部"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        sessions = self._sessions.get(loop) or {}
+        for session_key in keys or list(sessions):
+            session = sessions.pop(session_key, None)
+            if session is not None and not session.closed:
+                await session.close()
+
+
+# 进程内共享的 session 池（BaseMCPTool 等工具客户端使用）
+_shared_aiohttp_pool = AiohttpSessionPool()
+
+
+def shared_aiohttp_session(
+    limit: int = 256,
+    limit_per_host: int = 0,
+    keepalive_timeout: float = 30.0,
+    dns_cache_ttl: Optional[int] = 300,
+) -> "aiohttp.ClientSession":
+    """当前事件循环中共享的 session，连接参数相同的调用方共用一个 session"""
+    key = (limit, limit_per_host, keepalive_timeout, dns_cache_ttl)
+    return _shared_aiohttp_pool.get(
+        key,
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        dns_cache_ttl=dns_cache_ttl,
+    )
+
+
+async def close_shared_aiohttp_sessions() -> None:
+    """关闭当前事件循环中共享的 session（评测结束时调用）"""
+    await _shared_aiohttp_pool.close()
@@ -0,0 +1,281 @@
+"""
+只重新评分（不调用模型）
+
+流式读取已有的评测结果文件（eval_results_*.jsonl），用（可能已修改的）奖励计算器根据
+response_context 重新计算 score 与 extracted_output，写出新的结果文件、断点重试索引、
+统计旁路文件与 CSV 报告。评分在进程池中按批并行执行，结果保持原有顺序。
+
+失败的样本（success 为 false）和缺少 response_context 的样本原样保留。精简格式（见 result_format）的结果
+按需渲染 response_context，渲染使用的 tokenizer 应与评测时一致（--tokenizer-path）。
+
+示例用法:
+    python -m internbootcamp.utils.rescore results/xxx/eval_results_xxx.jsonl \\
+        --reward-calculator-class internbootcamp.bootcamps.xxx.XxxRewardCalculator \\
+        --workers 16
+"""
+
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from internbootcamp.utils.eval_report import (
+    EvaluationStatsAccumulator,
+    basic_info_from_config,
+    extract_stat_fields,
+    print_console_report,
+    save_csv_report,
+    stats_path_for,
+)
+from internbootcamp.utils.load_class_from_str import load_class_from_string
+from internbootcamp.utils.result_format import (
+    is_zstd_path,
+    make_renderer,
+    open_result_lines,
+    response_context_of,
+    result_file_stem,
+    zstd_compressor,
+)
+from internbootcamp.utils.result_writer import encode_jsonl_line
+from internbootcamp.utils.resume_index import compute_sample_key, index_path_for
+
+# 工作进程中的评分配置，由 _init_worker 设置
+_worker_state: dict = {}
+
+
+def _init_worker(
+    reward_calculator_class: Optional[str],
+    registry: Dict[str, str],
+    verify_correction_kwargs: dict,
+    resume_key_field: Optional[str],
+    tokenizer_path: Optional[str] = None,
+) -> None:
+    _worker_state["default"] = load_class_from_string(reward_calculator_class) if reward_calculator_class else None
+    _worker_state["default_path"] = reward_calculator_class
+    _worker_state["registry"] = {data_source: load_class_from_string(path) for data_source, path in registry.items()}
+    _worker_state["registry_paths"] = dict(registry)
+    _worker_state["verify_correction_kwargs"] = verify_correction_kwargs
+    _worker_state["resume_key_field"] = resume_key_field
+    _worker_state["render"] = make_renderer(tokenizer_path)
+
+
+def rescore_record(record: dict) -> Tuple[dict, str]:
+    """
+    重新评分一条结果（需先调用 _init_worker）
+
+    Returns:
+        Tuple[dict, str]: (更新后的结果, 状态：rescored / skipped / failed)
+    """
+    if not record.get("success"):
+        return record, "skipped"
+    response_context = response_context_of(record, _worker_state["render"])
+    if response_context is None:
+        return record, "skipped"
+    data_source = (record.get("input") or {}).get("data_source")
+    reward_calculator = _worker_state["registry"].get(data_source, _worker_state["default"])
+    if reward_calculator is None:
+        return record, "skipped"
+    calculator_path = _worker_state["registry_paths"].get(data_source, _worker_state["default_path"])
+    ground_truth = record.get("ground_truth")
+    if ground_truth is None:
+        ground_truth = record["input"]["reward_model"]["ground_truth"]
+    verify_correction_kwargs = _worker_state["verify_correction_kwargs"]
+    try:
+        score = reward_calculator.verify_score(model_output=response_context, identity=ground_truth, **verify_correction_kwargs)
+        extracted_output = reward_calculator.extract_output(response_context)
+    except Exception as e:
+        record["score"] = 0
+        record["rescore_error"] = str(e)
+        return record, "failed"
+    record["score"] = score
+    record["extracted_output"] = extracted_output
+    record.pop("rescore_error", None)
+    evaluation_config = record.setdefault("evaluation_config", {})
+    evaluation_config["rescore"] = {
+        "reward_calculator_class": calculator_path,
+        "verify_correction_kwargs": verify_correction_kwargs,
+    }
+    return record, "rescored"
+
+
+def _rescore_lines(lines: List[str]) -> List[Tuple[bytes, dict, str, str, Optional[float], Optional[float]]]:
+    """工作进程：重新评分一批 JSONL 行"""
+    outputs = []
+    for line in lines:
+        record = json.loads(line)
+        old_score = record.get("score")
+        record, status = rescore_record(record)
+        sample_key = record.get("sample_key")
+        if not sample_key and record.get("input"):
+            sample_key = compute_sample_key(record["input"], _worker_state["resume_key_field"])
+        outputs.append((
+            encode_jsonl_line(record),
+            extract_stat_fields(record),
+            sample_key,
+            status,
+            old_score,
+            record.get("score"),
+        ))
+    return outputs
+
+
+def _iter_line_batches(result_path: str, batch_size: int) -> Iterator[List[str]]:
+    batch = []
+    for line in open_result_lines(result_path):
+        if not line.strip():
+            continue
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iter_rescored(batches: Iterator[List[str]], workers: int, init_args: tuple) -> Iterator[list]:
+    """按原有顺序产出评分结果；进程池中最多保留 workers * 2 个待完成批次，内存占用有界"""
+    if workers <= 1:
+        _init_worker(*init_args)
+        for batch in batches:
+            yield _rescore_lines(batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(_rescore_lines, batch))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def load_registry_calculators(bootcamp_registry: Optional[str]) -> Dict[str, str]:
+    """从 bootcamp 注册表（与 run_evaluation 的 --bootcamp-registry 格式相同）读取 data_source 到奖励计算器类路径的映射"""
+    registry = {}
+    if not bootcamp_registry:
+        return registry
+    with open(bootcamp_registry, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if item.get("data_source") and item.get("reward_calculator_class"):
+                registry[item["data_source"]] = item["reward_calculator_class"]
+    return registry
+
+
+def rescore_results(
+    result_path: str,
+    output_path: Optional[str] = None,
+    reward_calculator_class: Optional[str] = None,
+    bootcamp_registry: Optional[str] = None,
+    verify_correction_kwargs: Optional[dict] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 64,
+    resume_key_field: Optional[str] = None,
+    tokenizer_path: Optional[str] = None,
+    print_report: bool = True,
+) -> dict:
+    """
+    重新评分结果文件
+
+    Args:
+        result_path: 原结果文件路径（.jsonl）
+        output_path: 新结果文件路径，默认为 <原文件名>_rescored.jsonl（原文件压缩时为 .jsonl.zst）
+        reward_calculator_class: 奖励计算器类路径
+        bootcamp_registry: bootcamp 注册表路径，按 data_source 选择奖励计算器（优先于 reward_calculator_class）
+        verify_correction_kwargs: 传递给 verify_score 的额外参数
+        workers: 评分进程数，默认为 CPU 核数；<= 1 时在当前进程中执行
+        batch_size: 每个任务包含的结果条数
+        resume_key_field: 重建断点重试索引时使用的样本键字段（结果中没有 sample_key 时）
+        tokenizer_path: 精简格式结果渲染 response_context 使用的 tokenizer
+        print_report: 是否打印控制台报告
+
+    Returns:
+        dict: 报告数据
+    """
+    registry = load_registry_calculators(bootcamp_registry)
+    if not reward_calculator_class and not registry:
+        raise ValueError("必须提供 reward_calculator_class 或 bootcamp_registry")
+    if output_path is None:
+        output_path = result_file_stem(result_path) + "_rescored.jsonl" + (".zst" if is_zstd_path(result_path) else "")
+    if os.path.abspath(output_path) == os.path.abspath(result_path):
+        raise ValueError("输出路径不能与原结果文件相同")
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    init_args = (reward_calculator_class, registry, verify_correction_kwargs or {}, resume_key_field, tokenizer_path)
+    compressor = zstd_compressor() if is_zstd_path(output_path) else None
+
+    print(f"🔁 重新评分: {result_path} -> {output_path} (进程数: {workers})")
+    accumulator = EvaluationStatsAccumulator()
+    status_counts = {"rescored": 0, "skipped": 0, "failed": 0}
+    changed = 0
+    old_score_sum = 0.0
+    evaluation_config = None
+    tmp_paths = [output_path + ".tmp", index_path_for(output_path) + ".tmp", stats_path_for(output_path) + ".tmp"]
+    with open(tmp_paths[0], "wb") as out, open(tmp_paths[1], "w", encoding="utf-8") as index_out, \
+            open(tmp_paths[2], "wb") as stats_out:
+        for outputs in _iter_rescored(_iter_line_batches(result_path, batch_size), workers, init_args):
+            lines = []
+            for line, stat_record, sample_key, status, old_score, new_score in outputs:
+                lines.append(line)
+                stats_out.write(encode_jsonl_line(stat_record))
+                if sample_key:
+                    index_out.write(sample_key + "\n")
+                accumulator.update(stat_record)
+                status_counts[status] += 1
+                old_score_sum += old_score or 0
+                if old_score != new_score:
+                    changed += 1
+                if evaluation_config is None and stat_record.get("evaluation_config"):
+                    evaluation_config = stat_record["evaluation_config"]
+            data = b"".join(lines)
+            out.write(compressor.compress(data) if compressor else data)
+    for tmp_path in tmp_paths:
+        os.replace(tmp_path, tmp_path[:-len(".tmp")])
+
+    total = accumulator.sample_count
+    print(
+        f"✅ 重新评分完成: 共 {total} 条，重新评分 {status_counts['rescored']} 条，"
+        f"跳过 {status_counts['skipped']} 条，评分出错 {status_counts['failed']} 条，分数变化 {changed} 条"
+    )
+    if total:
+        print(f"📊 平均分: {old_score_sum / total:.4f} -> {accumulator.score_sum / total:.4f}")
+
+    basic_info = basic_info_from_config(evaluation_config, output_path)
+    report_data = accumulator.build_report(basic_info)
+    summary_path = result_file_stem(output_path) + ".csv"
+    save_csv_report(summary_path, report_data)
+    if print_report:
+        print_console_report(report_data)
+    return report_data
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from internbootcamp.utils.run_evaluation import parse_extra_params
+
+    parser = argparse.ArgumentParser(description="用奖励计算器重新评分已有评测结果（不调用模型）")
+    parser.add_argument("result_path", type=str, help="评测结果文件路径（.jsonl）")
+    parser.add_argument("--output-path", type=str, default=None, help="新结果文件路径，默认为 <原文件名>_rescored.jsonl")
+    parser.add_argument("--reward-calculator-class", type=str, default=None, help="奖励计算器类路径")
+    parser.add_argument("--bootcamp-registry", type=str, default=None, help="bootcamp 注册表路径，按 data_source 选择奖励计算器")
+    parser.add_argument("--verify-correction-kwargs", type=str, default=None, help="传递给奖励计算器的额外参数，格式同 run_evaluation")
+    parser.add_argument("--workers", type=int, default=None, help="评分进程数，默认为 CPU 核数")
+    parser.add_argument("--batch-size", type=int, default=64, help="每个评分任务包含的结果条数 (默认: 64)")
+    parser.add_argument("--resume-key-field", type=str, default=None, help="结果中没有 sample_key 时，重建索引使用的样本键字段")
+    parser.add_argument("--tokenizer-path", type=str, default=None, help="精简格式结果渲染 response_context 使用的 tokenizer（应与评测时一致）")
+    args = parser.parse_args()
+
+    rescore_results(
+        args.result_path,
+        output_path=args.output_path,
+        reward_calculator_class=args.reward_calculator_class,
+        bootcamp_registry=args.bootcamp_registry,
+        verify_correction_kwargs=parse_extra_params(args.verify_correction_kwargs) if args.verify_correction_kwargs else None,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        resume_key_field=args.resume_key_field,
+        tokenizer_path=args.tokenizer_path,
+    )
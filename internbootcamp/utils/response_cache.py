@@ -0,0 +1,159 @@
+"""
+API 响应磁盘缓存（SQLite）
+
+以请求 payload（_build_payload 的输出：模型、messages、tools、采样参数）的规范化 JSON 哈希为键，
+缓存 API 返回的响应字典。相同模型在相同数据集上重跑（如只修改了奖励计算器或
+verify_correction_kwargs）时直接命中缓存，无需重新请求模型。
+
+- 缓存按总大小做 LRU 淘汰（max_bytes）
+- 三种模式：readwrite（默认，读缓存并写入新响应）、readonly（只读）、
+  cache_only（只读且未命中时报错，不请求模型，用于只重新评分）
+- 注意：temperature > 0 时命中缓存会重放第一次采样的结果
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+CACHE_MODES = ("readwrite", "readonly", "cache_only")
+
+
+class ResponseCacheMiss(Exception):
+    """cache_only 模式下缓存未命中"""
+
+
+def payload_cache_key(payload: dict, extra: Optional[dict] = None) -> str:
+    """
+    计算请求的缓存键
+
+    Args:
+        payload: _build_payload 的输出
+        extra: 影响响应内容的客户端设置（如流式停止条件）
+    """
+    material = {"payload": payload, "extra": extra or {}}
+    canonical = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite 响应缓存，数据库操作在线程中执行，不阻塞事件循环
+
+    示例用法:
+        cache = ResponseCache("cache/responses.sqlite", max_bytes=10 * 1024 ** 3)
+        response = await cache.aget(key)
+        if response is None:
+            response = ...
+            await cache.aput(key, response)
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, mode: str = "readwrite", evict_every: int = 256):
+        """
+        Args:
+            path: SQLite 数据库文件路径
+            max_bytes: 缓存响应的总大小上限（字节），None 表示不限制
+            mode: readwrite / readonly / cache_only
+            evict_every: 每写入多少条检查一次大小上限
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"不支持的缓存模式: {mode}，可选: {CACHE_MODES}")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.evict_every = max(1, evict_every)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self.hits = 0
+        self.misses = 0
+
+    def reset_stats(self) -> None:
+        """清空命中/未命中计数（每次评测开始时调用）"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def writable(self) -> bool:
+        return self.mode == "readwrite"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if self.writable:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, response: Any) -> None:
+        if not self.writable:
+            return
+        data = json.dumps(response, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            conn.commit()
+            self._puts_since_evict += 1
+            if self.max_bytes is not None and self._puts_since_evict >= self.evict_every:
+                self._puts_since_evict = 0
+                self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """按最近访问时间淘汰，直到总大小不超过上限的 90%"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        keys = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+            if total - freed <= target:
+                break
+            keys.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+        conn.commit()
+
+    async def aget(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, response: Any) -> None:
+        await asyncio.to_thread(self.put, key, response)
+
+    def close(self) -> None:
+        """关闭数据库连接（之后再次访问会重新打开）"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
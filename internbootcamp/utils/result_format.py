@@ -0,0 +1,350 @@
+"""
+评测结果的存储格式
+
+完整格式（full）的每条结果中，对话会重复存储多次：input 中的 prompt、messages（prompt + 回复）、
+full_context（整段对话的渲染结果）与 response_context（回复部分的渲染结果）。
+精简格式（compact）只存储一次对话：
+- input 保留原样（prompt 只在这里存储一次），sample_key 作为样本引用
+- messages 只保留 prompt 之后的回复部分（assistant / tool / user 交互消息）
+- 不存储 full_context、response_context 与重复的 ground_truth，需要时用 expand_result 按需还原和渲染
+
+结果文件以 .zst 结尾时按 zstd 压缩（每批写入为一个独立的 frame，可追加写入与断点重试），
+需要安装 zstandard。另外可将结果导出为 Parquet 分片（export_parquet_shards），
+标量字段（score、success 等）为独立列，嵌套字段以 JSON 字符串存储；所有分片使用同一个固定 schema，
+不在固定列中的字段合并存储在 extra 列。
+
+命令行用法:
+    # 完整格式与精简格式互相转换（输出路径以 .zst 结尾时压缩）
+    python -m internbootcamp.utils.result_format convert eval_results_xxx.jsonl eval_results_xxx_compact.jsonl.zst --format compact
+    # 导出 Parquet 分片
+    python -m internbootcamp.utils.result_format parquet eval_results_xxx.jsonl --shard-size 10000
+"""
+
+import io
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+RESULT_FORMATS = ("full", "compact")
+RESULT_COMPRESSIONS = ("zstd",)
+ZSTD_SUFFIX = ".zst"
+
+# Parquet 分片中直接存储为列的标量字段及其类型（string / bool / float64 / int64）
+PARQUET_SCALAR_FIELDS = {
+    "sample_key": "string",
+    "success": "bool",
+    "score": "float64",
+    "reached_max_turns": "bool",
+    "time_budget_exhausted": "bool",
+    "context_exhausted": "bool",
+    "cached_api_calls": "int64",
+    "prompt_tokens": "int64",
+    "global_seq_tokens": "int64",
+    "error": "string",
+    "result_format": "string",
+}
+# 以 JSON 字符串存储的嵌套字段；其余字段合并为一个 JSON 对象存储在 extra 列
+PARQUET_JSON_FIELDS = (
+    "input",
+    "tools",
+    "messages",
+    "extracted_output",
+    "output",
+    "turn_record",
+    "token_usage",
+    "timing",
+    "evaluation_config",
+)
+
+# 渲染函数：render(messages, tools) -> str
+Renderer = Callable[[List[Dict[str, Any]], Optional[List[Dict]]], str]
+
+
+# ============= 精简格式 =============
+
+def is_compact(record: dict) -> bool:
+    return isinstance(record, dict) and record.get("result_format") == "compact"
+
+
+def _prompt_messages(input_data: dict) -> list:
+    """与评测时计算 response_context 的规则一致：优先使用 prompt 字段"""
+    if "prompt" in input_data:
+        return input_data["prompt"] or []
+    return input_data.get("messages") or []
+
+
+def compact_result(result: dict) -> dict:
+    """将完整格式的结果转换为精简格式"""
+    if not isinstance(result, dict) or is_compact(result):
+        return result
+    prompt_length = len(_prompt_messages(result.get("input") or {}))
+    compact = {
+        key: value
+        for key, value in result.items()
+        if key not in ("full_context", "response_context", "ground_truth", "messages")
+    }
+    compact["messages"] = (result.get("messages") or [])[prompt_length:]
+    compact["result_format"] = "compact"
+    return compact
+
+
+def response_messages(record: dict) -> list:
+    """结果中 prompt 之后的回复消息"""
+    if is_compact(record):
+        return record.get("messages") or []
+    prompt_length = len(_prompt_messages(record.get("input") or {}))
+    return (record.get("messages") or [])[prompt_length:]
+
+
+def response_context_of(record: dict, render: Optional[Renderer] = None) -> Optional[str]:
+    """结果的 response_context：完整格式直接读取，精简格式按需渲染"""
+    if record.get("response_context") is not None:
+        return record["response_context"]
+    if not is_compact(record) or not record.get("success"):
+        return None
+    return (render or default_renderer)(response_messages(record), None)
+
+
+def expand_result(record: dict, render: Optional[Renderer] = None) -> dict:
+    """
+    将精简格式的结果还原为完整格式
+
+    Args:
+        record: 结果（完整格式时原样返回）
+        render: 渲染函数，提供时同时还原 full_context 与 response_context（成功的样本）
+
+    Returns:
+        dict: 完整格式的结果
+    """
+    if not is_compact(record):
+        return record
+    expanded = {key: value for key, value in record.items() if key != "result_format"}
+    input_data = expanded.get("input") or {}
+    responses = record.get("messages") or []
+    expanded["messages"] = list(_prompt_messages(input_data)) + list(responses)
+    if record.get("success"):
+        ground_truth = (input_data.get("reward_model") or {}).get("ground_truth")
+        if ground_truth is not None:
+            expanded["ground_truth"] = ground_truth
+        if render is not None:
+            expanded["full_context"] = render(expanded["messages"], expanded.get("tools"))
+            expanded["response_context"] = render(responses, None)
+    return expanded
+
+
+def default_renderer(messages: List[Dict[str, Any]], tools: Optional[List[Dict]] = None) -> str:
+    """不使用 tokenizer 的渲染（与评测时未指定 tokenizer_path 的结果一致）"""
+    from internbootcamp.utils.context_render import render_messages
+    return render_messages(messages, tokenizer=None, tools=tools)
+
+
+def make_renderer(tokenizer_path: Optional[str] = None) -> Renderer:
+    """创建渲染函数；指定 tokenizer_path 时使用其 chat template（应与评测时的 tokenizer 一致）"""
+    if not tokenizer_path:
+        return default_renderer
+    from transformers import AutoTokenizer
+    from internbootcamp.utils.context_render import render_messages
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_path, trust_remote_code=True)
+    return lambda messages, tools=None: render_messages(messages, tokenizer=tokenizer, tools=tools)
+
+
+# ============= 文件读写 =============
+
+def is_zstd_path(path: str) -> bool:
+    return str(path).endswith(ZSTD_SUFFIX)
+
+
+def result_file_stem(result_path: str) -> str:
+    """去掉 .zst 与 .jsonl 后缀，用于派生 CSV 报告等文件路径"""
+    stem = str(result_path)
+    if stem.endswith(ZSTD_SUFFIX):
+        stem = stem[:-len(ZSTD_SUFFIX)]
+    if stem.endswith(".jsonl"):
+        stem = stem[:-len(".jsonl")]
+    return stem
+
+
+def zstd_compressor(level: int = 3):
+    """创建 zstd 压缩器（未安装 zstandard 时报错）"""
+    if not ZSTD_AVAILABLE:
+        raise ImportError("写入 .zst 结果文件需要安装 zstandard (pip install zstandard)")
+    return zstandard.ZstdCompressor(level=level)
+
+
+def open_result_lines(result_path: str) -> Iterator[str]:
+    """
+    逐行读取结果文件（.zst 文件自动解压）
+
+    压缩文件末尾不完整的 frame（如评测进程被强制终止）会被跳过并给出警告。
+    """
+    if not is_zstd_path(result_path):
+        with open(result_path, "r", encoding="utf-8") as f:
+            yield from f
+        return
+    if not ZSTD_AVAILABLE:
+        raise ImportError("读取 .zst 结果文件需要安装 zstandard (pip install zstandard)")
+    with open(result_path, "rb") as f:
+        reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+        text = io.TextIOWrapper(reader, encoding="utf-8")
+        try:
+            for line in text:
+                if not line.endswith("\n"):
+                    print(f"⚠️ 结果文件 {result_path} 末尾数据不完整，已跳过")
+                    return
+                yield line
+        except (zstandard.ZstdError, UnicodeDecodeError) as e:
+            print(f"⚠️ 结果文件 {result_path} 末尾数据不完整，已跳过: {e}")
+
+
+def iter_results(result_path: str) -> Iterator[dict]:
+    """逐条读取结果文件"""
+    for line in open_result_lines(result_path):
+        if line.strip():
+            yield json.loads(line)
+
+
+def convert_results(
+    result_path: str,
+    output_path: str,
+    result_format: str = "compact",
+    tokenizer_path: Optional[str] = None,
+) -> int:
+    """
+    转换结果文件格式
+
+    Args:
+        result_path: 原结果文件
+        output_path: 输出文件，以 .zst 结尾时压缩
+        result_format: 目标格式，compact 或 full（full 会重新渲染上下文）
+        tokenizer_path: 转换为 full 时渲染使用的 tokenizer
+
+    Returns:
+        int: 转换的结果条数
+    """
+    from internbootcamp.utils.result_writer import encode_jsonl_line
+
+    if result_format not in RESULT_FORMATS:
+        raise ValueError(f"不支持的结果格式: {result_format}，可选: {RESULT_FORMATS}")
+    render = make_renderer(tokenizer_path) if result_format == "full" else None
+    compressor = zstd_compressor() if is_zstd_path(output_path) else None
+    count = 0
+    with open(output_path, "wb") as out:
+        chunks = []
+        for record in iter_results(result_path):
+            record = compact_result(record) if result_format == "compact" else expand_result(record, render)
+            chunks.append(encode_jsonl_line(record))
+            count += 1
+            if len(chunks) >= 1024:
+                data = b"".join(chunks)
+                out.write(compressor.compress(data) if compressor else data)
+                chunks = []
+        if chunks:
+            data = b"".join(chunks)
+            out.write(compressor.compress(data) if compressor else data)
+    return count
+
+
+def export_parquet_shards(result_path: str, output_dir: Optional[str] = None, shard_size: int = 10000) -> List[str]:
+    """
+    将结果导出为 Parquet 分片（精简格式）
+
+    Args:
+        result_path: 结果文件
+        output_dir: 分片目录，默认为 <结果文件名>_parquet
+        shard_size: 每个分片的结果条数
+
+    Returns:
+        List[str]: 分片文件路径
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_dir = output_dir or result_file_stem(result_path) + "_parquet"
+    os.makedirs(output_dir, exist_ok=True)
+    schema = parquet_schema()
+    shard_paths = []
+
+    def _write_shard(rows: List[dict]) -> None:
+        shard_path = os.path.join(output_dir, f"part-{len(shard_paths):05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(rows, schema=schema), shard_path, compression="zstd")
+        shard_paths.append(shard_path)
+
+    rows = []
+    for record in iter_results(result_path):
+        if not isinstance(record, dict):
+            continue
+        rows.append(parquet_row(compact_result(record)))
+        if len(rows) >= shard_size:
+            _write_shard(rows)
+            rows = []
+    if rows:
+        _write_shard(rows)
+    return shard_paths
+
+
+def parquet_schema():
+    """Parquet 分片的固定 schema：data_source、标量字段、JSON 字段与 extra"""
+    import pyarrow as pa
+
+    fields = [pa.field("data_source", pa.string())]
+    fields += [pa.field(name, pa.type_for_alias(type_name)) for name, type_name in PARQUET_SCALAR_FIELDS.items()]
+    fields += [pa.field(name, pa.string()) for name in PARQUET_JSON_FIELDS]
+    fields.append(pa.field("extra", pa.string()))
+    return pa.schema(fields)
+
+
+_SCALAR_CASTS = {"string": str, "bool": bool, "float64": float, "int64": int}
+
+
+def _cast_scalar(value: Any, type_name: str) -> Any:
+    if value is None:
+        return None
+    try:
+        return _SCALAR_CASTS[type_name](value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parquet_row(record: dict) -> dict:
+    """将一条（精简格式的）结果转换为符合 parquet_schema 的行"""
+    input_data = record.get("input")
+    row = {"data_source": input_data.get("data_source") if isinstance(input_data, dict) else None}
+    for name, type_name in PARQUET_SCALAR_FIELDS.items():
+        row[name] = _cast_scalar(record.get(name), type_name)
+    for name in PARQUET_JSON_FIELDS:
+        row[name] = json.dumps(record[name], ensure_ascii=False, default=str) if name in record else None
+    extra = {key: value for key, value in record.items() if key not in PARQUET_SCALAR_FIELDS and key not in PARQUET_JSON_FIELDS}
+    row["extra"] = json.dumps(extra, ensure_ascii=False, default=str) if extra else None
+    return row
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="评测结果格式转换")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert_parser = subparsers.add_parser("convert", help="完整格式与精简格式互相转换")
+    convert_parser.add_argument("result_path", type=str, help="原结果文件")
+    convert_parser.add_argument("output_path", type=str, help="输出文件，以 .zst 结尾时压缩")
+    convert_parser.add_argument("--format", type=str, default="compact", choices=list(RESULT_FORMATS), help="目标格式 (默认: compact)")
+    convert_parser.add_argument("--tokenizer-path", type=str, default=None, help="转换为 full 时渲染上下文使用的 tokenizer")
+
+    parquet_parser = subparsers.add_parser("parquet", help="导出 Parquet 分片")
+    parquet_parser.add_argument("result_path", type=str, help="结果文件")
+    parquet_parser.add_argument("--output-dir", type=str, default=None, help="分片目录，默认为 <结果文件名>_parquet")
+    parquet_parser.add_argument("--shard-size", type=int, default=10000, help="每个分片的结果条数 (默认: 10000)")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        count = convert_results(args.result_path, args.output_path, args.format, args.tokenizer_path)
+        print(f"✅ 已转换 {count} 条结果: {args.output_path}")
+    else:
+        shard_paths = export_parquet_shards(args.result_path, args.output_dir, args.shard_size)
+        print(f"✅ 已导出 {len(shard_paths)} 个 Parquet 分片")
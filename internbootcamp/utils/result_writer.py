@@ -0,0 +1,187 @@
+"""
+评测结果异步写入器
+
+由单一后台任务负责结果文件的写入：
+- 文件在整个评测期间保持打开
+- 结果按条数/时间阈值批量写入并 flush
+- 可选地按时间间隔 fsync，作为断点重试的持久化检查点
+- JSON 编码与磁盘写入在线程中执行，不阻塞事件循环（安装了 orjson 时优先使用 orjson）
+- 可选地将结果中的 sample_key 同步追加到断点重试索引文件
+- 可选地将结果的统计字段同步追加到统计旁路文件（见 eval_report）
+- 结果文件以 .zst 结尾时按批压缩，每批为一个独立的 zstd frame（见 result_format）
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from internbootcamp.utils.eval_report import extract_stat_fields
+from internbootcamp.utils.result_format import is_zstd_path, zstd_compressor
+from internbootcamp.utils.resume_index import append_index_keys
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# 队列结束标记
+_CLOSE = object()
+
+
+def encode_jsonl_line(record: Any) -> bytes:
+    """将一条记录编码为 UTF-8 的 JSONL 行（含换行符）"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                record,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE,
+            )
+        except TypeError:
+            # orjson 不支持的类型回退到标准库
+            pass
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class AsyncResultWriter:
+    """
+    基于队列的 JSONL 结果写入器
+
+    示例用法:
+        writer = AsyncResultWriter("eval_results.jsonl")
+        await writer.start()
+        await writer.write(result)
+        await writer.close()
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        flush_lines: int = 64,
+        flush_interval: float = 1.0,
+        fsync_interval: Optional[float] = None,
+        max_queue_size: int = 1024,
+        index_path: Optional[str] = None,
+        stats_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            output_path: 结果文件路径（追加写入），以 .zst 结尾时压缩写入
+            flush_lines: 累计多少条结果后写盘
+            flush_interval: 距上次写盘超过多少秒后写盘（即使未达到 flush_lines）
+            fsync_interval: 每隔多少秒执行一次 fsync，None 表示不主动 fsync
+            max_queue_size: 待写入队列的最大长度，队列满时 write 会等待（背压）
+            index_path: 断点重试索引文件路径，结果写盘后追加其 sample_key
+            stats_path: 统计旁路文件路径，结果写盘后追加其统计字段
+        """
+        self.output_path = output_path
+        self.flush_lines = max(1, flush_lines)
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.index_path = index_path
+        self.stats_path = stats_path
+        self._compressor = zstd_compressor() if is_zstd_path(output_path) else None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._file = None
+        self._last_fsync = time.monotonic()
+        self.written_count = 0
+
+    async def start(self) -> None:
+        """打开文件并启动后台写入任务"""
+        if self._task is not None:
+            return
+        self._file = open(self.output_path, "ab")
+        self._task = asyncio.create_task(self._run())
+
+    async def write(self, record: Dict[str, Any]) -> None:
+        """提交一条结果，写入由后台任务完成"""
+        if self._task is None:
+            raise RuntimeError("AsyncResultWriter 尚未启动")
+        if self._task.done():
+            # 后台任务异常退出时立即暴露错误，避免结果静默丢失
+            self._task.result()
+        await self._queue.put(record)
+
+    async def close(self) -> None:
+        """写入剩余结果、fsync 并关闭文件"""
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._queue.put(_CLOSE)
+        try:
+            await self._task
+        finally:
+            self._task = None
+            await asyncio.to_thread(self._close_file)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            record = await self._queue.get()
+            if record is _CLOSE:
+                break
+            batch = [record]
+            deadline = loop.time() + self.flush_interval
+            # 在时间窗口内尽量攒批
+            while len(batch) < self.flush_lines:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is _CLOSE:
+                    closing = True
+                    break
+                batch.append(record)
+            await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """在线程中执行：编码并写入一批结果"""
+        chunks = []
+        keys = []
+        stat_chunks = []
+        for record in batch:
+            try:
+                chunks.append(encode_jsonl_line(record))
+            except Exception as e:
+                print(f"❌ 写入结果失败: {e}")
+                print(f"❌ 写入结果: {record}")
+                continue
+            if isinstance(record, dict) and record.get("sample_key"):
+                keys.append(record["sample_key"])
+            if self.stats_path and isinstance(record, dict):
+                stat_chunks.append(encode_jsonl_line(extract_stat_fields(record)))
+        if not chunks:
+            return
+        data = b"".join(chunks)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._file.write(data)
+        self._file.flush()
+        self.written_count += len(chunks)
+        if self.fsync_interval is not None and time.monotonic() - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+        # 结果落盘之后再写索引，保证索引中的样本一定已在结果文件中
+        if self.index_path:
+            append_index_keys(self.index_path, keys)
+        if stat_chunks:
+            with open(self.stats_path, "ab") as f:
+                f.write(b"".join(stat_chunks))
+
+    def _close_file(self) -> None:
+        if self._file is None:
+            return
+        try:
+            self._file.flush()
+            if self.fsync_interval is not None:
+                os.fsync(self._file.fileno())
+        finally:
+            self._file.close()
+            self._file = None
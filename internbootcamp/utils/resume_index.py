@@ -0,0 +1,107 @@
+"""
+断点重试索引
+
+为每个样本计算稳定的样本键（sample_key），写入结果文件的同时追加到旁路索引文件
+（<result_path>.index，每行一个键）。断点重试时只需读取索引文件即可得到已完成样本集合，
+无需重新解析和序列化整个结果文件。
+
+样本键的两种来源：
+- 显式字段：通过 key_field 指定（如 "extra_info.index" 或 "id"），要求该字段在数据集中唯一
+- 内容哈希：样本规范化 JSON（sort_keys）的 blake2b 摘要，默认方式
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Iterable, Optional, Set, Tuple
+
+from internbootcamp.utils.result_format import open_result_lines
+
+
+INDEX_SUFFIX = ".index"
+
+
+def index_path_for(result_path: str) -> str:
+    """获取结果文件对应的索引文件路径"""
+    return result_path + INDEX_SUFFIX
+
+
+def _get_field(item: dict, key_field: str) -> Any:
+    """按点分路径读取字段，如 "extra_info.index" """
+    value = item
+    for part in key_field.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compute_sample_key(item: dict, key_field: Optional[str] = None) -> str:
+    """
+    计算样本键
+
+    Args:
+        item: 数据集中的一条样本（即结果中的 input 字段）
+        key_field: 显式键字段的点分路径；为 None 或样本中缺少该字段时使用内容哈希
+
+    Returns:
+        str: 样本键
+    """
+    if key_field:
+        value = _get_field(item, key_field)
+        if value is not None:
+            return f"{key_field}={value}"
+    canonical = json.dumps(item, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return "blake2b:" + hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def append_index_keys(index_path: str, keys: Iterable[str]) -> None:
+    """向索引文件追加样本键"""
+    lines = "".join(f"{key}\n" for key in keys)
+    if not lines:
+        return
+    with open(index_path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+def load_completed_index(result_path: str, key_field: Optional[str] = None) -> Tuple[Set[str], int]:
+    """
+    加载已完成样本的键集合及索引的记录数
+
+    优先读取索引文件；索引文件不存在时（如旧版本生成的结果文件）扫描结果文件，
+    使用结果中的 sample_key 字段或按 input 重新计算，并据此重建索引文件（每条结果一行）。
+
+    Args:
+        result_path: 结果文件路径（.jsonl）
+        key_field: 与评测时一致的显式键字段
+
+    Returns:
+        Tuple[Set[str], int]: 已完成样本的键集合，以及索引中的记录数（含重复样本，
+            与结果文件及统计旁路文件的记录数一致）
+    """
+    index_path = index_path_for(result_path)
+    if os.path.exists(index_path):
+        with open(index_path, "r", encoding="utf-8") as f:
+            keys = [line.rstrip("\n") for line in f if line.strip()]
+        return set(keys), len(keys)
+
+    keys = []
+    if not os.path.exists(result_path):
+        return set(), 0
+    for line in open_result_lines(result_path):
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        if not isinstance(result, dict):
+            continue
+        if result.get("sample_key"):
+            keys.append(result["sample_key"])
+        elif result.get("input"):
+            keys.append(compute_sample_key(result["input"], key_field))
+    append_index_keys(index_path, keys)
+    return set(keys), len(keys)
+
+
+def load_completed_keys(result_path: str, key_field: Optional[str] = None) -> Set[str]:
+    """加载已完成样本的键集合（见 load_completed_index）"""
+    return load_completed_index(result_path, key_field)[0]
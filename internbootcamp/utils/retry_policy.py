@@ -0,0 +1,233 @@
+"""
+按错误类型分类的重试策略
+
+- 可重试：429（rate_limit）、5xx（server_error）、超时（timeout）、连接错误（connection），
+  退避时间为带完全抖动的指数退避，服务端返回 Retry-After 时优先使用
+- 不可重试：其他 4xx（client_error，如上下文超长、工具 schema 非法）与其他异常（other），立即失败
+- 可以用 retryable_status_codes 限制可重试的状态码：如工具调用只重试 502/503/504，
+  Worker 返回的 500 通常是工具本身的确定性错误，重试没有意义
+- 重试预算（RetryBudget）：每个请求存入 ratio 个重试令牌，每次重试消耗 1 个，
+  服务端大面积故障时限制重试总量，避免重试风暴
+- 按错误类型统计错误数、重试数与因预算耗尽放弃的次数，写入评测报告
+
+示例用法:
+    policy = RetryPolicy("api", max_attempts=5, budget=RetryBudget(ratio=0.2, min_retries=10))
+    response = await policy.call(client.chat.completions.create, **payload)
+"""
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+import httpx
+import openai
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+ERROR_CLASSES = ("rate_limit", "server_error", "timeout", "connection", "client_error", "other")
+RETRYABLE_ERROR_CLASSES = ("rate_limit", "server_error", "timeout", "connection")
+# 工具调用只重试网关/服务不可用类的状态码（Worker 重启、过载）
+TOOL_RETRYABLE_STATUS_CODES = (502, 503, 504)
+
+
+class StatusCodeError(Exception):
+    """HTTP 状态码错误（用于 aiohttp 等不抛出带状态码异常的客户端），按状态码分类是否重试"""
+
+    def __init__(self, status_code: int, message: str = "", retry_after: Optional[float] = None):
+        super().__init__(f"Bad status: {status_code}, response: {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None and aiohttp is not None and isinstance(error, aiohttp.ClientResponseError):
+        status = error.status
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error: BaseException) -> str:
+    """错误类型：rate_limit / server_error / timeout / connection / client_error / other"""
+    status = _status_code(error)
+    if status is not None:
+        if status == 429:
+            return "rate_limit"
+        if status == 408:
+            return "timeout"
+        if status >= 500:
+            return "server_error"
+        if 400 <= status < 500:
+            return "client_error"
+    if isinstance(error, (openai.APITimeoutError, httpx.TimeoutException, asyncio.TimeoutError)):
+        return "timeout"
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError, ConnectionError)):
+        return "connection"
+    if aiohttp is not None and isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return "connection"
+    return "other"
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """从异常中读取服务端建议的重试等待时间（Retry-After / retry-after-ms 头）"""
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return float(retry_after)
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) if response is not None else None
+    if headers is None:
+        headers = getattr(error, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return float(value) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            retry_at = email.utils.parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class RetryBudget:
+    """
+    重试预算（令牌桶）
+
+    Args:
+        ratio: 每个请求存入的重试令牌数，即长期重试数与请求数之比的上限
+        min_retries: 初始令牌数，保证请求量很少时也能重试
+        max_balance: 令牌数上限，避免长时间健康运行后积累过多令牌，默认为 min_retries 的 10 倍
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, max_balance: Optional[float] = None):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.max_balance = max_balance if max_balance is not None else max(min_retries * 10, 1)
+        self._lock = threading.Lock()
+        self.balance = float(min_retries)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.balance = float(self.min_retries)
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.balance = min(self.max_balance, self.balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class RetryPolicy:
+    """
+    按错误类型分类的重试策略
+
+    Args:
+        name: 名称，用于日志与指标（如 api、tool）
+        max_attempts: 最大尝试次数（含首次）
+        base_delay: 指数退避的基础等待时间（秒）
+        max_delay: 单次等待时间上限（秒），同时限制 Retry-After
+        retryable: 可重试的错误类型
+        budget: 重试预算，None 表示不限制
+        metrics: EvaluationMetrics，用于发布 <name>_retries 与 <name>_errors_<类型> 计数
+        retryable_status_codes: 可重试的 HTTP 状态码，None 表示只按错误类型判断；
+            设置后带状态码的错误只有状态码在其中时才重试
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        retryable: Sequence[str] = RETRYABLE_ERROR_CLASSES,
+        budget: Optional[RetryBudget] = None,
+        metrics=None,
+        retryable_status_codes: Optional[Sequence[int]] = None,
+    ):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retryable = set(retryable)
+        self.budget = budget
+        self.metrics = metrics
+        self.retryable_status_codes = set(retryable_status_codes) if retryable_status_codes is not None else None
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def reset(self) -> None:
+        """清空统计并重置重试预算（每次评测开始时调用）"""
+        with self._lock:
+            self.stats = {}
+        if self.budget is not None:
+            self.budget.reset()
+
+    def _count(self, error_class: str, field: str) -> None:
+        with self._lock:
+            stats = self.stats.setdefault(error_class, {"errors": 0, "retries": 0, "budget_exhausted": 0})
+            stats[field] += 1
+        if self.metrics is not None:
+            metric = f"{self.name}_errors_{error_class}" if field == "errors" else f"{self.name}_{field}"
+            self.metrics.inc(metric)
+
+    def is_retryable(self, error: BaseException, error_class: Optional[str] = None) -> bool:
+        """错误是否可重试（不考虑尝试次数与预算）"""
+        if (error_class or classify_error(error)) not in self.retryable:
+            return False
+        status = _status_code(error)
+        if status is not None and self.retryable_status_codes is not None:
+            return status in self.retryable_status_codes
+        return True
+
+    def _delay(self, attempt: int, error: BaseException) -> float:
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        # 完全抖动：在 [0, base * 2^(attempt-1)] 内均匀随机，避免大量请求同时重试
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """调用 func，按错误类型决定是否重试"""
+        if self.budget is not None:
+            self.budget.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error_class = classify_error(e)
+                self._count(error_class, "errors")
+                if not self.is_retryable(e, error_class) or attempt >= self.max_attempts:
+                    raise
+                if self.budget is not None and not self.budget.try_spend():
+                    self._count(error_class, "budget_exhausted")
+                    print(f"⚠️ {self.name} 重试预算已耗尽，放弃重试 ({error_class}): {e}")
+                    raise
+                self._count(error_class, "retries")
+                delay = self._delay(attempt, e)
+                print(f"重试中... {self.name} 第{attempt}次尝试失败 ({error_class})，{delay:.1f} 秒后重试: \n{e}")
+                await asyncio.sleep(delay)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {error_class: dict(stats) for error_class, stats in self.stats.items()}
+
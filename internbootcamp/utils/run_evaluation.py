@@ -177,7 +177,7 @@ def main():
     parser.add_argument('--dataset-path', type=str, help='数据集文件路径 (.json, .jsonl, .parquet)')
     parser.add_argument('--output-dir', type=str, help='评测结果输出目录')
     parser.add_argument('--api-key', type=str, help='API 密钥')
-    parser.add_argument('--api-url', type=str, default=None, help='API URL (如果不指定则使用默认的OpenAI API)')
+    parser.add_argument('--api-url', type=str, default=None, help='API URL，多个端点用逗号分隔 (如果不指定则使用默认的OpenAI API)')
     parser.add_argument('--api-model', type=str, default='gpt-3.5-turbo', help='模型名称 (默认: gpt-3.5-turbo)')
     parser.add_argument('--api-extra-headers', type=str, default=None, help='额外的API头部，格式: "key1:value1,key2:value2"')
     parser.add_argument('--api-extra-params', type=str, default=None, help='额外的模型参数；支持 JSON 字符串或 @文件（JSON）。示例：\n  1) JSON 字符串：\n     --api-extra-params \'{"temperature":0.7, "max_completion_tokens":65536, "extra_body": {"enable_thinking": true}}\'\n  2) 从文件读取（以 @ 开头）：\n     --api-extra-params @/path/to/params.json\n  3) 回退兼容旧格式："temperature:0.7,max_tokens:2048,top_p:0.9"')
@@ -196,7 +196,49 @@ def main():
     parser.add_argument('--tokenizer-path', type=str, default=None, nargs='?', const=None, help='tokenizer路径(可选, apply template时使用)')
     parser.add_argument('--bootcamp-registry', type=str, default=None, help='bootcamp注册表路径(可选, 用于批量评测)')
     parser.add_argument('--resume-from-result-path', type=str, default=None, help='断点重试模式：指定要恢复的结果文件路径(.jsonl)')
+    parser.add_argument('--resume-key-field', type=str, default=None, help='断点重试的样本键字段，点分路径，如 "extra_info.index" (默认: 使用样本内容哈希)')
     parser.add_argument('--max-iterations', type=int, default=None, help='单轮数据最大迭代次数（用于单轮评测）')
+    parser.add_argument('--stream-dataset', action='store_true', help='流式读取数据集（JSONL逐行、Parquet按row group），不将整个数据集加载到内存')
+    parser.add_argument('--no-return-results', action='store_true', help='结果写盘后即从内存中丢弃（大规模评测时降低内存占用）')
+    parser.add_argument('--result-flush-lines', type=int, default=64, help='结果文件每累计多少条写盘一次 (默认: 64)')
+    parser.add_argument('--result-flush-interval', type=float, default=1.0, help='结果文件最长写盘间隔(秒) (默认: 1.0)')
+    parser.add_argument('--result-fsync-interval', type=float, default=None, help='结果文件fsync间隔(秒)，用于断点重试的持久化检查点 (默认: 不主动fsync)')
+    parser.add_argument('--metrics-interval', type=float, default=None, help='运行时指标快照(<结果文件>.metrics.json)写入间隔(秒) (默认: 不写入)')
+    parser.add_argument('--metrics-port', type=int, default=None, help='运行时指标HTTP端口，提供 /metrics (Prometheus格式) 和 /metrics.json (默认: 不启用)')
+    parser.add_argument('--metrics-host', type=str, default='127.0.0.1', help='运行时指标HTTP监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--adaptive-concurrency', action='store_true', help='启用API请求自适应并发(AIMD)：健康时增长，遇到429/5xx/超时时减半')
+    parser.add_argument('--adaptive-min-concurrency', type=int, default=1, help='自适应并发的最小API并发数 (默认: 1)')
+    parser.add_argument('--adaptive-max-concurrency', type=int, default=None, help='自适应并发的最大API并发数 (默认: 与--max-concurrent相同)')
+    parser.add_argument('--endpoint-policy', type=str, default='least_outstanding', choices=['least_outstanding', 'p2c'], help='多端点路由策略 (默认: least_outstanding)')
+    parser.add_argument('--endpoint-eject-failures', type=int, default=3, help='端点连续失败多少次后剔除 (默认: 3)')
+    parser.add_argument('--endpoint-eject-seconds', type=float, default=30.0, help='端点剔除时长(秒) (默认: 30)')
+    parser.add_argument('--http-max-connections', type=int, default=None, help='每个端点的HTTP最大连接数(同时作为keep-alive连接数) (默认: 与--max-concurrent相同)')
+    parser.add_argument('--http-keepalive-expiry', type=float, default=30.0, help='HTTP空闲连接保持时间(秒) (默认: 30)')
+    parser.add_argument('--http2', action='store_true', help='启用HTTP/2 (需要安装h2)')
+    parser.add_argument('--http-connect-timeout', type=float, default=10.0, help='HTTP建立连接超时(秒) (默认: 10)')
+    parser.add_argument('--http-read-timeout', type=float, default=600.0, help='HTTP读取响应超时(秒) (默认: 600)')
+    parser.add_argument('--http-write-timeout', type=float, default=60.0, help='HTTP发送请求超时(秒) (默认: 60)')
+    parser.add_argument('--http-pool-timeout', type=float, default=60.0, help='等待连接池空闲连接的超时(秒) (默认: 60)')
+    parser.add_argument('--stream', action='store_true', help='使用流式请求，记录首token延迟(TTFT)并支持客户端提前停止')
+    parser.add_argument('--stream-stop-regex', type=str, default=None, help=r"流式请求的客户端停止条件(正则)，content匹配后停止生成，如 '\\boxed\{[^}]*\}'")
+    parser.add_argument('--sample-time-budget', type=float, default=None, help='单个样本的墙钟时间预算(秒)，到期后停止生成并对已有输出评分 (默认: 不限制)')
+    parser.add_argument('--response-cache', type=str, default=None, help='响应缓存(SQLite)文件路径，以请求payload哈希为键缓存模型响应 (默认: 不启用)')
+    parser.add_argument('--response-cache-max-mb', type=float, default=None, help='响应缓存大小上限(MB)，超出后淘汰最久未访问的响应 (默认: 不限制)')
+    parser.add_argument('--response-cache-mode', type=str, default='readwrite', choices=['readwrite', 'readonly', 'cache_only'], help='响应缓存模式: readwrite 读写, readonly 只读, cache_only 只重放缓存不请求模型(未命中的样本记为失败) (默认: readwrite)')
+    parser.add_argument('--result-format', type=str, default='full', choices=['full', 'compact'], help='结果存储格式: full 完整格式, compact 只存储一次对话且不存储渲染后的上下文 (默认: full)')
+    parser.add_argument('--result-compression', type=str, default=None, choices=['zstd'], help='结果文件压缩方式，zstd 时输出 .jsonl.zst (需要安装zstandard) (默认: 不压缩)')
+    parser.add_argument('--render-workers', type=int, default=4, help='上下文渲染(chat template)线程数，0表示在事件循环中渲染 (默认: 4)')
+    parser.add_argument('--max-context-tokens', type=int, default=None, help='上下文token预算(通常为模型最大上下文长度)，请求前估计prompt token数，剩余不足时结束样本并记为context_exhausted (默认: 不检查)')
+    parser.add_argument('--min-completion-tokens', type=int, default=256, help='上下文预算中为生成保留的最少token数，剩余不足时结束样本 (默认: 256)')
+    parser.add_argument('--api-retry-attempts', type=int, default=5, help='模型请求最大尝试次数，只重试429/5xx/超时/连接错误 (默认: 5)')
+    parser.add_argument('--tool-retry-attempts', type=int, default=16, help='MCP工具调用最大尝试次数 (默认: 16)')
+    parser.add_argument('--retry-max-delay', type=float, default=60.0, help='单次重试等待时间上限(秒)，同时限制Retry-After (默认: 60)')
+    parser.add_argument('--retry-budget-ratio', type=float, default=0.2, help='重试预算：每个请求存入的重试令牌数，限制重试总量 (默认: 0.2)')
+    parser.add_argument('--retry-budget-min', type=int, default=10, help='重试预算的初始令牌数 (默认: 10)')
+    parser.add_argument('--no-retry-budget', action='store_true', help='不限制重试总量')
+    parser.add_argument('--max-parallel-tool-calls', type=int, default=4, help='单个样本同一轮中工具调用的最大并发数，1表示按顺序执行 (默认: 4)')
+    parser.add_argument('--eager-tool-create', action='store_true', help='样本开始时并发创建所需工具的实例 (默认: 首次调用时创建)')
+    parser.add_argument('--report-interval', type=float, default=None, help='评测过程中CSV报告刷新间隔(秒) (默认: 只在结束时生成)')
     args = parser.parse_args()
     
     # 验证输入文件
@@ -233,6 +275,8 @@ def main():
         print(f"  验证修正参数: {args.verify_correction_kwargs if args.verify_correction_kwargs else '无'}")
         print(f"  断点重试: {'启用 (' + args.resume_from_result_path + ')' if args.resume_from_result_path else '禁用'}")
         print(f"  最大迭代次数: {args.max_iterations if args.max_iterations else '无'}")
+        print(f"  流式读取数据集: {'启用' if args.stream_dataset else '禁用'}")
+        print(f"  自适应并发: {'启用' if args.adaptive_concurrency else '禁用'}")
     try:
         # 解析额外头部和参数
         extra_headers = parse_extra_headers(args.api_extra_headers) if args.api_extra_headers else None
@@ -262,7 +306,45 @@ def main():
             api_extra_params=extra_params,
             verify_correction_kwargs=verify_correction_kwargs,
             tokenizer_path=args.tokenizer_path,
-            max_iterations=args.max_iterations
+            max_iterations=args.max_iterations,
+            result_flush_lines=args.result_flush_lines,
+            result_flush_interval=args.result_flush_interval,
+            result_fsync_interval=args.result_fsync_interval,
+            resume_key_field=args.resume_key_field,
+            metrics_interval=args.metrics_interval,
+            metrics_port=args.metrics_port,
+            metrics_host=args.metrics_host,
+            adaptive_concurrency=args.adaptive_concurrency,
+            adaptive_min_concurrency=args.adaptive_min_concurrency,
+            adaptive_max_concurrency=args.adaptive_max_concurrency,
+            endpoint_policy=args.endpoint_policy,
+            endpoint_eject_failures=args.endpoint_eject_failures,
+            endpoint_eject_seconds=args.endpoint_eject_seconds,
+            http_max_connections=args.http_max_connections,
+            http_keepalive_expiry=args.http_keepalive_expiry,
+            http2=args.http2,
+            http_connect_timeout=args.http_connect_timeout,
+            http_read_timeout=args.http_read_timeout,
+            http_write_timeout=args.http_write_timeout,
+            http_pool_timeout=args.http_pool_timeout,
+            api_stream=args.stream,
+            stream_stop_regex=args.stream_stop_regex,
+            sample_time_budget=args.sample_time_budget,
+            response_cache_path=args.response_cache,
+            response_cache_max_mb=args.response_cache_max_mb,
+            response_cache_mode=args.response_cache_mode,
+            result_format=args.result_format,
+            result_compression=args.result_compression,
+            render_workers=args.render_workers,
+            max_context_tokens=args.max_context_tokens,
+            min_completion_tokens=args.min_completion_tokens,
+            api_retry_attempts=args.api_retry_attempts,
+            tool_retry_attempts=args.tool_retry_attempts,
+            retry_max_delay=args.retry_max_delay,
+            retry_budget_ratio=None if args.no_retry_budget else args.retry_budget_ratio,
+            retry_budget_min=args.retry_budget_min,
+            max_parallel_tool_calls=args.max_parallel_tool_calls,
+            eager_tool_create=args.eager_tool_create,
         )
         
         if args.dry_run:
@@ -277,7 +359,10 @@ def main():
             yaml_interaction_path=args.interaction_config,
             max_concurrent=args.max_concurrent,
             bootcamp_registry=args.bootcamp_registry,
-            resume_from_result_path=args.resume_from_result_path
+            resume_from_result_path=args.resume_from_result_path,
+            stream_dataset=args.stream_dataset,
+            return_results=not args.no_return_results,
+            report_interval=args.report_interval,
         ))
         
     except Exception as e:
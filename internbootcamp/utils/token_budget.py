@@ -0,0 +1,124 @@
+"""
+对话 token 预算
+
+多轮工具调用的对话会不断变长，超过模型上下文长度时服务端返回 400 错误。ConversationTokenCounter
+在每次请求前估计 prompt 的 token 数，评测器据此在超出预算前结束样本（context_exhausted）：
+- 首次计数：使用 tokenizer.apply_chat_template 对完整 messages（含 tools）分词
+- 之后以服务端返回的 usage（prompt_tokens + completion_tokens）为基准，只对新追加的消息
+  （工具响应、交互用户消息）用 tokenizer.encode 增量计数，每条消息额外计入模板开销
+- 没有 tokenizer 时按字符数估计（CHARS_PER_TOKEN 个字符约 1 个 token）
+- 图片按固定的 IMAGE_TOKENS 计数（不对 base64 数据计数）
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+# 没有 tokenizer 时每个 token 对应的字符数（偏保守）
+CHARS_PER_TOKEN = 3
+# 每条消息的 chat template 开销（角色标记、分隔符等）
+MESSAGE_OVERHEAD_TOKENS = 8
+# 每张图片的 token 数（实际取决于模型与图片分辨率，这里取偏保守的固定值）
+IMAGE_TOKENS = 1024
+IMAGE_PART_TYPES = ("image_url", "image")
+
+
+def _message_text(message: Dict[str, Any]) -> str:
+    """消息中参与分词的文本：content（含多模态的 text 部分）、reasoning_content 与工具调用"""
+    parts = []
+    content = message.get("content")
+    if isinstance(content, str):
+        parts.append(content)
+    elif isinstance(content, list):
+        for item in content:
+            if isinstance(item, dict) and item.get("type") == "text":
+                parts.append(item.get("text") or "")
+    if message.get("reasoning_content"):
+        parts.append(message["reasoning_content"])
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call.get("function") or {}
+        parts.append(function.get("name") or "")
+        parts.append(function.get("arguments") or "")
+    return "\n".join(parts)
+
+
+def _image_count(message: Dict[str, Any]) -> int:
+    """消息中的图片数（多模态 content 中的 image_url / image 部分）"""
+    content = message.get("content")
+    if not isinstance(content, list):
+        return 0
+    return sum(1 for item in content if isinstance(item, dict) and item.get("type") in IMAGE_PART_TYPES)
+
+
+class ConversationTokenCounter:
+    """
+    单个样本对话的 token 计数器（增量计数）
+
+    示例用法:
+        counter = ConversationTokenCounter(tokenizer, tools)
+        prompt_tokens = counter.count(messages)
+        response, usage = await call_api(...)
+        messages.append(response_message)
+        counter.observe_usage(usage, len(messages))
+    """
+
+    def __init__(self, tokenizer: Any = None, tools: Optional[List[Dict]] = None):
+        self.tokenizer = tokenizer
+        self.tools = tools or None
+        # 已知的 token 数及其覆盖的消息条数
+        self._base_tokens: Optional[int] = None
+        self._base_length = 0
+
+    def count(self, messages: List[Dict[str, Any]]) -> int:
+        """估计以 messages 作为 prompt 时的 token 数"""
+        if self._base_tokens is None or len(messages) < self._base_length:
+            self._base_tokens = self._count_full(messages)
+            self._base_length = len(messages)
+            return self._base_tokens
+        return self._base_tokens + sum(self._count_message(message) for message in messages[self._base_length:])
+
+    def observe_usage(self, usage: Optional[dict], message_count: int) -> None:
+        """
+        以服务端 usage 校准计数
+
+        Args:
+            usage: 本次请求的 usage
+            message_count: 追加本轮 assistant 回复后的消息条数
+        """
+        if not usage or usage.get("estimated"):
+            # 流式请求提前停止时 usage 为估计值，不作为基准
+            return
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        if prompt_tokens <= 0:
+            return
+        self._base_tokens = prompt_tokens + (usage.get("completion_tokens") or 0)
+        self._base_length = message_count
+
+    def _count_full(self, messages: List[Dict[str, Any]]) -> int:
+        if self.tokenizer is not None:
+            try:
+                token_ids = self.tokenizer.apply_chat_template(
+                    messages,
+                    tools=self.tools,
+                    add_generation_prompt=True,
+                    tokenize=True,
+                )
+                if hasattr(token_ids, "keys"):
+                    token_ids = token_ids["input_ids"]
+                return len(token_ids)
+            except Exception:
+                pass
+        # 逐条消息计数（只计文本，图片按固定开销），不对整个 messages 做 json.dumps 以免计入 base64 图片数据
+        tokens = sum(self._count_message(message) for message in messages)
+        if self.tools:
+            tokens += len(json.dumps(self.tools, ensure_ascii=False, default=str)) // CHARS_PER_TOKEN
+        return tokens
+
+    def _count_message(self, message: Dict[str, Any]) -> int:
+        text = _message_text(message)
+        overhead = MESSAGE_OVERHEAD_TOKENS + _image_count(message) * IMAGE_TOKENS
+        if self.tokenizer is not None:
+            try:
+                return len(self.tokenizer.encode(text, add_special_tokens=False)) + overhead
+            except Exception:
+                pass
+        return len(text) // CHARS_PER_TOKEN + overhead
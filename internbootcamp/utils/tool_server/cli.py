@@ -34,6 +34,9 @@ from pathlib import Path
 import requests
 
 from .master_server import DistributedMasterServer
+from .executors import EXECUTION_MODES
+from .placement import PLACEMENT_POLICIES
+from .server_log import LOG_FORMATS, LOG_LEVELS
 from .worker_server import DistributedWorkerServer
 from .utils import (
     load_tools_config, 
@@ -60,16 +63,23 @@ def redirect_output_to_log(log_file_path, process_name):
             print(f"警告：无法重定向日志到 {log_file_path}: {e}")
 
 
-def start_master_process(tools_config, host, port, log_file=None):
+def start_master_process(tools_config, host, port, log_file=None, placement_policy="least_instances",
+                         worker_pool_size=100, pool_keepalive_timeout=30.0, dns_cache_ttl=300, log_options=None):
     """在子进程中启动Master服务器"""
     # 重定向输出到日志文件
     redirect_output_to_log(log_file, f"Master-{host}:{port}")
+    if log_file:
+        # 标准输出已重定向到日志文件，日志只由文件handler写入，避免重复
+        log_options = {**(log_options or {}), "console": False}
     
-    master = DistributedMasterServer(host, port, tools_config, log_file=log_file)
+    master = DistributedMasterServer(host, port, tools_config, log_file=log_file, placement_policy=placement_policy,
+                                     worker_pool_size=worker_pool_size, pool_keepalive_timeout=pool_keepalive_timeout,
+                                     dns_cache_ttl=dns_cache_ttl, log_options=log_options)
     master.run()
 
 
-def start_worker_process(tools_config, host, port, worker_id, master_url, log_file=None):
+def start_worker_process(tools_config, host, port, worker_id, master_url, log_file=None, capacity=None, heartbeat_interval=30,
+                         log_options=None, execution_options=None):
     """在子进程中启动Worker服务器"""
     # 设置无缓冲输出
     sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, 'reconfigure') else None
@@ -78,6 +88,8 @@ def start_worker_process(tools_config, host, port, worker_id, master_url, log_fi
     # 重定向输出到日志文件（如果指定）
     if log_file:
         redirect_output_to_log(log_file, f"Worker-{worker_id}")
+        # 标准输出已重定向到日志文件，日志只由文件handler写入，避免重复
+        log_options = {**(log_options or {}), "console": False}
     else:
         # 如果没有指定日志文件，创建一个临时日志文件
         temp_log_file = f"/tmp/worker_{worker_id}.log"
@@ -109,7 +121,9 @@ def start_worker_process(tools_config, host, port, worker_id, master_url, log_fi
         except Exception as e:
             print(f"⚠️  无法创建日志文件 {temp_log_file}: {e}")
     
-    worker = DistributedWorkerServer(tools_config, host, port, worker_id, master_url, log_file=log_file)
+    worker = DistributedWorkerServer(tools_config, host, port, worker_id, master_url, log_file=log_file,
+                                     capacity=capacity, heartbeat_interval=heartbeat_interval, log_options=log_options,
+                                     execution_options=execution_options)
     worker.run()
 
 
@@ -176,7 +190,8 @@ def create_merged_yaml_from_bootcamp_registry(bootcamp_registry_path, output_yam
     return output_yaml_path
 
 
-def start_multiple_workers(tools_config, host, start_port, master_url, num_workers, log_file=None):
+def start_multiple_workers(tools_config, host, start_port, master_url, num_workers, log_file=None,
+                           capacity=None, heartbeat_interval=30, log_options=None, execution_options=None):
     """启动多个Worker进程"""
     worker_processes = []
     worker_urls = []
@@ -193,7 +208,8 @@ def start_multiple_workers(tools_config, host, start_port, master_url, num_worke
         
         process = multiprocessing.Process(
             target=start_worker_process, 
-            args=(tools_config, host, worker_port, worker_id, master_url, log_file)
+            args=(tools_config, host, worker_port, worker_id, master_url, log_file, capacity, heartbeat_interval, log_options,
+                  execution_options)
         )
         process.start()
         worker_processes.append(process)
@@ -366,6 +382,94 @@ def main():
         default=1,
         help="Worker服务器数量 (默认: 3) - Worker和unified模式使用"
     )
+    # 负载均衡参数
+    parser.add_argument(
+        "--placement_policy",
+        choices=list(PLACEMENT_POLICIES),
+        default="least_instances",
+        help="Master为新实例选择Worker的策略 (默认: least_instances) - master和unified模式使用"
+    )
+    parser.add_argument(
+        "--worker_capacity",
+        type=float,
+        default=None,
+        help="Worker在心跳中上报的容量权重，weighted策略按此分配实例 (默认: CPU核数) - worker和unified模式使用"
+    )
+    parser.add_argument(
+        "--heartbeat_interval",
+        type=int,
+        default=30,
+        help="Worker心跳间隔(秒)，心跳中上报负载，需小于Master的健康超时60秒 (默认: 30)"
+    )
+    # 连接池参数
+    parser.add_argument(
+        "--worker_pool_size",
+        type=int,
+        default=100,
+        help="Master到每个Worker的最大连接数，0表示不限制 (默认: 100) - master和unified模式使用"
+    )
+    parser.add_argument(
+        "--pool_keepalive_timeout",
+        type=float,
+        default=30.0,
+        help="Master到Worker的空闲连接保持时间(秒) (默认: 30) - master和unified模式使用"
+    )
+    parser.add_argument(
+        "--dns_cache_ttl",
+        type=int,
+        default=300,
+        help="Master解析Worker地址的DNS缓存时间(秒) (默认: 300) - master和unified模式使用"
+    )
+    # 工具执行参数
+    parser.add_argument(
+        "--execution_mode",
+        choices=list(EXECUTION_MODES),
+        default="inline",
+        help="Worker执行工具调用的默认方式：inline在事件循环中执行，thread在线程池中执行，process在子进程中执行且实例固定在子进程中 (默认: inline)；工具配置中的executor字段可单独覆盖 - worker和unified模式使用"
+    )
+    parser.add_argument(
+        "--execution_pool_size",
+        type=int,
+        default=None,
+        help="thread/process模式的线程数或子进程数 (默认: 线程池默认大小 / CPU核数) - worker和unified模式使用"
+    )
+    parser.add_argument(
+        "--execution_timeout",
+        type=float,
+        default=None,
+        help="单次工具调用的超时时间(秒)，process模式超时后重启子进程 (默认: 不限制) - worker和unified模式使用"
+    )
+    # 日志参数
+    parser.add_argument(
+        "--log_level",
+        choices=list(LOG_LEVELS),
+        default="INFO",
+        help="Master/Worker日志级别，DEBUG时记录每个请求的输入输出 (默认: INFO)"
+    )
+    parser.add_argument(
+        "--log_format",
+        choices=list(LOG_FORMATS),
+        default="text",
+        help="日志格式，json为每行一个带结构化字段的JSON对象 (默认: text)"
+    )
+    parser.add_argument(
+        "--log_sample_rate",
+        type=float,
+        default=1.0,
+        help="逐请求日志的采样率(0~1)，警告和错误不采样 (默认: 1.0)"
+    )
+    parser.add_argument(
+        "--log_max_bytes",
+        type=int,
+        default=0,
+        help="日志文件超过该大小(字节)时轮转，0表示不轮转 (默认: 0)"
+    )
+    parser.add_argument(
+        "--log_backup_count",
+        type=int,
+        default=5,
+        help="日志轮转时保留的旧文件数 (默认: 5)"
+    )
     # unified模式参数
     parser.add_argument(
         "--keep_running", 
@@ -395,6 +499,18 @@ def main():
     )
     
     args = parser.parse_args()
+    log_options = {
+        "level": args.log_level,
+        "json_format": args.log_format == "json",
+        "sample_rate": args.log_sample_rate,
+        "max_bytes": args.log_max_bytes,
+        "backup_count": args.log_backup_count,
+    }
+    execution_options = {
+        "mode": args.execution_mode,
+        "pool_size": args.execution_pool_size,
+        "timeout": args.execution_timeout,
+    }
     
     # 验证输入文件
     if not args.bootcamp_registry and not args.tools_yaml_path and args.mode != "master":
@@ -446,7 +562,12 @@ def main():
         if args.mode == "master":
             # 启动Master服务器
             print(f"\n🚀 启动分布式Master服务器...")
-            server = DistributedMasterServer(args.host, args.port, tools_config if tools_config else None)
+            server = DistributedMasterServer(args.host, args.port, tools_config if tools_config else None,
+                                             placement_policy=args.placement_policy,
+                                             worker_pool_size=args.worker_pool_size,
+                                             pool_keepalive_timeout=args.pool_keepalive_timeout,
+                                             dns_cache_ttl=args.dns_cache_ttl,
+                                             log_options=log_options)
             
             master_url = f"http://{get_external_ip()}:{args.port}"
             
@@ -521,7 +642,9 @@ def main():
             
             # 使用调整后的端口
             worker_processes, worker_urls = start_multiple_workers(
-                tools_config, args.host, adjusted_port, args.master_url, args.num_workers
+                tools_config, args.host, adjusted_port, args.master_url, args.num_workers,
+                capacity=args.worker_capacity, heartbeat_interval=args.heartbeat_interval,
+                log_options=log_options, execution_options=execution_options
             )
             
             print(f"🆔 启动了 {len(worker_processes)} 个Worker进程")
@@ -587,7 +710,8 @@ def main():
                 
                 master_process = multiprocessing.Process(
                     target=start_master_process,
-                    args=(tools_config, args.host, args.port, unified_log_path)
+                    args=(tools_config, args.host, args.port, unified_log_path, args.placement_policy,
+                          args.worker_pool_size, args.pool_keepalive_timeout, args.dns_cache_ttl, log_options)
                 )
                 master_process.start()
                 
@@ -602,7 +726,9 @@ def main():
                 
                 # 2. 启动Worker进程
                 worker_processes, worker_urls = start_multiple_workers(
-                    tools_config, args.host, args.port + 1, server_url, args.num_workers, unified_log_path
+                    tools_config, args.host, args.port + 1, server_url, args.num_workers, unified_log_path,
+                    capacity=args.worker_capacity, heartbeat_interval=args.heartbeat_interval,
+                    log_options=log_options, execution_options=execution_options
                 )
                 
                 # 等待Worker启动并注册
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Worker 中工具调用的执行方式
+
+Worker 的端点默认直接在 uvicorn 事件循环中 await 工具方法，CPU 密集或阻塞的工具（求解器、模拟器、
+子进程等）会阻塞该 Worker 上的所有实例（包括 /health）。每个工具可以选择执行方式：
+- inline: 在事件循环中执行（默认，与原有行为一致），适合真正异步的工具
+- thread: 在线程池中执行，每个线程有自己的事件循环，工具对象在线程间共享
+- process: 在子进程中执行，每个子进程持有自己的工具对象；实例在 create 时分配到实例数最少的子进程，
+  之后该实例的所有调用都在同一子进程中执行（实例状态保存在子进程中）。每个子进程同一时间只执行一个调用
+
+timeout 为单次调用的超时时间（秒）：inline 模式取消协程（阻塞的同步代码无法被取消），thread 模式不再等待
+（线程会继续执行到结束，超时包含在线程池中排队的时间），process 模式终止并重启子进程，该子进程上的实例状态随之丢失。
+
+工具配置示例（executor 缺省时使用 Worker 的默认设置，见 cli.py 的 --execution_mode 等参数）:
+    tools:
+      - class_name: "xxx.SolverTool"
+        executor:
+          mode: process
+          pool_size: 4
+          timeout: 60
+        config: ...
+        tool_schema: ...
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+EXECUTION_MODES = ("inline", "thread", "process")
+
+
+class ToolTimeoutError(TimeoutError):
+    """工具调用超时"""
+
+
+class ToolExecutionError(RuntimeError):
+    """子进程中的工具调用失败（携带子进程中的异常堆栈）"""
+
+
+class ToolProcessLostError(ToolExecutionError):
+    """子进程意外退出，已重启"""
+
+
+class ToolExecutor:
+    """
+    在事件循环中直接执行工具方法（inline 模式）
+
+    Args:
+        tool: 工具实例
+        timeout: 单次调用的超时时间（秒），None 表示不限制
+    """
+
+    mode = "inline"
+
+    def __init__(self, tool: Any, timeout: Optional[float] = None):
+        self.tool = tool
+        self.timeout = timeout
+
+    async def call(self, method: str, instance_id: Optional[str], **kwargs) -> Any:
+        """调用工具方法（create / execute / calc_reward / release）"""
+        try:
+            return await asyncio.wait_for(self._call(method, instance_id, kwargs), self.timeout)
+        except asyncio.TimeoutError:
+            raise ToolTimeoutError(f"{method} timed out after {self.timeout}s")
+
+    async def _call(self, method: str, instance_id: Optional[str], kwargs: dict) -> Any:
+        return await getattr(self.tool, method)(instance_id, **kwargs)
+
+    def instance_count(self) -> int:
+        return len(getattr(self.tool, "_instance_dict", None) or {})
+
+    def close(self) -> None:
+        pass
+
+
+class ThreadToolExecutor(ToolExecutor):
+    """在线程池中执行工具方法（thread 模式），每个线程复用自己的事件循环"""
+
+    mode = "thread"
+
+    def __init__(self, tool: Any, timeout: Optional[float] = None, pool_size: Optional[int] = None):
+        super().__init__(tool, timeout)
+        self._pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix=f"tool-{tool.__class__.__name__}")
+        self._local = threading.local()
+
+    def _run(self, method: str, instance_id: Optional[str], kwargs: dict) -> Any:
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = self._local.loop = asyncio.new_event_loop()
+        return loop.run_until_complete(getattr(self.tool, method)(instance_id, **kwargs))
+
+    async def _call(self, method: str, instance_id: Optional[str], kwargs: dict) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._pool, self._run, method, instance_id, kwargs)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _child_main(conn, tool_config: Dict) -> None:
+    """子进程入口：加载工具后按顺序执行父进程发来的调用"""
+    from internbootcamp.utils.load_tool_from_config import load_tool_from_config
+
+    try:
+        _, _, tool = load_tool_from_config(tool_config)
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+        return
+    conn.send(("ready", None))
+    loop = asyncio.new_event_loop()
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        method, instance_id, kwargs = message
+        try:
+            result = loop.run_until_complete(getattr(tool, method)(instance_id, **kwargs))
+            conn.send(("ok", result))
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+    loop.close()
+
+
+class _ToolProcess:
+    """一个持有工具对象的子进程；调用在专用线程中串行收发，协程被取消时不会打乱请求与响应的对应关系"""
+
+    def __init__(self, tool_config: Dict, context, name: str):
+        self.tool_config = tool_config
+        self.context = context
+        self.name = name
+        self.process = None
+        self.conn = None
+        self.io_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    def _start(self) -> None:
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_child_main, args=(child_conn, self.tool_config), name=self.name, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        try:
+            status, payload = self.conn.recv()
+        except EOFError:
+            self.process.join(timeout=5)
+            status, payload = "error", f"exit code {self.process.exitcode}"
+        if status != "ready":
+            self._stop()
+            raise ToolExecutionError(f"Failed to load tool in {self.name}:\n{payload}")
+
+    def _stop(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.process is not None:
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+            self.process = None
+
+    def roundtrip(self, message: tuple, timeout: Optional[float]) -> Any:
+        """发送一次调用并等待结果（在 io_thread 中执行）；超时或子进程退出时重启子进程"""
+        if self.process is None or not self.process.is_alive():
+            self._stop()
+            self._start()
+        try:
+            self.conn.send(message)
+            ready = self.conn.poll(timeout)
+            if ready:
+                status, payload = self.conn.recv()
+        except (EOFError, OSError) as e:
+            self._stop()
+            raise ToolProcessLostError(f"{self.name} exited unexpectedly, restarting: {e!r}")
+        if not ready:
+            self._stop()
+            raise ToolTimeoutError(f"{message[0]} timed out after {timeout}s, {self.name} restarted")
+        if status != "ok":
+            raise ToolExecutionError(payload)
+        return payload
+
+    def close(self) -> None:
+        if self.conn is not None:
+            try:
+                self.conn.send(None)
+            except Exception:
+                pass
+        self._stop()
+        self.io_thread.shutdown(wait=False, cancel_futures=True)
+
+
+class ProcessToolExecutor(ToolExecutor):
+    """
+    在子进程中执行工具方法（process 模式），实例固定在创建它的子进程中
+
+    Args:
+        tool: Worker 进程中的工具实例（只用于名称等元信息，调用在子进程中的工具对象上执行）
+        tool_config: 工具配置，子进程用它重新加载工具
+        timeout: 单次调用的超时时间（秒），超时后重启子进程
+        pool_size: 子进程数，默认为 CPU 核数
+    """
+
+    mode = "process"
+
+    def __init__(self, tool: Any, tool_config: Dict, timeout: Optional[float] = None, pool_size: Optional[int] = None):
+        super().__init__(tool, timeout)
+        # spawn：Worker 进程中已有心跳、日志等线程，fork 可能导致子进程死锁
+        context = multiprocessing.get_context("spawn")
+        name = tool.__class__.__name__
+        self._processes: List[_ToolProcess] = [
+            _ToolProcess(tool_config, context, f"tool-{name}-{index}") for index in range(pool_size or os.cpu_count() or 1)
+        ]
+        self._instance_process: Dict[str, int] = {}  # instance_id -> 子进程序号
+        self._process_instances: List[set] = [set() for _ in self._processes]
+
+    def _assign(self, instance_id: Optional[str], record: bool) -> int:
+        """实例所在的子进程；未知实例分配到实例数最少的子进程，record 为 True（create）时记录分配"""
+        index = self._instance_process.get(instance_id)
+        if index is None:
+            index = min(range(len(self._processes)), key=lambda i: len(self._process_instances[i]))
+            if record:
+                self._instance_process[instance_id] = index
+                self._process_instances[index].add(instance_id)
+        return index
+
+    def _unassign(self, instance_id: Optional[str]) -> None:
+        index = self._instance_process.pop(instance_id, None)
+        if index is not None:
+            self._process_instances[index].discard(instance_id)
+
+    async def call(self, method: str, instance_id: Optional[str], **kwargs) -> Any:
+        is_new = instance_id not in self._instance_process
+        index = self._assign(instance_id, record=method == "create")
+        tool_process = self._processes[index]
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                tool_process.io_thread, tool_process.roundtrip, (method, instance_id, kwargs), self.timeout
+            )
+        except (ToolTimeoutError, ToolProcessLostError):
+            # 子进程已重启，其上的实例状态全部丢失
+            for lost_instance_id in list(self._process_instances[index]):
+                self._unassign(lost_instance_id)
+            raise
+        except Exception:
+            if method == "release" or (method == "create" and is_new):
+                self._unassign(instance_id)
+            raise
+        if method == "release":
+            self._unassign(instance_id)
+        return result
+
+    def instance_count(self) -> int:
+        return len(self._instance_process)
+
+    def close(self) -> None:
+        for tool_process in self._processes:
+            tool_process.close()
+
+
+def create_tool_executor(
+    tool: Any,
+    tool_config: Dict,
+    mode: str = "inline",
+    pool_size: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> ToolExecutor:
+    """按执行方式创建工具执行器"""
+    if mode == "inline":
+        return ToolExecutor(tool, timeout)
+    if mode == "thread":
+        return ThreadToolExecutor(tool, timeout, pool_size)
+    if mode == "process":
+        return ProcessToolExecutor(tool, tool_config, timeout, pool_size)
+    raise ValueError(f"不支持的执行方式: {mode}，可选: {EXECUTION_MODES}")
@@ -2,30 +2,48 @@
 """
 分布式Master服务器
 """
+import asyncio
 import os
-import random
 import threading
 import time
 import uvicorn
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Set
 
 import aiohttp
 from fastapi import FastAPI
 from fastapi.responses import HTMLResponse
 
-from .models import WorkerRegistrationData, CreateInput
+from internbootcamp.utils.http_pool import AiohttpSessionPool
+
+from .models import BATCH_OPERATIONS, BatchInput, WorkerRegistrationData, CreateInput
+from .placement import WorkerLoad, create_placement_policy
+from .server_log import ServerLogger
 from .utils import extract_tool_names_from_config
 
 
 class DistributedMasterServer:
     """分布式Master服务器，支持动态Worker注册和工具发现"""
     
-    def __init__(self, host: str, port: int, tools_config: List[Dict] = None, log_file: str = None):
+    def __init__(self, host: str, port: int, tools_config: List[Dict] = None, log_file: str = None,
+                 placement_policy: str = "least_instances", worker_pool_size: int = 100,
+                 pool_keepalive_timeout: float = 30.0, dns_cache_ttl: Optional[int] = 300,
+                 log_options: Optional[Dict] = None):
         self.host = host
         self.port = port
         self.log_file = log_file
+        # 后台线程写日志（级别、采样、JSON 格式、轮转，见 server_log.py）
+        self.logger = ServerLogger("master", log_file=log_file, **(log_options or {}))
+        # 实例放置策略（见 placement.py）与各Worker的负载
+        self.placement_policy = create_placement_policy(placement_policy)
+        self.worker_loads: Dict[str, WorkerLoad] = {}
+        # 每个Worker一个长期存活的连接池（按worker_url缓存，首次转发时创建，关闭服务器时释放）
+        self._session_pool = AiohttpSessionPool(
+            limit=worker_pool_size,
+            keepalive_timeout=pool_keepalive_timeout,
+            dns_cache_ttl=dns_cache_ttl,
+        )
         self.app = FastAPI(title="Distributed Master Server")
         
         # 动态工具发现
@@ -35,6 +53,11 @@ class DistributedMasterServer:
         # Worker管理
         self.workers: Dict[str, Dict] = {}  # worker_id -> worker_info
         self.instance_worker_mapping = {}  # instance_id -> worker_id
+        # 反向索引与计数，路由与清理不再遍历全部实例映射；只通过 _map_instance / _unmap_instance 修改
+        self.worker_instances: Dict[str, Set[str]] = {}  # worker_id -> {instance_id}
+        self.instance_tool_mapping: Dict[str, str] = {}  # instance_id -> tool_name
+        self.tool_instance_counts: Dict[str, int] = {}  # tool_name -> 实例数
+        self._mapping_lock = threading.Lock()  # 健康监控线程也会清理映射
         self.worker_last_heartbeat = {}  # worker_id -> timestamp
         self.health_check_thread = None
         self.stop_health_check = False
@@ -54,20 +77,18 @@ class DistributedMasterServer:
         
         self._setup_routes()
     
-    def _log(self, message: str):
-        """统一的日志记录方法"""
-        log_line = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}"
-        print(log_line)
-        if self.log_file:
-            try:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(log_line + '\n')
-            except Exception as e:
-                print(f"警告：写入日志文件失败: {e}")
+    def _log(self, message: str, level: str = "INFO", **fields):
+        """统一的日志记录方法（写入后台日志队列，不阻塞事件循环）"""
+        self.logger.log(message, level, **fields)
 
     def _setup_routes(self):
         """设置Master服务器的路由"""
         self._log("🔗 分布式Master服务器设置路由...")
+
+        @self.app.on_event("shutdown")
+        async def close_worker_sessions():
+            """关闭到各Worker的连接池"""
+            await self._session_pool.close()
         
         @self.app.get("/", response_class=HTMLResponse, tags=["Master"])
         async def dashboard():
@@ -86,11 +107,14 @@ class DistributedMasterServer:
                         "url": info["worker_url"],
                         "tools": info["tools"],
                         "last_heartbeat": self.worker_last_heartbeat.get(worker_id, "never"),
-                        "status": "alive" if self._is_worker_healthy(worker_id) else "dead"
+                        "status": "alive" if self._is_worker_healthy(worker_id) else "dead",
+                        "load": self.worker_loads[worker_id].as_dict() if worker_id in self.worker_loads else {},
                     }
                     for worker_id, info in self.workers.items()
                 },
-                "instance_mappings": len(self.instance_worker_mapping)
+                "instance_mappings": len(self.instance_worker_mapping),
+                "placement_policy": self.placement_policy.name,
+                "tool_instances": dict(self.tool_instance_counts),
             }
 
         @self.app.post("/register_worker", tags=["Master"])
@@ -101,12 +125,13 @@ class DistributedMasterServer:
             
             # 验证Worker是否可达
             try:
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(f"{worker_url}/health", timeout=10) as response:
-                        if response.status != 200:
-                            return {"success": False, "error": f"Worker health check failed: {response.status}"}
+                async with self._session_pool.get(worker_url).get(f"{worker_url}/health", timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if response.status != 200:
+                        return {"success": False, "error": f"Worker health check failed: {response.status}"}
             except Exception as e:
                 return {"success": False, "error": f"Cannot reach worker: {e}"}
+            # 关闭已不属于任何Worker的连接池（如被健康监控清理的Worker）
+            await self._close_stale_sessions(keep={worker_url})
             
             # 注册Worker
             self.workers[worker_id] = {
@@ -116,6 +141,7 @@ class DistributedMasterServer:
                 "registered_at": datetime.now().isoformat()
             }
             self.worker_last_heartbeat[worker_id] = time.time()
+            self.worker_loads.setdefault(worker_id, WorkerLoad())
             
             # 动态工具发现：为新工具创建路由
             new_tools = []
@@ -151,6 +177,8 @@ class DistributedMasterServer:
                 # 更新Worker状态信息
                 if "instance_count" in heartbeat_data:
                     self.workers[worker_id]["instance_count"] = heartbeat_data["instance_count"]
+                # Worker上报的负载（CPU、在途请求数、容量等），供放置策略使用
+                self.worker_loads.setdefault(worker_id, WorkerLoad()).update_report(heartbeat_data.get("load"))
                 return {"success": True}
             return {"success": False, "error": "Worker not registered"}
 
@@ -160,12 +188,7 @@ class DistributedMasterServer:
             worker_id = data.get("worker_id")
             if worker_id in self.workers:
                 # 清理该Worker上的所有实例映射
-                instances_to_remove = [
-                    instance_id for instance_id, mapped_worker_id in self.instance_worker_mapping.items()
-                    if mapped_worker_id == worker_id
-                ]
-                for instance_id in instances_to_remove:
-                    del self.instance_worker_mapping[instance_id]
+                self._unmap_worker_instances(worker_id)
                 
                 # 清理工具映射
                 worker_tools = self.workers[worker_id].get("tools", [])
@@ -175,12 +198,14 @@ class DistributedMasterServer:
                             self.available_tools[tool_name].remove(worker_id)
                         # 如果没有Worker提供此工具，可以考虑移除路由（可选）
                         if not self.available_tools[tool_name]:
-                            self._log(f"⚠️  工具 {tool_name} 无可用Worker")
+                            self._log(f"⚠️  工具 {tool_name} 无可用Worker", "WARNING")
                 
                 # 移除Worker
                 del self.workers[worker_id]
                 if worker_id in self.worker_last_heartbeat:
                     del self.worker_last_heartbeat[worker_id]
+                self.worker_loads.pop(worker_id, None)
+                await self._close_stale_sessions()
                 
                 self._log(f"✅ Worker注销成功: {worker_id}")
                 self._log(f"   已清理工具映射: {worker_tools}")
@@ -205,37 +230,26 @@ class DistributedMasterServer:
                 return {"success": False, "error": "instance_id is required"}
             
             # 选择健康的Worker（负载均衡）
-            # 使用动态工具映射
-            tool_workers = self.available_tools.get(tool_name, [])
-            available_workers = [
-                worker_id for worker_id in tool_workers
-                if self._is_worker_healthy(worker_id)
-            ]
-            
-            if not available_workers:
+            worker_id = self._select_worker(tool_name)
+            if worker_id is None:
                 return {"success": False, "error": f"No healthy workers available for tool {tool_name}"}
             
-            # 简单的负载均衡：先找出最少实例数
-            min_instance_count = min(self._get_worker_instance_count(worker_id) for worker_id in available_workers)
-            # self._log(f"[MASTER] {tool_name} 最少实例数: {min_instance_count}")
-            # 从实例数最少的Workers中随机选择一个
-            worker_id = random.choice([worker_id for worker_id in available_workers if self._get_worker_instance_count(worker_id) == min_instance_count])
-            
-            worker_url = self.workers[worker_id]["worker_url"]
-            
             # 建立映射关系
-            self.instance_worker_mapping[instance_id] = worker_id
-            instance_count = self._get_worker_instance_count(worker_id)
+            self._map_instance(instance_id, worker_id, tool_name)
             
-            self._log(f"[MASTER] {tool_name} 创建请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}]")
+            if self.logger.should_log("DEBUG", sampled=True):
+                worker_url = self.workers[worker_id]["worker_url"]
+                instance_count = self._get_worker_instance_count(worker_id)
+                self._log(f"[MASTER] {tool_name} 创建请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}]",
+                          "DEBUG", tool=tool_name, instance_id=instance_id, worker_id=worker_id)
             
             # 转发请求到选中的worker
-            result = await self._forward_request(worker_url, f"/{tool_name}/create", input_dict)
+            result = await self._forward_to_worker(worker_id, f"/{tool_name}/create", input_dict)
             
             if not result.get("success", False):
-                self._log(f"[MASTER] {tool_name} 创建请求失败: {result}")
+                self._log(f"[MASTER] {tool_name} 创建请求失败: {result}", "WARNING", tool=tool_name, instance_id=instance_id, worker_id=worker_id)
                 # 如果创建失败，清理映射
-                self.instance_worker_mapping.pop(instance_id, None)
+                self._unmap_instance(instance_id)
             
             return result
 
@@ -254,13 +268,15 @@ class DistributedMasterServer:
             if not self._is_worker_healthy(worker_id):
                 return {"success": False, "error": f"Worker {worker_id} is not healthy"}
             
-            worker_url = self.workers[worker_id]["worker_url"]
-            instance_count = self._get_worker_instance_count(worker_id)
-            all_worker_instances = {w_id: self._get_worker_instance_count(w_id) for w_id in self.workers.keys()}
-            self._log(f"[MASTER] {tool_name} 执行请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}] [all worker instances: {all_worker_instances}]")
+            if self.logger.should_log("DEBUG", sampled=True):
+                worker_url = self.workers[worker_id]["worker_url"]
+                instance_count = self._get_worker_instance_count(worker_id)
+                all_worker_instances = {w_id: self._get_worker_instance_count(w_id) for w_id in list(self.workers)}
+                self._log(f"[MASTER] {tool_name} 执行请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}] [all worker instances: {all_worker_instances}]",
+                          "DEBUG", tool=tool_name, instance_id=instance_id, worker_id=worker_id)
             
             # 转发请求
-            return await self._forward_request(worker_url, f"/{tool_name}/execute", input_data)
+            return await self._forward_to_worker(worker_id, f"/{tool_name}/execute", input_data, record_latency=True)
 
         @self.app.post(f"/{tool_name}/release", tags=[tool_name])
         async def release_endpoint(input_data: dict):
@@ -273,21 +289,25 @@ class DistributedMasterServer:
             worker_id = self.instance_worker_mapping.get(instance_id)
             if not worker_id or worker_id not in self.workers:
                 # 实例映射不存在或Worker已失效，直接清理映射
-                self.instance_worker_mapping.pop(instance_id, None)
+                self._unmap_instance(instance_id)
                 return {"success": False, "error": f"No worker found for instance_id: {instance_id}"}
             
-            worker_url = self.workers[worker_id]["worker_url"]
-            instance_count = self._get_worker_instance_count(worker_id)
-            all_worker_instances = {w_id: self._get_worker_instance_count(w_id) for w_id in self.workers.keys()}
-            self._log(f"[MASTER] {tool_name} 释放请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}] [all worker instances: {all_worker_instances}]")
+            if self.logger.should_log("DEBUG", sampled=True):
+                worker_url = self.workers[worker_id]["worker_url"]
+                instance_count = self._get_worker_instance_count(worker_id)
+                all_worker_instances = {w_id: self._get_worker_instance_count(w_id) for w_id in list(self.workers)}
+                self._log(f"[MASTER] {tool_name} 释放请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}] [all worker instances: {all_worker_instances}]",
+                          "DEBUG", tool=tool_name, instance_id=instance_id, worker_id=worker_id)
             
             # 转发请求
-            result = await self._forward_request(worker_url, f"/{tool_name}/release", input_data)
+            result = await self._forward_to_worker(worker_id, f"/{tool_name}/release", input_data)
             
             # 无论释放成功还是失败，都清理映射（防止累积）
             # 如果Worker已经不存在该实例，我们也应该清理Master的映射
-            self.instance_worker_mapping.pop(instance_id, None)
-            self._log(f"[MASTER] {tool_name} 实例映射已清理: {instance_id} (release result: {result.get('success', False)})")
+            self._unmap_instance(instance_id)
+            if self.logger.should_log("DEBUG", sampled=True):
+                self._log(f"[MASTER] {tool_name} 实例映射已清理: {instance_id} (release result: {result.get('success', False)})",
+                          "DEBUG", tool=tool_name, instance_id=instance_id)
             
             return result
 
@@ -306,32 +326,162 @@ class DistributedMasterServer:
             if not self._is_worker_healthy(worker_id):
                 return {"success": False, "error": f"Worker {worker_id} is not healthy"}
             
-            worker_url = self.workers[worker_id]["worker_url"]
-            instance_count = self._get_worker_instance_count(worker_id)
-            self._log(f"[MASTER] {tool_name} 计算奖励请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}]")
+            if self.logger.should_log("DEBUG", sampled=True):
+                worker_url = self.workers[worker_id]["worker_url"]
+                instance_count = self._get_worker_instance_count(worker_id)
+                self._log(f"[MASTER] {tool_name} 计算奖励请求路由到 {worker_id} ({worker_url}) [instances: {instance_count}]",
+                          "DEBUG", tool=tool_name, instance_id=instance_id, worker_id=worker_id)
             
             # 转发请求
-            return await self._forward_request(worker_url, f"/{tool_name}/calc_reward", input_data)
+            return await self._forward_to_worker(worker_id, f"/{tool_name}/calc_reward", input_data)
+
+        @self.app.post(f"/{tool_name}/execute_batch", tags=[tool_name])
+        async def execute_batch_endpoint(input_data: BatchInput):
+            operations = input_data.operations
+            results = [None] * len(operations)
+            # 按Worker分组，每个Worker只转发一次批量请求
+            worker_operations: Dict[str, List[int]] = {}
+            for index, operation in enumerate(operations):
+                op = operation.get("op")
+                instance_id = operation.get("instance_id")
+                if op not in BATCH_OPERATIONS:
+                    results[index] = {"success": False, "error": f"Unsupported op: {op}, expected one of {BATCH_OPERATIONS}"}
+                    continue
+                if not instance_id:
+                    results[index] = {"success": False, "error": "instance_id is required"}
+                    continue
+                worker_id = self.instance_worker_mapping.get(instance_id)
+                if op == "create" and (not worker_id or worker_id not in self.workers):
+                    worker_id = self._select_worker(tool_name)
+                    if worker_id is None:
+                        results[index] = {"success": False, "error": f"No healthy workers available for tool {tool_name}"}
+                        continue
+                    self._map_instance(instance_id, worker_id, tool_name)
+                elif not worker_id or worker_id not in self.workers:
+                    if op == "release":
+                        self._unmap_instance(instance_id)
+                    results[index] = {"success": False, "error": f"No worker found for instance_id: {instance_id}"}
+                    continue
+                elif op != "release" and not self._is_worker_healthy(worker_id):
+                    results[index] = {"success": False, "error": f"Worker {worker_id} is not healthy"}
+                    continue
+                worker_operations.setdefault(worker_id, []).append(index)
+
+            async def forward_worker_operations(worker_id: str, indices: List[int]):
+                result = await self._forward_to_worker(
+                    worker_id, f"/{tool_name}/execute_batch", {"operations": [operations[index] for index in indices]}
+                )
+                worker_results = result.get("results") if isinstance(result, dict) else None
+                if not isinstance(worker_results, list) or len(worker_results) != len(indices):
+                    worker_results = [{"success": False, "error": result.get("error", f"Invalid batch response: {result}")}] * len(indices)
+                for index, worker_result in zip(indices, worker_results):
+                    results[index] = worker_result
+                    op = operations[index]["op"]
+                    instance_id = operations[index]["instance_id"]
+                    # 创建失败时清理映射；释放后无论成功与否都清理映射（与单个请求端点一致）
+                    if op == "release" or (op == "create" and not (isinstance(worker_result, dict) and worker_result.get("success"))):
+                        self._unmap_instance(instance_id)
+
+            await asyncio.gather(*(forward_worker_operations(worker_id, indices) for worker_id, indices in worker_operations.items()))
+            if self.logger.should_log("DEBUG", sampled=True):
+                self._log(f"[MASTER] {tool_name} 批量请求: {len(operations)} 个操作分发到 {len(worker_operations)} 个Worker",
+                          "DEBUG", tool=tool_name, operations=len(operations), workers=len(worker_operations))
+            return {"results": results}
+
+    def _select_worker(self, tool_name: str):
+        """按放置策略为新实例选择健康的Worker，没有可用Worker时返回None"""
+        # 使用动态工具映射
+        tool_workers = self.available_tools.get(tool_name, [])
+        available_workers = [
+            worker_id for worker_id in tool_workers
+            if self._is_worker_healthy(worker_id)
+        ]
+        if not available_workers:
+            return None
+        instance_counts = {worker_id: self._get_worker_instance_count(worker_id) for worker_id in available_workers}
+        loads = {worker_id: self.worker_loads.setdefault(worker_id, WorkerLoad()) for worker_id in available_workers}
+        return self.placement_policy.select(available_workers, instance_counts, loads)
 
     def _get_worker_instance_count(self, worker_id: str) -> int:
         """获取指定worker映射的instance数量"""
-        return sum(1 for mapped_worker_id in self.instance_worker_mapping.values() 
-                  if mapped_worker_id == worker_id)
+        return len(self.worker_instances.get(worker_id, ()))
+
+    def _map_instance(self, instance_id: str, worker_id: str, tool_name: str) -> None:
+        """建立 instance_id -> worker_id 映射并更新计数（已有映射时先移除）"""
+        with self._mapping_lock:
+            self._unmap_instance_locked(instance_id)
+            self.instance_worker_mapping[instance_id] = worker_id
+            self.instance_tool_mapping[instance_id] = tool_name
+            self.worker_instances.setdefault(worker_id, set()).add(instance_id)
+            self.tool_instance_counts[tool_name] = self.tool_instance_counts.get(tool_name, 0) + 1
+
+    def _unmap_instance(self, instance_id: str) -> Optional[str]:
+        """移除实例映射并更新计数，返回原来映射的 worker_id"""
+        with self._mapping_lock:
+            return self._unmap_instance_locked(instance_id)
+
+    def _unmap_instance_locked(self, instance_id: str) -> Optional[str]:
+        worker_id = self.instance_worker_mapping.pop(instance_id, None)
+        if worker_id is None:
+            return None
+        worker_instances = self.worker_instances.get(worker_id)
+        if worker_instances is not None:
+            worker_instances.discard(instance_id)
+            if not worker_instances:
+                del self.worker_instances[worker_id]
+        tool_name = self.instance_tool_mapping.pop(instance_id, None)
+        if tool_name is not None:
+            self.tool_instance_counts[tool_name] -= 1
+            if self.tool_instance_counts[tool_name] <= 0:
+                del self.tool_instance_counts[tool_name]
+        return worker_id
+
+    def _unmap_worker_instances(self, worker_id: str) -> List[str]:
+        """移除指定Worker上的全部实例映射，返回被移除的 instance_id"""
+        with self._mapping_lock:
+            instance_ids = list(self.worker_instances.get(worker_id, ()))
+            for instance_id in instance_ids:
+                self._unmap_instance_locked(instance_id)
+        return instance_ids
+
+    async def _forward_to_worker(self, worker_id: str, path: str, data: dict, record_latency: bool = False) -> dict:
+        """转发请求到指定的worker，并记录在途请求数与（执行请求的）延迟"""
+        worker_info = self.workers.get(worker_id)
+        if worker_info is None:
+            # Worker可能刚被健康监控线程清理
+            return {"success": False, "error": f"Worker {worker_id} is not registered"}
+        load = self.worker_loads.setdefault(worker_id, WorkerLoad())
+        load.inflight += 1
+        start_time = time.perf_counter()
+        try:
+            result = await self._forward_request(worker_info["worker_url"], path, data)
+        finally:
+            load.inflight -= 1
+        if record_latency:
+            load.observe_latency(time.perf_counter() - start_time)
+        return result
 
     async def _forward_request(self, worker_url: str, path: str, data: dict) -> dict:
         """转发请求到指定的worker"""
         full_url = f"{worker_url}{path}"
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(full_url, json=data, timeout=None) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        error_text = await response.text()
-                        return {"success": False, "error": f"Worker returned {response.status}: {error_text}"}
+            session = self._session_pool.get(worker_url)
+            async with session.post(full_url, json=data, timeout=aiohttp.ClientTimeout(total=None)) as response:
+                if response.status == 200:
+                    return await response.json()
+                else:
+                    error_text = await response.text()
+                    return {"success": False, "error": f"Worker returned {response.status}: {error_text}"}
         except Exception as e:
             return {"success": False, "error": f"Request failed: {str(e)}"}
 
+    async def _close_stale_sessions(self, keep: Set[str] = frozenset()) -> None:
+        """关闭不属于当前已注册Worker的连接池"""
+        active_urls = {worker_info["worker_url"] for worker_info in list(self.workers.values())} | set(keep)
+        for worker_url in self._session_pool.keys():
+            if worker_url not in active_urls:
+                await self._session_pool.close(worker_url)
+
     def _is_worker_healthy(self, worker_id: str, timeout: int = 60) -> bool:
         """检查Worker是否健康（基于心跳时间）"""
         if worker_id not in self.worker_last_heartbeat:
@@ -347,7 +497,7 @@ class DistributedMasterServer:
             with open(template_path, 'r', encoding='utf-8') as f:
                 return f.read()
         except Exception as e:
-            self._log(f"⚠️  加载仪表板模板失败: {e}")
+            self._log(f"⚠️  加载仪表板模板失败: {e}", "WARNING")
             return "<html><body><h1>仪表板模板加载失败</h1></body></html>"
     
     def _generate_dashboard_html(self) -> str:
@@ -441,15 +591,10 @@ class DistributedMasterServer:
                 
                 # 清理死掉的Worker
                 for worker_id in dead_workers:
-                    self._log(f"⚠️  检测到Worker {worker_id} 死亡，正在清理...")
+                    self._log(f"⚠️  检测到Worker {worker_id} 死亡，正在清理...", "WARNING")
                     
                     # 清理实例映射
-                    instances_to_remove = [
-                        instance_id for instance_id, mapped_worker_id in self.instance_worker_mapping.items()
-                        if mapped_worker_id == worker_id
-                    ]
-                    for instance_id in instances_to_remove:
-                        del self.instance_worker_mapping[instance_id]
+                    for instance_id in self._unmap_worker_instances(worker_id):
                         self._log(f"  - 清理实例映射: {instance_id}")
                     
                     # 移除Worker
@@ -457,6 +602,7 @@ class DistributedMasterServer:
                         del self.workers[worker_id]
                     if worker_id in self.worker_last_heartbeat:
                         del self.worker_last_heartbeat[worker_id]
+                    self.worker_loads.pop(worker_id, None)
                     
                     self._log(f"  - ✅ Worker {worker_id} 已清理")
                 
@@ -7,6 +7,10 @@ from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 
+# /{tool_name}/execute_batch 支持的操作
+BATCH_OPERATIONS = ("create", "execute", "calc_reward", "release")
+
+
 class WorkerRegistrationData(BaseModel):
     """Worker注册数据模型"""
     worker_id: str
@@ -18,4 +22,12 @@ class WorkerRegistrationData(BaseModel):
 class CreateInput(BaseModel):
     """工具创建输入模型"""
     instance_id: Optional[str] = None
-    identity: Optional[dict] = None 
\ No newline at end of file
+    identity: Optional[dict] = None 
+
+class BatchInput(BaseModel):
+    """批量请求输入模型
+
+    operations 中每个操作为 {"op": "create" | "execute" | "calc_reward" | "release", "instance_id": ...}，
+    create 可带 identity，execute 带 parameters；结果按 operations 的顺序返回，与单个请求端点的返回一致
+    """
+    operations: List[Dict] = []
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+工具实例的放置策略
+
+Master 在创建实例时用放置策略从健康的 Worker 中选择一个：
+- least_instances: 映射实例数最少（默认，与原有行为一致）
+- least_inflight: Master 转发中、尚未返回的请求数最少
+- ewma_latency: 执行请求的 EWMA 延迟 ×（在途请求数 + 1）最小，尚无延迟数据的 Worker 优先
+- p2c: 随机选两个 Worker，取实例数 + 在途请求数较小者（power of two choices）
+- weighted: 实例数 / Worker 上报的容量（capacity，默认为 CPU 核数）最小
+
+Worker 在心跳中上报负载（CPU、内存、load average、在途请求数、容量），见 DistributedWorkerServer。
+"""
+
+import random
+from typing import Dict, List, Optional
+
+PLACEMENT_POLICIES = ("least_instances", "least_inflight", "ewma_latency", "p2c", "weighted")
+
+
+class WorkerLoad:
+    """Master 侧记录的单个 Worker 负载"""
+
+    def __init__(self, ewma_alpha: float = 0.3):
+        self.ewma_alpha = ewma_alpha
+        self.inflight = 0  # Master 转发中的请求数
+        self.ewma_latency: Optional[float] = None  # 执行请求延迟的指数滑动平均（秒）
+        self.reported: Dict = {}  # Worker 心跳上报的负载
+
+    @property
+    def capacity(self) -> float:
+        capacity = self.reported.get("capacity")
+        return float(capacity) if capacity else 1.0
+
+    def observe_latency(self, seconds: float) -> None:
+        if self.ewma_latency is None:
+            self.ewma_latency = seconds
+        else:
+            self.ewma_latency += self.ewma_alpha * (seconds - self.ewma_latency)
+
+    def update_report(self, load: Optional[Dict]) -> None:
+        if load:
+            self.reported = dict(load)
+
+    def as_dict(self) -> Dict:
+        return {
+            "inflight": self.inflight,
+            "ewma_latency": round(self.ewma_latency, 6) if self.ewma_latency is not None else None,
+            **self.reported,
+        }
+
+
+class PlacementPolicy:
+    """放置策略：score 越小越优先，分数相同时随机选择"""
+
+    name = ""
+
+    def score(self, instance_count: int, load: WorkerLoad) -> float:
+        raise NotImplementedError
+
+    def select(self, candidates: List[str], instance_counts: Dict[str, int], loads: Dict[str, WorkerLoad]) -> str:
+        scores = {worker_id: self.score(instance_counts[worker_id], loads[worker_id]) for worker_id in candidates}
+        min_score = min(scores.values())
+        return random.choice([worker_id for worker_id, score in scores.items() if score == min_score])
+
+
+class LeastInstancesPolicy(PlacementPolicy):
+    name = "least_instances"
+
+    def score(self, instance_count: int, load: WorkerLoad) -> float:
+        return instance_count
+
+
+class LeastInflightPolicy(PlacementPolicy):
+    name = "least_inflight"
+
+    def score(self, instance_count: int, load: WorkerLoad) -> float:
+        # 在途请求数相同时选实例数少的
+        return load.inflight + instance_count * 1e-6
+
+
+class EwmaLatencyPolicy(PlacementPolicy):
+    name = "ewma_latency"
+
+    def score(self, instance_count: int, load: WorkerLoad) -> float:
+        if load.ewma_latency is None:
+            # 新 Worker 先接收请求以获得延迟数据
+            return -1.0 / (instance_count + 1)
+        return load.ewma_latency * (load.inflight + 1)
+
+
+class PowerOfTwoChoicesPolicy(PlacementPolicy):
+    name = "p2c"
+
+    def score(self, instance_count: int, load: WorkerLoad) -> float:
+        return instance_count + load.inflight
+
+    def select(self, candidates: List[str], instance_counts: Dict[str, int], loads: Dict[str, WorkerLoad]) -> str:
+        if len(candidates) > 2:
+            candidates = random.sample(candidates, 2)
+        return super().select(candidates, instance_counts, loads)
+
+
+class WeightedCapacityPolicy(PlacementPolicy):
+    name = "weighted"
+
+    def score(self, instance_count: int, load: WorkerLoad) -> float:
+        return (instance_count + 1) / load.capacity
+
+
+_POLICY_CLASSES = {
+    policy_class.name: policy_class
+    for policy_class in (LeastInstancesPolicy, LeastInflightPolicy, EwmaLatencyPolicy, PowerOfTwoChoicesPolicy, WeightedCapacityPolicy)
+}
+
+
+def create_placement_policy(name: str) -> PlacementPolicy:
+    """按名称创建放置策略"""
+    if name not in _POLICY_CLASSES:
+        raise ValueError(f"不支持的放置策略: {name}，可选: {PLACEMENT_POLICIES}")
+    return _POLICY_CLASSES[name]()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Master/Worker 服务器的异步日志
+
+请求处理函数只把日志记录放入内存队列（QueueHandler），由后台线程（QueueListener）写控制台与日志文件，
+事件循环不会阻塞在磁盘 I/O 上：
+- 级别：DEBUG / INFO / WARNING / ERROR，低于 level 的日志直接丢弃（不格式化）
+- 采样：请求热路径上的逐请求日志（sampled=True）按 sample_rate 采样，WARNING 及以上不采样
+- 格式：text 为 "[时间] 消息"（与原有格式一致），json 为每行一个 JSON 对象，附带结构化字段
+- 轮转：日志文件超过 max_bytes 时轮转，保留 backup_count 个旧文件
+
+示例用法:
+    logger = ServerLogger("master", log_file="master.log", level="INFO", json_format=True)
+    logger.log("Worker注册成功", worker_id=worker_id)
+    if logger.should_log("DEBUG", sampled=True):
+        logger.log(f"执行输入: {input_data}", "DEBUG", tool=tool_name)
+    logger.close()
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from datetime import datetime
+from typing import Optional
+
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+LOG_FORMATS = ("text", "json")
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = f"[{datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')}] {record.getMessage()}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ServerLogger:
+    """
+    基于队列的后台日志
+
+    Args:
+        name: 日志名称（如 master、worker-<id>）
+        log_file: 日志文件路径，None 表示只输出到控制台
+        level: 日志级别
+        json_format: 是否输出 JSON 格式
+        sample_rate: 逐请求日志的采样率（0~1）
+        max_bytes: 日志文件轮转大小（字节），0 表示不轮转
+        backup_count: 轮转时保留的旧文件数
+        console: 是否输出到控制台（stdout）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        log_file: Optional[str] = None,
+        level: str = "INFO",
+        json_format: bool = False,
+        sample_rate: float = 1.0,
+        max_bytes: int = 0,
+        backup_count: int = 5,
+        console: bool = True,
+    ):
+        if level.upper() not in LOG_LEVELS:
+            raise ValueError(f"不支持的日志级别: {level}，可选: {LOG_LEVELS}")
+        self.level = logging.getLevelName(level.upper())
+        self.sample_rate = sample_rate
+
+        formatter = _JsonFormatter() if json_format else _TextFormatter()
+        handlers = []
+        if console:
+            handlers.append(logging.StreamHandler(sys.stdout))
+        if log_file:
+            handlers.append(logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8",
+            ))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        self._logger = logging.getLogger(f"internbootcamp.tool_server.{name}")
+        self._logger.propagate = False
+        self._logger.setLevel(self.level)
+        for handler in list(self._logger.handlers):
+            self._logger.removeHandler(handler)
+        log_queue = queue.SimpleQueue()
+        self._logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=False)
+        self._listener.start()
+        atexit.register(self.close)
+
+    def should_log(self, level: str = "INFO", sampled: bool = False) -> bool:
+        """是否记录该级别的日志；逐请求日志在格式化消息前调用，避免被丢弃的日志产生格式化开销"""
+        levelno = logging.getLevelName(level)
+        if levelno < self.level:
+            return False
+        if sampled and levelno < logging.WARNING and self.sample_rate < 1.0:
+            return random.random() < self.sample_rate
+        return True
+
+    def log(self, message: str, level: str = "INFO", **fields) -> None:
+        """记录一条日志，fields 作为结构化字段写入 JSON 日志"""
+        levelno = logging.getLevelName(level)
+        if levelno >= self.level:
+            self._logger.log(levelno, message, extra={"fields": fields})
+
+    def close(self) -> None:
+        """停止后台线程并写出队列中剩余的日志"""
+        # 已关闭的日志不再由退出钩子持有（频繁创建的 Master/Worker 实例不会累积在 atexit 中）
+        atexit.unregister(self.close)
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
@@ -4,20 +4,23 @@
 """
 
 import asyncio
+import os
 import random
 import requests
 import socket
 import threading
 import time
 import uvicorn
-from datetime import datetime
 from typing import Dict, List, Optional
 
 import aiohttp
-from fastapi import FastAPI
+import psutil
+from fastapi import FastAPI, Request
 
 from internbootcamp.utils.load_tool_from_config import load_tool_from_config
-from .models import WorkerRegistrationData, CreateInput
+from .executors import ToolExecutor, ToolTimeoutError, create_tool_executor
+from .models import BATCH_OPERATIONS, BatchInput, WorkerRegistrationData, CreateInput
+from .server_log import ServerLogger
 from .utils import get_external_ip, find_available_port, find_available_port_range, is_port_available
 
 
@@ -25,34 +28,44 @@ class DistributedWorkerServer:
     """分布式Worker服务器，可独立部署并注册到Master"""
     
     def __init__(self, tools_config: List[Dict], host: str, port: int, worker_id: str, 
-                 master_url: Optional[str] = None, log_file: str = None):
+                 master_url: Optional[str] = None, log_file: str = None,
+                 capacity: Optional[float] = None, heartbeat_interval: int = 30,
+                 log_options: Optional[Dict] = None, execution_options: Optional[Dict] = None):
         self.tools_config = tools_config
         self.host = host
         self.port = port
         self.worker_id = worker_id
         self.master_url = master_url
         self.log_file = log_file
+        # 后台线程写日志（级别、采样、JSON 格式、轮转，见 server_log.py）
+        self.logger = ServerLogger(f"worker-{worker_id}", log_file=log_file, **(log_options or {}))
         self.app = FastAPI(title=f"Distributed Worker Server {worker_id}")
         self.tools = {}
         self.tool_names = []
+        # 工具调用的执行方式（inline/thread/process，见 executors.py）：execution_options 为默认设置，
+        # 工具配置中的 executor 字段可单独覆盖
+        self.execution_options = execution_options or {}
+        self.executors: Dict[str, ToolExecutor] = {}
         self.is_registered = False
         self.heartbeat_thread = None
         self.stop_heartbeat = False
         self.registration_thread = None
+        # 心跳中上报的负载：capacity 为Worker的容量权重（默认CPU核数），inflight 为处理中的请求数
+        self.capacity = capacity or psutil.cpu_count() or 1
+        self.heartbeat_interval = heartbeat_interval
+        self.inflight = 0
         
         self._load_tools()
         self._setup_routes()
     
-    def _log(self, message: str):
-        """统一的日志记录方法"""
-        log_line = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}"
-        print(log_line)
-        if self.log_file:
-            try:
-                with open(self.log_file, 'a', encoding='utf-8') as f:
-                    f.write(log_line + '\n')
-            except Exception as e:
-                print(f"警告：写入日志文件失败: {e}")
+    def _log(self, message: str, level: str = "INFO", **fields):
+        """统一的日志记录方法（写入后台日志队列，不阻塞事件循环）"""
+        self.logger.log(message, level, worker_id=self.worker_id, **fields)
+
+    def _log_request(self, tool_name: str, action: str, payload):
+        """逐请求的调试日志：按级别与采样率判断后才格式化 payload"""
+        if self.logger.should_log("DEBUG", sampled=True):
+            self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} {action}: {payload}", "DEBUG", tool=tool_name, action=action)
 
     def _load_tools(self):
         """加载并实例化配置文件中的所有工具"""
@@ -61,11 +74,13 @@ class DistributedWorkerServer:
             try:
                 _,_,tool_instance = load_tool_from_config(tool_config)
                 tool_name = tool_instance.__class__.__name__
+                executor_options = {**self.execution_options, **(tool_config.get("executor") or {})}
+                self.executors[tool_name] = create_tool_executor(tool_instance, tool_config, **executor_options)
                 self.tools[tool_name] = tool_instance
                 self.tool_names.append(tool_name)
-                self._log(f"  - ✅ Worker {self.worker_id} 已加载: {tool_name}")
+                self._log(f"  - ✅ Worker {self.worker_id} 已加载: {tool_name} (执行方式: {self.executors[tool_name].mode})")
             except Exception as e:
-                self._log(f"  - ❌ Worker {self.worker_id} 加载工具失败 {tool_config.get('class_name', 'N/A')}: {e}")
+                self._log(f"  - ❌ Worker {self.worker_id} 加载工具失败 {tool_config.get('class_name', 'N/A')}: {e}", "ERROR")
                 import traceback
                 traceback.print_exc()
     
@@ -73,6 +88,21 @@ class DistributedWorkerServer:
         """为所有加载的工具设置API路由"""
         self._log(f"🔗 Worker {self.worker_id} 设置路由...")
         
+        @self.app.on_event("shutdown")
+        async def close_executors():
+            """关闭工具执行的线程池与子进程"""
+            for executor in self.executors.values():
+                executor.close()
+
+        @self.app.middleware("http")
+        async def count_inflight(request: Request, call_next):
+            """统计处理中的请求数，在心跳中上报"""
+            self.inflight += 1
+            try:
+                return await call_next(request)
+            finally:
+                self.inflight -= 1
+
         @self.app.get("/health", tags=["Worker"])
         async def health_check():
             """健康检查端点"""
@@ -80,6 +110,7 @@ class DistributedWorkerServer:
                 "status": "ok", 
                 "worker_id": self.worker_id,
                 "tools": self.tool_names,
+                "execution_modes": {tool_name: executor.mode for tool_name, executor in self.executors.items()},
                 "is_registered": self.is_registered,
                 "master_url": self.master_url
             }
@@ -99,55 +130,104 @@ class DistributedWorkerServer:
     def _create_tool_endpoints(self, tool_name: str, tool_instance: any):
         """为单个工具创建端点"""
         import traceback
+        executor = self.executors[tool_name]
         
         @self.app.post(f"/{tool_name}/create", tags=[tool_name])
         async def create_endpoint(input_data: CreateInput):
             input_dict = input_data.model_dump()
-            self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 创建输入: {input_dict}")
+            self._log_request(tool_name, "创建输入", input_dict)
             try:
-                result = await tool_instance.create(input_dict["instance_id"], input_dict["identity"])
-                self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 创建返回: {result}")
+                result = await executor.call("create", input_dict["instance_id"], identity=input_dict["identity"])
+                self._log_request(tool_name, "创建返回", result)
                 return {"success": True, "result": result}
             except Exception as e:
-                self._log(f"[DEBUG][ERROR] Worker {self.worker_id} {tool_name} 创建异常: {traceback.format_exc()}")
+                self._log(f"[ERROR] Worker {self.worker_id} {tool_name} 创建异常: {traceback.format_exc()}", "ERROR", tool=tool_name)
                 return {"success": False, "error": str(e)}
 
         @self.app.post(f"/{tool_name}/execute", tags=[tool_name])
         async def execute_endpoint(input_data: dict):
-            self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 执行输入: {input_data}")
+            self._log_request(tool_name, "执行输入", input_data)
             instance_id = input_data.pop("instance_id", None)
             try:
-                output = await tool_instance.execute(instance_id=instance_id, parameters=input_data)
-                self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 执行输出: {output}")
+                output = await executor.call("execute", instance_id, parameters=input_data)
+                self._log_request(tool_name, "执行输出", output)
                 return output
+            except ToolTimeoutError as e:
+                # 超时作为工具结果返回，避免客户端按 5xx 重试耗时的调用
+                self._log(f"⚠️  Worker {self.worker_id} {tool_name} 执行超时: {e}", "WARNING", tool=tool_name, instance_id=instance_id)
+                return [f"Tool execution timed out: {e}", 0.0, {"error": "timeout"}]
             except Exception as e:
-                self._log(f"[DEBUG][ERROR] Worker {self.worker_id} {tool_name} 执行异常: {traceback.format_exc()}")
-                raise e
+                # 工具本身的异常同样作为结果返回：返回 500 会被客户端当作服务端错误重试
+                self._log(f"[ERROR] Worker {self.worker_id} {tool_name} 执行异常: {traceback.format_exc()}", "ERROR", tool=tool_name)
+                return [f"Tool execution failed: {e}", 0.0, {"error": str(e)}]
 
         @self.app.post(f"/{tool_name}/release", tags=[tool_name])
         async def release_endpoint(input_data: dict):
-            self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 释放输入: {input_data}")
+            self._log_request(tool_name, "释放输入", input_data)
             instance_id = input_data.pop("instance_id", None)
             try:
-                result = await tool_instance.release(instance_id)
-                self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 释放返回: {result}")
+                result = await executor.call("release", instance_id)
+                self._log_request(tool_name, "释放返回", result)
                 return {"success": True, "result": result}
             except Exception as e:
-                self._log(f"[DEBUG][ERROR] Worker {self.worker_id} {tool_name} 释放异常: {traceback.format_exc()}")
+                self._log(f"[ERROR] Worker {self.worker_id} {tool_name} 释放异常: {traceback.format_exc()}", "ERROR", tool=tool_name)
                 return {"success": False, "error": str(e)}
 
         @self.app.post(f"/{tool_name}/calc_reward", tags=[tool_name])
         async def calc_reward_endpoint(input_data: dict):
-            self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 计算奖励输入: {input_data}")
+            self._log_request(tool_name, "计算奖励输入", input_data)
             instance_id = input_data.pop("instance_id", None)
             try:
-                result = await tool_instance.calc_reward(instance_id)
-                self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 计算奖励返回: {result}")
+                result = await executor.call("calc_reward", instance_id)
+                self._log_request(tool_name, "计算奖励返回", result)
                 return result
             except Exception as e:
-                self._log(f"[DEBUG][ERROR] Worker {self.worker_id} {tool_name} 计算奖励异常: {traceback.format_exc()}")
+                self._log(f"[ERROR] Worker {self.worker_id} {tool_name} 计算奖励异常: {traceback.format_exc()}", "ERROR", tool=tool_name)
+                return {"success": False, "error": str(e)}
+
+        async def run_operation(operation: dict):
+            """执行批量请求中的单个操作，返回值与对应的单个请求端点一致"""
+            op = operation.get("op")
+            instance_id = operation.get("instance_id")
+            try:
+                if op == "create":
+                    return {"success": True, "result": await executor.call("create", instance_id, identity=operation.get("identity"))}
+                if op == "execute":
+                    try:
+                        return await executor.call("execute", instance_id, parameters=dict(operation.get("parameters") or {}))
+                    except ToolTimeoutError as e:
+                        return [f"Tool execution timed out: {e}", 0.0, {"error": "timeout"}]
+                    except Exception as e:
+                        self._log(f"[ERROR] Worker {self.worker_id} {tool_name} 批量操作 execute 异常: {traceback.format_exc()}", "ERROR", tool=tool_name)
+                        return [f"Tool execution failed: {e}", 0.0, {"error": str(e)}]
+                if op == "calc_reward":
+                    return await executor.call("calc_reward", instance_id)
+                if op == "release":
+                    return {"success": True, "result": await executor.call("release", instance_id)}
+                return {"success": False, "error": f"Unsupported op: {op}, expected one of {BATCH_OPERATIONS}"}
+            except Exception as e:
+                self._log(f"[ERROR] Worker {self.worker_id} {tool_name} 批量操作 {op} 异常: {traceback.format_exc()}", "ERROR", tool=tool_name)
                 return {"success": False, "error": str(e)}
 
+        @self.app.post(f"/{tool_name}/execute_batch", tags=[tool_name])
+        async def execute_batch_endpoint(input_data: BatchInput):
+            operations = input_data.operations
+            results = [None] * len(operations)
+            # 同一实例的操作按顺序执行，不同实例的操作并发执行
+            instance_operations: Dict[str, List[int]] = {}
+            for index, operation in enumerate(operations):
+                instance_operations.setdefault(operation.get("instance_id"), []).append(index)
+
+            async def run_instance_operations(indices: List[int]):
+                for index in indices:
+                    results[index] = await run_operation(operations[index])
+
+            await asyncio.gather(*(run_instance_operations(indices) for indices in instance_operations.values()))
+            if self.logger.should_log("DEBUG", sampled=True):
+                self._log(f"[DEBUG] Worker {self.worker_id} {tool_name} 批量执行: {len(operations)} 个操作, {len(instance_operations)} 个实例",
+                          "DEBUG", tool=tool_name, operations=len(operations), instances=len(instance_operations))
+            return {"results": results}
+
     def _prepare_registration_data(self) -> WorkerRegistrationData:
         """准备注册数据"""
         worker_url = f"http://{get_external_ip()}:{self.port}"
@@ -183,16 +263,16 @@ class DistributedWorkerServer:
                             return True
                     
                     error_text = await response.text()
-                    self._log(f"❌ Worker注册失败: {response.status} - {error_text}")
+                    self._log(f"❌ Worker注册失败: {response.status} - {error_text}", "ERROR")
                     return False
         except Exception as e:
-            self._log(f"❌ Worker注册异常: {e}")
+            self._log(f"❌ Worker注册异常: {e}", "ERROR")
             return False
 
     def _start_registration_process(self):
         """启动注册流程（在服务器启动后调用）"""
         if not self.master_url:
-            self._log(f"⚠️  未配置master_url，跳过注册")
+            self._log(f"⚠️  未配置master_url，跳过注册", "WARNING")
             return
             
         self._log(f"🔗 准备注册到Master: {self.master_url}")
@@ -205,15 +285,31 @@ class DistributedWorkerServer:
                 success = loop.run_until_complete(self._register_to_master())
                 if success:
                     # 启动心跳
-                    self.start_heartbeat()
+                    self.start_heartbeat(self.heartbeat_interval)
                 else:
-                    self._log(f"❌ Worker {self.worker_id} 注册失败")
+                    self._log(f"❌ Worker {self.worker_id} 注册失败", "ERROR")
             finally:
                 loop.close()
         
         self.registration_thread = threading.Thread(target=register_async, daemon=True)
         self.registration_thread.start()
 
+    def _instance_count(self) -> int:
+        """各工具当前的实例数之和"""
+        return sum(executor.instance_count() for executor in self.executors.values())
+
+    def _collect_load(self) -> Dict:
+        """心跳中上报的负载信息"""
+        load = {
+            "capacity": self.capacity,
+            "inflight": self.inflight,
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": psutil.virtual_memory().percent,
+        }
+        if hasattr(os, "getloadavg"):
+            load["load_avg_1m"] = os.getloadavg()[0]
+        return load
+
     def start_heartbeat(self, interval: int = 30):
         """启动心跳线程"""
         def heartbeat_loop():
@@ -226,13 +322,15 @@ class DistributedWorkerServer:
                             json={
                                 "worker_id": self.worker_id,
                                 "status": "alive",
+                                "instance_count": self._instance_count(),
+                                "load": self._collect_load(),
                             },
                             timeout=5
                         )
                         if response.status_code != 200:
-                            self._log(f"⚠️  心跳失败: {response.status_code}")
+                            self._log(f"⚠️  心跳失败: {response.status_code}", "WARNING")
                     except Exception as e:
-                        self._log(f"⚠️  心跳异常: {e}")
+                        self._log(f"⚠️  心跳异常: {e}", "WARNING")
                 
                 time.sleep(interval)
 
@@ -277,7 +375,7 @@ class DistributedWorkerServer:
                 break
                 
             except Exception as e:
-                self._log(f"❌ Worker {self.worker_id} 服务器启动失败 (尝试 {retry + 1}/{max_retries}): {e}")
+                self._log(f"❌ Worker {self.worker_id} 服务器启动失败 (尝试 {retry + 1}/{max_retries}): {e}", "ERROR")
                 retry += 1
                 
                 # 指数退避策略，添加随机延迟避免雷鸣群
@@ -288,5 +386,5 @@ class DistributedWorkerServer:
         
         if retry >= max_retries:
             error_msg = f"❌ Worker {self.worker_id} 服务器启动失败，重试次数已达上限 ({max_retries})"
-            self._log(error_msg)
+            self._log(error_msg, "ERROR")
             raise RuntimeError(error_msg)
\ No newline at end of file
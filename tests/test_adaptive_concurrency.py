@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from internbootcamp.utils.adaptive_concurrency import AdaptiveConcurrencyLimiter
+from internbootcamp.utils.eval_metrics import EvaluationMetrics
+
+
+def test_slow_start_adds_one_per_success_up_to_max():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=2, max_limit=5, latency_tolerance=None)
+    assert limiter.limit == 2
+    for expected in (3, 4, 5, 5):
+        limiter.on_success(0.1)
+        assert limiter.limit == expected
+
+
+def test_additive_increase_after_overload():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=64, initial_limit=8, latency_tolerance=None, cooldown=0)
+    limiter.on_overload()
+    assert not limiter.slow_start
+    assert limiter.limit == 4
+    # 加性增：一个窗口（limit 个）成功请求约 +1
+    for _ in range(4):
+        limiter.on_success(0.1)
+    assert 4.8 < limiter.limit < 5.0
+    limiter.on_success(0.1)
+    assert limiter.limit > 5.0
+
+
+def test_multiplicative_decrease_clamped_to_min():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=3, max_limit=64, initial_limit=16, decrease_factor=0.5, cooldown=0)
+    limiter.on_overload()
+    assert limiter.limit == 8
+    limiter.on_overload()
+    assert limiter.limit == 4
+    limiter.on_overload()
+    assert limiter.limit == 3
+    limiter.on_overload()
+    assert limiter.limit == 3
+
+
+def test_decrease_once_per_cooldown():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=64, initial_limit=16, cooldown=60)
+    limiter.on_overload()
+    limiter.on_overload()
+    assert limiter.limit == 8
+
+
+def test_latency_spike_pauses_growth():
+    limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=64, latency_tolerance=2.0)
+    for _ in range(5):
+        limiter.on_success(0.1)
+    for _ in range(20):
+        limiter.on_success(5.0)
+    assert limiter._latency_short > 2.0 * limiter._latency_long
+    limit = limiter.limit
+    limiter.on_success(5.0)
+    assert limiter.limit == limit
+
+
+def test_initial_limit_clamped_and_published():
+    metrics = EvaluationMetrics()
+    limiter = AdaptiveConcurrencyLimiter(min_limit=2, max_limit=4, initial_limit=100, metrics=metrics)
+    assert limiter.limit == 4
+    assert metrics.gauges["api_concurrency_limit"] == 4
+    limiter.cooldown = 0
+    limiter.on_overload()
+    assert metrics.gauges["api_concurrency_limit"] == 2
+    assert metrics.counters["api_overload_errors"] == 1
+
+
+def test_acquire_blocks_at_limit():
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(min_limit=2, max_limit=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.in_flight == 2
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+
+    asyncio.run(run())
+
+
+def test_growth_wakes_waiters():
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=2, latency_tolerance=None)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        limiter.on_success(0.1)
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.in_flight == 2
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(min_limit=1, max_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        limiter.release()
+        assert limiter.in_flight == 0
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    asyncio.run(run())
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from internbootcamp.src.base_evaluator import BaseEvaluator
+from internbootcamp.utils.chat_stream import (
+    FINISH_REASON_STOP_REGEX,
+    FINISH_REASON_TIME_BUDGET,
+    ChatStreamAssembler,
+    consume_chat_stream,
+)
+
+
+class FakeStream:
+    """按顺序产出 chunk 的异步流；delay 为每个 chunk 之前的等待时间"""
+
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = list(chunks)
+        self.delay = delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.chunks:
+            raise StopAsyncIteration
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.chunks.pop(0)
+
+    async def close(self):
+        self.closed = True
+
+
+def _chunk(delta=None, finish_reason=None, usage=None):
+    chunk = {"id": "chatcmpl-1", "model": "demo", "created": 1, "choices": [], "usage": usage}
+    if delta is not None or finish_reason is not None:
+        chunk["choices"] = [{"index": 0, "delta": delta or {}, "finish_reason": finish_reason}]
+    return chunk
+
+
+def _consume(stream, **kwargs):
+    return asyncio.run(consume_chat_stream(stream, time.perf_counter(), **kwargs))
+
+
+def test_assembles_tool_call_deltas():
+    assembler = ChatStreamAssembler()
+    chunks = [
+        _chunk({"role": "assistant", "content": "调用工具"}),
+        _chunk({"tool_calls": [{"index": 0, "id": "call_a", "type": "function", "function": {"name": "sea", "arguments": ""}}]}),
+        _chunk({"tool_calls": [{"index": 0, "function": {"name": "rch", "arguments": '{"q": '}}]}),
+        _chunk({"tool_calls": [{"index": 1, "id": "call_b", "function": {"name": "calc", "arguments": "{}"}}]}),
+        _chunk({"tool_calls": [{"index": 0, "function": {"arguments": '"x"}'}}]}),
+        _chunk(finish_reason="tool_calls"),
+    ]
+    for chunk in chunks:
+        assembler.add_chunk(chunk)
+    message = assembler.to_response_dict()["choices"][0]["message"]
+    assert message["content"] == "调用工具"
+    assert message["tool_calls"] == [
+        {"id": "call_a", "type": "function", "function": {"name": "search", "arguments": '{"q": "x"}'}},
+        {"id": "call_b", "type": "function", "function": {"name": "calc", "arguments": "{}"}},
+    ]
+    assert assembler.finish_reason == "tool_calls"
+
+
+def test_reasoning_content_and_usage():
+    usage = {"prompt_tokens": 7, "completion_tokens": 4, "total_tokens": 11}
+    stream = FakeStream([
+        _chunk({"role": "assistant", "reasoning_content": "先想"}),
+        _chunk({"reasoning_content": "一想"}),
+        _chunk({"content": "答案"}),
+        _chunk({"content": "是 2"}, finish_reason="stop"),
+        _chunk(usage=usage),
+    ])
+    response, stats = _consume(stream)
+    choice = response["choices"][0]
+    assert choice["message"]["reasoning_content"] == "先想一想"
+    assert choice["message"]["content"] == "答案是 2"
+    assert choice["message"]["tool_calls"] is None
+    assert choice["finish_reason"] == "stop"
+    assert response["usage"] == usage
+    assert response["id"] == "chatcmpl-1" and response["model"] == "demo"
+    assert stats["chunks"] == 4
+    assert stats["ttft"] is not None and stats["inter_token_latency"] is not None
+    assert not stream.closed
+
+
+def test_stop_regex_truncates_and_closes_stream():
+    stream = FakeStream([
+        _chunk({"content": "推理过程，答案为 \\box"}),
+        _chunk({"content": "ed{42} 之后"}),
+        _chunk({"content": "不应读取"}),
+    ])
+    response, stats = _consume(stream, stop_regex=r"\\boxed\{[^}]*\}")
+    choice = response["choices"][0]
+    assert choice["message"]["content"] == "推理过程，答案为 \\boxed{42}"
+    assert choice["finish_reason"] == FINISH_REASON_STOP_REGEX
+    assert stream.closed
+    assert len(stream.chunks) == 1
+    # 提前停止时按 chunk 数估计 usage
+    assert response["usage"] == {"prompt_tokens": 0, "completion_tokens": 2, "total_tokens": 2, "estimated": True}
+
+
+def test_stop_regex_ignored_with_tool_calls():
+    stream = FakeStream([
+        _chunk({"tool_calls": [{"index": 0, "id": "call_a", "function": {"name": "calc", "arguments": "{}"}}]}),
+        _chunk({"content": "\\boxed{1}"}),
+        _chunk({"content": " 继续"}, finish_reason="tool_calls"),
+    ])
+    response, _ = _consume(stream, stop_regex=r"\\boxed\{[^}]*\}")
+    assert response["choices"][0]["message"]["content"] == "\\boxed{1} 继续"
+    assert response["choices"][0]["finish_reason"] == "tool_calls"
+
+
+def test_deadline_keeps_partial_output():
+    stream = FakeStream([_chunk({"content": f"片段{index}"}) for index in range(50)], delay=0.02)
+    response, stats = _consume(stream, deadline=time.monotonic() + 0.1)
+    choice = response["choices"][0]
+    assert choice["finish_reason"] == FINISH_REASON_TIME_BUDGET
+    assert choice["message"]["content"].startswith("片段0")
+    assert 0 < stats["chunks"] < 50
+    assert stream.closed
+
+
+def test_expired_deadline_stops_before_reading():
+    stream = FakeStream([_chunk({"content": "x"})])
+    response, stats = _consume(stream, deadline=time.monotonic() - 1)
+    assert response["choices"][0]["finish_reason"] == FINISH_REASON_TIME_BUDGET
+    assert response["choices"][0]["message"]["content"] is None
+    assert stats["chunks"] == 0 and stats["ttft"] is None
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return FakeStream([_chunk({"role": "assistant", "content": "ok"}, finish_reason="stop")])
+
+
+def test_stream_request_merges_extra_params():
+    evaluator = BaseEvaluator(
+        api_key="test",
+        reward_calculator=None,
+        api_url="http://127.0.0.1:9/v1",
+        api_model="test",
+        api_stream=True,
+        api_extra_params={"stream": True, "stream_options": {"continuous_usage_stats": True}},
+    )
+    completions = FakeCompletions()
+    evaluator.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    payload = evaluator._build_payload({"messages": [{"role": "user", "content": "q"}]})
+    response = asyncio.run(evaluator._request_completion(payload))
+    [request] = completions.requests
+    assert request["stream"] is True
+    assert request["stream_options"] == {"continuous_usage_stats": True, "include_usage": True}
+    assert request["messages"] == [{"role": "user", "content": "q"}]
+    assert response["choices"][0]["message"]["content"] == "ok"
+    assert response["stream_stats"]["chunks"] == 1
@@ -0,0 +1,134 @@
+import contextvars
+import random
+import types
+
+import pytest
+
+from internbootcamp.utils import endpoint_pool as endpoint_pool_module
+from internbootcamp.utils.endpoint_pool import EndpointPool, current_routing_key, parse_api_urls
+from internbootcamp.utils.eval_metrics import EvaluationMetrics
+
+URLS = ["http://a/v1", "http://b/v1", "http://c/v1"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(endpoint_pool_module, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _pool(**kwargs):
+    return EndpointPool(URLS, client_factory=lambda url: f"client:{url}", **kwargs)
+
+
+def test_parse_api_urls():
+    assert parse_api_urls(None) == [None]
+    assert parse_api_urls("") == [None]
+    assert parse_api_urls("http://a/v1, http://b/v1,") == ["http://a/v1", "http://b/v1"]
+    assert parse_api_urls(["http://a/v1"]) == ["http://a/v1"]
+
+
+def test_invalid_policy_and_empty_urls():
+    with pytest.raises(ValueError):
+        _pool(policy="round_robin")
+    with pytest.raises(ValueError):
+        EndpointPool([], client_factory=str)
+
+
+def test_least_outstanding_picks_idle_endpoint():
+    pool = _pool()
+    assert [endpoint.client for endpoint in pool.endpoints] == [f"client:{url}" for url in URLS]
+    acquired = [pool.acquire() for _ in range(3)]
+    # 每个端点各分到一个请求
+    assert sorted(endpoint.url for endpoint in acquired) == URLS
+    pool.release(acquired[1])
+    assert pool.acquire() is acquired[1]
+
+
+def test_p2c_prefers_less_loaded_of_two(monkeypatch):
+    pool = _pool(policy="p2c")
+    a, b, c = pool.endpoints
+    a.outstanding, b.outstanding, c.outstanding = 5, 1, 3
+    monkeypatch.setattr(random, "sample", lambda population, k: [a, b])
+    assert pool.acquire() is b
+    monkeypatch.setattr(random, "sample", lambda population, k: [c, a])
+    assert pool.acquire() is c
+
+
+def test_ejection_after_consecutive_failures(clock):
+    metrics = EvaluationMetrics()
+    pool = _pool(eject_failures=2, eject_seconds=30, metrics=metrics)
+    bad = pool.endpoints[0]
+    for _ in range(2):
+        pool.acquire()
+    pool.release(bad, success=False)
+    # 成功请求清零连续失败计数
+    pool.release(bad, success=True)
+    assert bad.is_healthy(clock[0])
+    pool.release(bad, success=False)
+    pool.release(bad, success=False)
+    assert not bad.is_healthy(clock[0])
+    assert bad.total_failures == 3
+    assert metrics.counters["endpoint_ejections"] == 1
+    assert metrics.gauges["healthy_endpoints"] == 2
+    assert all(pool.acquire() is not bad for _ in range(20))
+    assert [stats["healthy"] for stats in pool.stats()] == [False, True, True]
+
+
+def test_readmission_after_eject_seconds(clock):
+    pool = _pool(eject_failures=1, eject_seconds=30)
+    bad = pool.endpoints[0]
+    pool.release(bad, success=False)
+    assert not bad.is_healthy(clock[0])
+    clock[0] += 29
+    assert not bad.is_healthy(clock[0])
+    clock[0] += 1
+    assert bad.is_healthy(clock[0])
+    for other in pool.endpoints[1:]:
+        other.outstanding = 10
+    assert pool.acquire() is bad
+
+
+def test_single_endpoint_is_never_ejected(clock):
+    pool = EndpointPool(["http://a/v1"], client_factory=str, eject_failures=1)
+    endpoint = pool.acquire()
+    pool.release(endpoint, success=False)
+    assert endpoint.is_healthy(clock[0])
+
+
+def test_all_ejected_picks_earliest_recovery(clock):
+    pool = _pool(eject_failures=1, eject_seconds=30)
+    for offset, endpoint in zip((20, 10, 30), pool.endpoints):
+        endpoint.ejected_until = clock[0] + offset
+    assert pool.acquire() is pool.endpoints[1]
+
+
+def test_sticky_routing_via_current_routing_key(clock):
+    pool = _pool(eject_failures=1)
+
+    def sample(key):
+        current_routing_key.set(key)
+        first = pool.acquire(current_routing_key.get())
+        pool.release(first)
+        # 其他端点更空闲时仍发往同一端点
+        first.outstanding += 5
+        second = pool.acquire(current_routing_key.get())
+        first.outstanding -= 5
+        pool.release(second)
+        return first, second
+
+    first, second = contextvars.copy_context().run(sample, "sample-1")
+    assert first is second
+    assert current_routing_key.get() is None
+
+    # 端点被剔除后重新选择并更新粘性路由
+    pool.release(first, success=False)
+    rerouted = pool.acquire("sample-1")
+    assert rerouted is not first
+    pool.release(rerouted)
+    assert pool.acquire("sample-1") is rerouted
+
+    pool.forget("sample-1")
+    assert "sample-1" not in pool._sticky
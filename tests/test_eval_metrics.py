@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+import urllib.request
+
+from internbootcamp.utils.eval_metrics import EvaluationMetrics, run_metrics_collector, start_metrics_server
+
+
+def test_snapshot_does_not_run_collectors():
+    metrics = EvaluationMetrics()
+    calls = []
+    metrics.add_collector(lambda: calls.append(1) or metrics.set_gauge("pool_in_use", len(calls)))
+    assert "pool_in_use" not in metrics.snapshot()["gauges"]
+    assert calls == []
+    metrics.collect()
+    metrics.collect()
+    assert metrics.snapshot()["gauges"]["pool_in_use"] == 2
+    assert "pool_in_use 2" in metrics.to_prometheus()
+    assert len(calls) == 2
+
+
+def test_collector_errors_are_ignored():
+    metrics = EvaluationMetrics()
+
+    def broken():
+        raise RuntimeError("pool closed")
+
+    metrics.add_collector(broken)
+    metrics.add_collector(lambda: metrics.set_gauge("ok", 1))
+    metrics.collect()
+    assert metrics.snapshot()["gauges"]["ok"] == 1
+
+
+def test_http_endpoint_serves_values_collected_on_loop():
+    metrics = EvaluationMetrics()
+    collector_threads = set()
+
+    def collector():
+        collector_threads.add(threading.get_ident())
+        metrics.set_gauge("pool_in_use", 3)
+
+    metrics.add_collector(collector)
+
+    async def run():
+        stop = asyncio.Event()
+        task = asyncio.create_task(run_metrics_collector(metrics, 0.01, stop))
+        server = start_metrics_server(metrics, 0)
+        try:
+            await asyncio.sleep(0.05)
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics.json"
+            body = await asyncio.to_thread(lambda: urllib.request.urlopen(url, timeout=5).read())
+        finally:
+            server.shutdown()
+            server.server_close()
+            stop.set()
+            await task
+        return json.loads(body), threading.get_ident()
+
+    snapshot, loop_thread = asyncio.run(run())
+    assert snapshot["gauges"]["pool_in_use"] == 3
+    # 采集函数只在事件循环线程中运行
+    assert collector_threads == {loop_thread}
+
+
+def test_cached_api_calls_are_excluded_from_latency_and_tokens():
+    metrics = EvaluationMetrics()
+    usage = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    for _ in range(2):
+        metrics.api_started()
+    metrics.api_finished(2.0, usage)
+    metrics.api_finished(0.001, usage, cached=True)
+    snapshot = metrics.snapshot()
+    assert snapshot["api"]["calls"] == 1
+    assert snapshot["api"]["cached_calls"] == 1
+    assert snapshot["api"]["in_flight"] == 0
+    assert snapshot["api"]["latency_seconds"]["p50"] == 2.0
+    assert snapshot["tokens"]["total"] == 15
+    assert "api_cached_calls_total 1" in metrics.to_prometheus()
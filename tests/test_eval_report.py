@@ -0,0 +1,95 @@
+import json
+import os
+
+from internbootcamp.utils.eval_report import (
+    EvaluationStatsAccumulator,
+    extract_stat_fields,
+    iter_stat_records,
+    stats_path_for,
+)
+
+
+def _result(index, success, score=None, data_source="demo", generator="gen"):
+    result = {
+        "input": {"data_source": data_source, "id": index, "extra_info": {"generator_name": generator}},
+        "messages": [{"role": "user", "content": f"q{index}"}],
+        "success": success,
+        "turn_record": {
+            "interaction_turn_0": {"assistant_turns": 2, "tool_calls_executed": index % 3},
+        },
+        "prompt_tokens": 10 + index,
+        "token_usage": {"prompt_tokens": 30, "completion_tokens": 5 + index, "total_tokens": 35 + index},
+        "timing": {"total": 1.5, "api": 1.0},
+        "sample_key": f"key-{index}",
+    }
+    if success:
+        result["score"] = score
+        result["context_exhausted"] = index == 2
+    else:
+        result["error"] = f"ValueError: bad sample {index}"
+    return result
+
+
+RESULTS = [
+    _result(0, True, 1.0),
+    _result(1, False),
+    _result(2, True, 0.5, generator=""),
+    _result(3, True, 0, data_source="other"),
+    _result(4, False, data_source="other"),
+]
+
+
+def _report(records):
+    accumulator = EvaluationStatsAccumulator()
+    for record in records:
+        accumulator.update(record)
+    return accumulator.build_report({"model": "test"})
+
+
+def test_stat_fields_give_same_report_as_full_results():
+    assert _report(extract_stat_fields(r) for r in RESULTS) == _report(RESULTS)
+
+
+def test_iter_stat_records_rebuilds_sidecar(tmp_path):
+    result_path = str(tmp_path / "results.jsonl")
+    with open(result_path, "w", encoding="utf-8") as f:
+        for record in RESULTS + [None]:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    expected = _report(RESULTS)
+    # 旁路文件不存在：扫描结果文件并重建
+    assert not os.path.exists(stats_path_for(result_path))
+    assert _report(iter_stat_records(result_path)) == expected
+    assert os.path.exists(stats_path_for(result_path))
+    # 再次读取使用旁路文件
+    os.remove(result_path)
+    rebuilt = _report(iter_stat_records(result_path))
+    assert rebuilt == expected
+    assert rebuilt["overall_stats"]["total_samples"] == 5
+    assert rebuilt["overall_stats"]["success_count"] == 3
+    assert rebuilt["overall_stats"]["context_exhausted_count"] == 1
+
+
+def test_build_report_does_not_mutate_accumulator():
+    accumulator = EvaluationStatsAccumulator()
+    for record in RESULTS[:2]:
+        accumulator.update(record)
+    first = accumulator.build_report({})
+    accumulator.update(RESULTS[2])
+    second = accumulator.build_report({})
+    assert first["overall_stats"]["total_samples"] == 2
+    assert second["overall_stats"]["total_samples"] == 3
+    assert accumulator.build_report({}) == second
+
+
+def test_cached_samples_are_excluded_from_timing():
+    live = _result(0, True, 1.0)
+    cached = {**_result(1, True, 1.0), "cached_api_calls": 2, "timing": {"total": 0.01, "api": 0.0}}
+    report = _report([live, cached])
+    assert report["overall_stats"]["cached_count"] == 1
+    stats = report["data_source_stats"]["demo"]
+    assert stats["timing_count"] == 1
+    assert stats["avg_timing"] == {"total": 1.5, "api": 1.0}
+    # 旁路文件保留缓存标记
+    assert extract_stat_fields(cached)["cached_api_calls"] == 2
+    assert _report(extract_stat_fields(r) for r in [live, cached]) == report
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from internbootcamp.src.base_evaluator import BaseEvaluator
+
+
+class FakeEvaluator(BaseEvaluator):
+    """_evaluate_one 不请求模型：按样本中的 delay 等待后返回结果，并记录同时评测的样本数"""
+
+    def __init__(self):
+        super().__init__(api_key="test", reward_calculator=None, api_url="http://127.0.0.1:9/v1", api_model="test")
+        self.gate = None
+        self.active = 0
+        self.max_active = 0
+
+    async def _evaluate_one(self, input_data):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.gate is not None:
+                await self.gate.wait()
+            await asyncio.sleep(input_data.get("delay", 0))
+            if input_data.get("fail"):
+                raise RuntimeError(f"sample {input_data['id']} failed")
+            return {"input": input_data, "success": True, "score": 1.0}
+        finally:
+            self.active -= 1
+
+
+def _samples(count, pulled=None):
+    """样本生成器，pulled 记录已被读取的样本数"""
+    for index in range(count):
+        if pulled is not None:
+            pulled.append(index)
+        yield {"id": index, "delay": (count - index) * 0.001}
+
+
+def test_results_keep_input_order():
+    evaluator = FakeEvaluator()
+    results = asyncio.run(evaluator._evaluate_batch(list(_samples(20)), max_concurrent=4))
+    assert [result["input"]["id"] for result in results] == list(range(20))
+    assert evaluator.max_active == 4
+
+
+def test_stream_is_consumed_lazily():
+    evaluator = FakeEvaluator()
+    max_concurrent = 3
+    pulled = []
+
+    async def run():
+        evaluator.gate = asyncio.Event()
+        task = asyncio.create_task(evaluator._evaluate_batch(_samples(100, pulled), max_concurrent=max_concurrent, return_results=False))
+        await asyncio.sleep(0.05)
+        # 评测阻塞时只预读与并发数相关的少量样本，而不是整个数据集
+        in_memory = len(pulled)
+        evaluator.gate.set()
+        await asyncio.wait_for(task, 10)
+        return in_memory, task.result()
+
+    in_memory, results = asyncio.run(run())
+    assert max_concurrent <= in_memory <= 2 * max_concurrent + 1
+    assert len(pulled) == 100
+    assert results == []
+    assert evaluator.max_active == max_concurrent
+
+
+def test_producer_error_does_not_hang():
+    evaluator = FakeEvaluator()
+
+    def broken_samples():
+        yield from _samples(5)
+        raise ValueError("bad dataset line")
+
+    async def run():
+        await asyncio.wait_for(evaluator._evaluate_batch(broken_samples(), max_concurrent=2), 10)
+
+    with pytest.raises(ValueError, match="bad dataset line"):
+        asyncio.run(run())
+
+
+def _pending_tasks():
+    return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+
+def test_consumer_error_does_not_leave_tasks_behind():
+    evaluator = FakeEvaluator()
+
+    def samples():
+        for sample in _samples(50):
+            # 队列已满时出错：生产者正阻塞在 put 上
+            sample["fail"] = sample["id"] == 3
+            yield sample
+
+    async def run():
+        with pytest.raises(RuntimeError, match="sample 3 failed"):
+            await asyncio.wait_for(evaluator._evaluate_batch(samples(), max_concurrent=2), 10)
+        return _pending_tasks()
+
+    assert asyncio.run(run()) == []
+
+
+def test_cancellation_does_not_leave_tasks_behind():
+    evaluator = FakeEvaluator()
+
+    async def run():
+        evaluator.gate = asyncio.Event()
+        task = asyncio.create_task(evaluator._evaluate_batch(_samples(50), max_concurrent=2))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 10)
+        return _pending_tasks()
+
+    assert asyncio.run(run()) == []
+    assert evaluator.active == 0
@@ -0,0 +1,124 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from internbootcamp.src.base_tool import BaseTool
+from internbootcamp.utils.tool_server.executors import (
+    ProcessToolExecutor,
+    ToolExecutionError,
+    ToolExecutor,
+    ToolTimeoutError,
+    create_tool_executor,
+)
+
+
+class SleepTool(BaseTool):
+    """每个实例一个计数器；execute 先 sleep（sleep 阻塞，async_sleep 不阻塞）再计数加一"""
+
+    def __init__(self, config, tool_schema):
+        super().__init__(config, tool_schema)
+        self.state = {}
+
+    async def create(self, instance_id=None, fail=False, **kwargs):
+        if fail:
+            raise ValueError("create failed")
+        self.state[instance_id] = 0
+        return instance_id
+
+    async def execute(self, instance_id, parameters, **kwargs):
+        time.sleep(parameters.get("sleep", 0))
+        await asyncio.sleep(parameters.get("async_sleep", 0))
+        self.state[instance_id] += 1
+        return f"{self.state[instance_id]}", 0.0, {"pid": os.getpid()}
+
+    async def calc_reward(self, instance_id, **kwargs):
+        return float(self.state[instance_id])
+
+    async def release(self, instance_id, **kwargs):
+        self.state.pop(instance_id, None)
+
+
+# 子进程按 class_name 重新导入本模块中的工具
+TOOL_CONFIG = {
+    "class_name": f"{__name__}.SleepTool",
+    "tool_schema": {"type": "function", "function": {"name": "sleep"}},
+    "config": {},
+}
+
+
+def _tool():
+    from internbootcamp.utils.load_tool_from_config import load_tool_from_config
+
+    return load_tool_from_config(TOOL_CONFIG)[2]
+
+
+def test_inline_timeout():
+    executor = ToolExecutor(_tool(), timeout=0.2)
+
+    async def run():
+        await executor.call("create", "a")
+        with pytest.raises(ToolTimeoutError):
+            await executor.call("execute", "a", parameters={"async_sleep": 5})
+        assert (await executor.call("execute", "a", parameters={}))[0] == "1"
+
+    asyncio.run(run())
+
+
+def test_process_executor_drops_instances_on_timeout():
+    executor = create_tool_executor(_tool(), TOOL_CONFIG, mode="process", pool_size=1, timeout=2)
+    assert isinstance(executor, ProcessToolExecutor)
+
+    async def run():
+        await executor.call("create", "a")
+        await executor.call("create", "b")
+        first = await executor.call("execute", "a", parameters={})
+        second = await executor.call("execute", "a", parameters={})
+        # 实例状态保存在同一个子进程中
+        assert (first[0], second[0]) == ("1", "2")
+        assert first[2]["pid"] == second[2]["pid"] != os.getpid()
+        assert executor.instance_count() == 2
+
+        with pytest.raises(ToolTimeoutError):
+            await executor.call("execute", "b", parameters={"sleep": 10})
+        # 子进程已重启，其上的所有实例都已丢失
+        assert executor.instance_count() == 0
+        with pytest.raises(ToolExecutionError):
+            await executor.call("execute", "a", parameters={})
+
+        await executor.call("create", "c")
+        result = await executor.call("execute", "c", parameters={})
+        assert result[0] == "1" and result[2]["pid"] != first[2]["pid"]
+        assert executor.instance_count() == 1
+        await executor.call("release", "c")
+        assert executor.instance_count() == 0
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.close()
+
+
+def test_process_executor_unassigns_failed_create():
+    executor = create_tool_executor(_tool(), TOOL_CONFIG, mode="process", pool_size=2, timeout=10)
+
+    async def run():
+        await executor.call("create", "a")
+        await executor.call("create", "b")
+        assert executor.instance_count() == 2
+        # 实例数最少的子进程优先
+        assert sorted(executor._instance_process.values()) == [0, 1]
+        with pytest.raises(ToolExecutionError):
+            await executor.call("create", "bad", fail=True)
+        assert executor.instance_count() == 2
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.close()
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        create_tool_executor(_tool(), TOOL_CONFIG, mode="fiber")
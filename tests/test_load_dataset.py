@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from internbootcamp.src.base_evaluator import count_dataset, iter_dataset, load_dataset
+
+SAMPLES = [
+    {"id": index, "prompt": [{"role": "user", "content": f"q{index}"}], "extra_info": {"index": index}}
+    for index in range(5)
+]
+
+
+def _write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def test_iter_jsonl_is_lazy(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    _write_jsonl(path, SAMPLES)
+    iterator = iter_dataset(path)
+    assert next(iterator) == SAMPLES[0]
+    assert list(iterator) == SAMPLES[1:]
+    assert count_dataset(path) is None
+
+
+def test_iter_json_matches_load(tmp_path):
+    path = str(tmp_path / "data.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(SAMPLES, f)
+    assert list(iter_dataset(path)) == load_dataset(path) == SAMPLES
+
+
+def test_iter_parquet_in_batches(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "data.parquet")
+    pq.write_table(pa.Table.from_pylist(SAMPLES), path, row_group_size=2)
+    streamed = list(iter_dataset(path, batch_size=2))
+    assert streamed == SAMPLES
+    # prompt 为 Python 列表（与 load_dataset 一致）
+    assert all(isinstance(item["prompt"], list) for item in streamed)
+    assert count_dataset(path) == len(SAMPLES)
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_dataset(str(tmp_path / "data.csv")))
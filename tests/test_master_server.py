@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from internbootcamp.utils.tool_server.master_server import DistributedMasterServer
+
+
+@pytest.fixture
+def master():
+    server = DistributedMasterServer("127.0.0.1", 0, log_options={"console": False})
+    for worker_id in ("w1", "w2"):
+        server.workers[worker_id] = {"worker_url": f"http://{worker_id}", "tools": ["ToolA", "ToolB"]}
+        server.worker_last_heartbeat[worker_id] = time.time()
+    server.available_tools = {"ToolA": ["w1", "w2"], "ToolB": ["w1", "w2"]}
+    yield server
+    server.logger.close()
+
+
+def _check_counts(master):
+    """计数与实例映射一致"""
+    expected_workers = {}
+    expected_tools = {}
+    for instance_id, worker_id in master.instance_worker_mapping.items():
+        expected_workers.setdefault(worker_id, set()).add(instance_id)
+        tool_name = master.instance_tool_mapping[instance_id]
+        expected_tools[tool_name] = expected_tools.get(tool_name, 0) + 1
+    assert master.worker_instances == expected_workers
+    assert master.tool_instance_counts == expected_tools
+
+
+def test_instance_counters_follow_mapping(master):
+    master._map_instance("a1", "w1", "ToolA")
+    master._map_instance("a2", "w1", "ToolA")
+    master._map_instance("b1", "w2", "ToolB")
+    _check_counts(master)
+    assert master._get_worker_instance_count("w1") == 2
+
+    # 重新映射已有实例：先从原Worker移除
+    master._map_instance("a2", "w2", "ToolA")
+    _check_counts(master)
+    assert (master._get_worker_instance_count("w1"), master._get_worker_instance_count("w2")) == (1, 2)
+
+    assert master._unmap_instance("a1") == "w1"
+    assert master._unmap_instance("a1") is None
+    _check_counts(master)
+    assert "w1" not in master.worker_instances
+
+    assert sorted(master._unmap_worker_instances("w2")) == ["a2", "b1"]
+    _check_counts(master)
+    assert master.instance_worker_mapping == {} and master.tool_instance_counts == {}
+
+
+def test_least_instances_placement(master):
+    master._map_instance("a1", "w1", "ToolA")
+    assert master._select_worker("ToolA") == "w2"
+    master._map_instance("a2", "w2", "ToolA")
+    master._map_instance("a3", "w2", "ToolA")
+    assert master._select_worker("ToolA") == "w1"
+
+
+def test_placement_skips_unhealthy_workers(master):
+    master._map_instance("a1", "w2", "ToolA")
+    master.worker_last_heartbeat["w1"] = time.time() - 3600
+    assert master._select_worker("ToolA") == "w2"
+    master.worker_last_heartbeat["w2"] = time.time() - 3600
+    assert master._select_worker("ToolA") is None
+    assert master._select_worker("MissingTool") is None
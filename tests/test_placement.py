@@ -0,0 +1,64 @@
+import pytest
+
+from internbootcamp.utils.tool_server.placement import PLACEMENT_POLICIES, WorkerLoad, create_placement_policy
+
+
+def _loads(**kwargs):
+    loads = {}
+    for worker_id, (inflight, latency, capacity) in kwargs.items():
+        load = WorkerLoad()
+        load.inflight = inflight
+        if latency is not None:
+            load.observe_latency(latency)
+        load.update_report({"capacity": capacity})
+        loads[worker_id] = load
+    return loads
+
+
+def _select(name, counts, loads):
+    return create_placement_policy(name).select(list(counts), counts, loads)
+
+
+def test_least_instances():
+    loads = _loads(a=(0, None, 1), b=(9, None, 1))
+    assert _select("least_instances", {"a": 3, "b": 1}, loads) == "b"
+
+
+def test_least_inflight():
+    loads = _loads(a=(5, None, 1), b=(1, None, 1))
+    assert _select("least_inflight", {"a": 0, "b": 10}, loads) == "b"
+    # 在途请求数相同时选实例数少的
+    loads = _loads(a=(1, None, 1), b=(1, None, 1))
+    assert _select("least_inflight", {"a": 2, "b": 1}, loads) == "b"
+
+
+def test_ewma_latency_prefers_workers_without_data():
+    loads = _loads(a=(0, 0.01, 1), b=(0, None, 1))
+    assert _select("ewma_latency", {"a": 0, "b": 5}, loads) == "b"
+    loads = _loads(a=(3, 0.1, 1), b=(0, 0.2, 1))
+    assert _select("ewma_latency", {"a": 0, "b": 0}, loads) == "b"
+
+
+def test_weighted_capacity():
+    loads = _loads(a=(0, None, 1), b=(0, None, 8))
+    assert _select("weighted", {"a": 1, "b": 6}, loads) == "b"
+    assert _select("weighted", {"a": 0, "b": 20}, loads) == "a"
+
+
+def test_p2c_with_two_candidates_is_deterministic():
+    loads = _loads(a=(2, None, 1), b=(0, None, 1))
+    assert _select("p2c", {"a": 1, "b": 2}, loads) == "b"
+
+
+def test_ewma_update():
+    load = WorkerLoad(ewma_alpha=0.5)
+    load.observe_latency(1.0)
+    load.observe_latency(3.0)
+    assert load.ewma_latency == pytest.approx(2.0)
+
+
+def test_all_policies_available():
+    for name in PLACEMENT_POLICIES:
+        assert create_placement_policy(name).name == name
+    with pytest.raises(ValueError):
+        create_placement_policy("round_robin")
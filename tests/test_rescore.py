@@ -0,0 +1,87 @@
+import json
+import time
+
+import pytest
+
+from internbootcamp.utils.rescore import _init_worker, _iter_rescored, rescore_record, rescore_results
+from internbootcamp.utils.resume_index import index_path_for
+from internbootcamp.utils.result_format import iter_results
+
+
+class DoubleCalculator:
+    """把 response_context 中的数字乘 2 作为分数；越靠前的样本评分越慢，打乱完成顺序"""
+
+    @classmethod
+    def extract_output(cls, response_context):
+        return response_context.strip()
+
+    @classmethod
+    def verify_score(cls, model_output, identity, **kwargs):
+        value = int(model_output)
+        if value < 0:
+            raise ValueError("negative")
+        time.sleep(max(0, 10 - value) * 0.002)
+        return value * 2 + kwargs.get("bonus", 0)
+
+
+CALCULATOR = f"{__name__}.DoubleCalculator"
+
+
+def _record(index, success=True):
+    return {
+        "input": {"data_source": "demo", "id": index, "reward_model": {"ground_truth": None}},
+        "response_context": str(index),
+        "success": success,
+        "score": 0,
+        "sample_key": f"key-{index}",
+    }
+
+
+def _write(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def _lines(records):
+    return [json.dumps(record) for record in records]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_iter_rescored_keeps_input_order(workers):
+    records = [_record(index) for index in range(20)]
+    batches = iter([_lines(records[i:i + 2]) for i in range(0, 20, 2)])
+    init_args = (CALCULATOR, {}, {}, None)
+    outputs = [output for batch in _iter_rescored(batches, workers, init_args) for output in batch]
+    assert [output[2] for output in outputs] == [f"key-{index}" for index in range(20)]
+    assert [output[5] for output in outputs] == [index * 2 for index in range(20)]
+    assert all(output[3] == "rescored" for output in outputs)
+
+
+def test_rescore_record_statuses():
+    _init_worker(CALCULATOR, {}, {"bonus": 1}, None)
+    record, status = rescore_record(_record(3))
+    assert (status, record["score"], record["extracted_output"]) == ("rescored", 7, "3")
+    assert record["evaluation_config"]["rescore"]["verify_correction_kwargs"] == {"bonus": 1}
+
+    record, status = rescore_record(_record(4, success=False))
+    assert (status, record["score"]) == ("skipped", 0)
+
+    record, status = rescore_record(_record(-1))
+    assert status == "failed" and record["score"] == 0 and "negative" in record["rescore_error"]
+
+
+def test_rescore_results_writes_file_and_index(tmp_path):
+    result_path = str(tmp_path / "eval_results.jsonl")
+    records = [_record(index) for index in range(7)] + [_record(7, success=False)]
+    _write(result_path, records)
+
+    report = rescore_results(result_path, reward_calculator_class=CALCULATOR, workers=2, batch_size=3, print_report=False)
+    output_path = str(tmp_path / "eval_results_rescored.jsonl")
+    rescored = list(iter_results(output_path))
+    assert [record["input"]["id"] for record in rescored] == list(range(8))
+    assert [record["score"] for record in rescored] == [index * 2 for index in range(7)] + [0]
+    with open(index_path_for(output_path), encoding="utf-8") as f:
+        assert f.read().split() == [f"key-{index}" for index in range(8)]
+    assert report["overall_stats"]["total_samples"] == 8
+    assert report["overall_stats"]["success_count"] == 7
@@ -0,0 +1,64 @@
+import asyncio
+
+from internbootcamp.src.base_evaluator import BaseEvaluator
+from internbootcamp.utils.eval_metrics import EvaluationMetrics
+from internbootcamp.utils.response_cache import ResponseCache, payload_cache_key
+
+
+def test_hits_and_misses_are_counted_once(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache" / "responses.sqlite"))
+    key = payload_cache_key({"model": "m", "messages": [{"role": "user", "content": "q"}]})
+
+    async def run():
+        assert await cache.aget(key) is None
+        await cache.aput(key, {"choices": [{"message": {"content": "a"}}]})
+        assert (await cache.aget(key))["choices"][0]["message"]["content"] == "a"
+
+    asyncio.run(run())
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    metrics = EvaluationMetrics()
+    metrics.add_collector(lambda: metrics.set_counter("response_cache_hits", cache.hits))
+    metrics.collect()
+    assert metrics.snapshot()["counters"]["response_cache_hits"] == 1
+    # 多次采集不会重复累加
+    metrics.collect()
+    assert metrics.snapshot()["counters"]["response_cache_hits"] == 1
+
+    cache.reset_stats()
+    assert (cache.hits, cache.misses) == (0, 0)
+    cache.close()
+
+
+def test_readonly_cache_does_not_write(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(path, mode="readonly")
+    cache.put("k", {"x": 1})
+    assert cache.get("k") is None
+    cache.close()
+
+
+def test_cache_hits_are_tagged(tmp_path):
+    evaluator = BaseEvaluator(
+        api_key="test",
+        reward_calculator=None,
+        api_url="http://127.0.0.1:9/v1",
+        api_model="test",
+        response_cache_path=str(tmp_path / "responses.sqlite"),
+    )
+    payload = evaluator._build_payload({"messages": [{"role": "user", "content": "q"}]})
+    usage = {"prompt_tokens": 3, "completion_tokens": 1, "total_tokens": 4}
+
+    async def run():
+        await evaluator.response_cache.aput(
+            evaluator._response_cache_key(payload),
+            {"choices": [{"message": {"role": "assistant", "content": "a"}}], "usage": usage},
+        )
+        return await evaluator._call_api(payload)
+
+    response, cached_usage = asyncio.run(run())
+    assert response["cached"] is True
+    assert cached_usage == usage
+    # 缓存中的响应不带标记
+    assert "cached" not in evaluator.response_cache.get(evaluator._response_cache_key(payload))
+    evaluator.response_cache.close()
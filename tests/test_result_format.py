@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from internbootcamp.utils.result_format import compact_result, expand_result, export_parquet_shards, parquet_schema
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _write_results(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _success(index, score):
+    return {
+        "input": {"data_source": "demo", "prompt": [{"role": "user", "content": f"q{index}"}]},
+        "messages": [{"role": "user", "content": f"q{index}"}, {"role": "assistant", "content": f"a{index}"}],
+        "response_context": f"Assistant:\na{index}\n",
+        "extracted_output": f"a{index}",
+        "score": score,
+        "success": True,
+        "timing": {"total": 1.0},
+    }
+
+
+def _failure(index):
+    return {
+        "input": {"data_source": "demo", "prompt": [{"role": "user", "content": f"q{index}"}]},
+        "messages": [],
+        "score": 0,
+        "success": False,
+        "error": "boom",
+    }
+
+
+def test_compact_roundtrip_keeps_prompt_once():
+    record = _success(0, 1.0)
+    compact = compact_result(record)
+    assert compact["messages"] == [{"role": "assistant", "content": "a0"}]
+    assert "response_context" not in compact
+    assert expand_result(compact)["messages"] == record["messages"]
+
+
+def test_parquet_shards_share_fixed_schema(tmp_path):
+    # 第一条结果失败：之前的实现按第一行推断 schema，会丢掉 extracted_output / timing 等列
+    records = [_failure(0), None, _success(1, True), _success(2, 0.5), _success(3, 1)]
+    result_path = tmp_path / "eval_results_demo.jsonl"
+    _write_results(result_path, records)
+
+    shard_paths = export_parquet_shards(str(result_path), str(tmp_path / "parquet"), shard_size=2)
+
+    assert len(shard_paths) == 2
+    tables = [pq.read_table(path) for path in shard_paths]
+    assert all(table.schema.equals(parquet_schema()) for table in tables)
+    rows = [row for table in tables for row in table.to_pylist()]
+    assert [row["score"] for row in rows] == [0.0, 1.0, 0.5, 1.0]
+    assert rows[0]["error"] == "boom"
+    assert rows[0]["extracted_output"] is None
+    assert json.loads(rows[1]["extracted_output"]) == "a1"
+    assert json.loads(rows[1]["timing"]) == {"total": 1.0}
+    assert rows[1]["data_source"] == "demo"
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import pytest
+
+from internbootcamp.utils.eval_report import stats_path_for
+from internbootcamp.utils.result_format import iter_results
+from internbootcamp.utils.result_writer import AsyncResultWriter, encode_jsonl_line
+from internbootcamp.utils.resume_index import index_path_for
+
+
+def _result(index):
+    return {"input": {"data_source": "demo", "id": index}, "success": index % 2 == 0, "score": 1.0, "sample_key": f"key-{index}"}
+
+
+def _write_all(path, records, **kwargs):
+    async def run():
+        writer = AsyncResultWriter(path, index_path=index_path_for(path), stats_path=stats_path_for(path), **kwargs)
+        await writer.start()
+        for record in records:
+            await writer.write(record)
+        await writer.close()
+        return writer
+
+    return asyncio.run(run())
+
+
+def test_writes_results_index_and_stats_in_order(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    records = [_result(index) for index in range(10)] + [None]
+    writer = _write_all(path, records, flush_lines=3, flush_interval=0.01)
+    assert writer.written_count == 11
+
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == records
+    with open(index_path_for(path), encoding="utf-8") as f:
+        assert f.read().split() == [f"key-{index}" for index in range(10)]
+    with open(stats_path_for(path), encoding="utf-8") as f:
+        stats = [json.loads(line) for line in f]
+    assert [record["sample_key"] for record in stats] == [f"key-{index}" for index in range(10)]
+
+
+def test_appends_to_existing_file(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    _write_all(path, [_result(0)])
+    _write_all(path, [_result(1)])
+    assert [record["input"]["id"] for record in iter_results(path)] == [0, 1]
+
+
+def test_zstd_output(tmp_path):
+    pytest.importorskip("zstandard")
+    path = str(tmp_path / "results.jsonl.zst")
+    records = [_result(index) for index in range(5)]
+    _write_all(path, records[:3], flush_lines=2)
+    _write_all(path, records[3:])
+    assert list(iter_results(path)) == records
+
+
+def test_write_requires_start(tmp_path):
+    writer = AsyncResultWriter(str(tmp_path / "results.jsonl"))
+    with pytest.raises(RuntimeError):
+        asyncio.run(writer.write({}))
+
+
+def test_encode_jsonl_line():
+    line = encode_jsonl_line({"text": "中文", "n": 1})
+    assert line.endswith(b"\n")
+    assert json.loads(line) == {"text": "中文", "n": 1}
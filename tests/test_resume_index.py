@@ -0,0 +1,63 @@
+import json
+import os
+
+from internbootcamp.utils.resume_index import (
+    append_index_keys,
+    compute_sample_key,
+    index_path_for,
+    load_completed_index,
+    load_completed_keys,
+)
+
+
+def _write_results(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def test_sample_key_uses_field_then_falls_back_to_hash():
+    item = {"prompt": "q", "extra_info": {"index": 7}}
+    assert compute_sample_key(item, "extra_info.index") == "extra_info.index=7"
+    # 缺少键字段时回退到内容哈希
+    missing = {"prompt": "q", "extra_info": {}}
+    assert compute_sample_key(missing, "extra_info.index") == compute_sample_key(missing)
+    assert compute_sample_key(missing).startswith("blake2b:")
+
+
+def test_content_hash_ignores_key_order():
+    assert compute_sample_key({"a": 1, "b": [1, 2]}) == compute_sample_key({"b": [1, 2], "a": 1})
+    assert compute_sample_key({"a": 1}) != compute_sample_key({"a": 2})
+
+
+def test_rebuilds_index_from_legacy_results(tmp_path):
+    result_path = str(tmp_path / "results.jsonl")
+    first = {"prompt": "q1", "extra_info": {"index": 1}}
+    legacy = {"prompt": "q2"}
+    _write_results(result_path, [
+        {"input": first, "sample_key": "custom-key", "success": True},
+        {"input": legacy, "success": False},
+        {"input": legacy, "success": True},  # 重复样本
+        None,
+    ])
+    with open(result_path, "a", encoding="utf-8") as f:
+        f.write("\n")
+
+    keys, count = load_completed_index(result_path, "extra_info.index")
+    assert keys == {"custom-key", compute_sample_key(legacy)}
+    assert count == 3
+    # 重建的索引每条结果一行，再次读取时结果一致
+    assert os.path.exists(index_path_for(result_path))
+    assert load_completed_index(result_path, "extra_info.index") == (keys, 3)
+    assert load_completed_keys(result_path) == keys
+
+
+def test_reads_existing_index(tmp_path):
+    result_path = str(tmp_path / "results.jsonl")
+    _write_results(result_path, [{"input": {"prompt": "ignored"}}])
+    append_index_keys(index_path_for(result_path), ["a", "b", "a"])
+    assert load_completed_index(result_path) == ({"a", "b"}, 3)
+
+
+def test_missing_result_file(tmp_path):
+    assert load_completed_index(str(tmp_path / "missing.jsonl")) == (set(), 0)
@@ -0,0 +1,130 @@
+import asyncio
+
+import httpx
+import pytest
+
+from internbootcamp.utils.retry_policy import (
+    TOOL_RETRYABLE_STATUS_CODES,
+    RetryBudget,
+    RetryPolicy,
+    StatusCodeError,
+    classify_error,
+)
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [
+        (StatusCodeError(429), "rate_limit"),
+        (StatusCodeError(408), "timeout"),
+        (StatusCodeError(500), "server_error"),
+        (StatusCodeError(503), "server_error"),
+        (StatusCodeError(400), "client_error"),
+        (StatusCodeError(422), "client_error"),
+        (asyncio.TimeoutError(), "timeout"),
+        (httpx.ReadTimeout("read"), "timeout"),
+        (httpx.ConnectError("refused"), "connection"),
+        (ConnectionResetError(), "connection"),
+        (ValueError("bad json"), "other"),
+    ],
+)
+def test_classify_error(error, expected):
+    assert classify_error(error) == expected
+
+
+def _flaky(errors):
+    """依次抛出 errors 中的异常，之后返回 "ok"；返回 (func, 调用计数)"""
+    calls = []
+
+    async def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return func, calls
+
+
+def _run(policy, func):
+    return asyncio.run(policy.call(func))
+
+
+def test_retries_retryable_errors_then_succeeds():
+    policy = RetryPolicy("test", max_attempts=3, base_delay=0, max_delay=0)
+    func, calls = _flaky([StatusCodeError(503), ConnectionResetError()])
+    assert _run(policy, func) == "ok"
+    assert len(calls) == 3
+    stats = policy.snapshot()
+    assert stats["server_error"]["retries"] == 1
+    assert stats["connection"]["retries"] == 1
+
+
+def test_client_error_is_not_retried():
+    policy = RetryPolicy("test", max_attempts=5, base_delay=0, max_delay=0)
+    func, calls = _flaky([StatusCodeError(400)])
+    with pytest.raises(StatusCodeError):
+        _run(policy, func)
+    assert len(calls) == 1
+
+
+def test_tool_policy_only_retries_gateway_status_codes():
+    policy = RetryPolicy("tool", max_attempts=5, base_delay=0, max_delay=0, retryable_status_codes=TOOL_RETRYABLE_STATUS_CODES)
+    # 500：工具本身的错误，不重试
+    func, calls = _flaky([StatusCodeError(500)])
+    with pytest.raises(StatusCodeError):
+        _run(policy, func)
+    assert len(calls) == 1
+    # 429 同样不重试
+    func, calls = _flaky([StatusCodeError(429)])
+    with pytest.raises(StatusCodeError):
+        _run(policy, func)
+    assert len(calls) == 1
+    # 502/503/504 与传输层错误重试
+    func, calls = _flaky([StatusCodeError(502), StatusCodeError(504), asyncio.TimeoutError()])
+    assert _run(policy, func) == "ok"
+    assert len(calls) == 4
+
+
+def test_stops_at_max_attempts():
+    policy = RetryPolicy("test", max_attempts=2, base_delay=0, max_delay=0)
+    func, calls = _flaky([StatusCodeError(503)] * 5)
+    with pytest.raises(StatusCodeError):
+        _run(policy, func)
+    assert len(calls) == 2
+
+
+def test_budget_exhaustion_stops_retries():
+    policy = RetryPolicy("test", max_attempts=5, base_delay=0, max_delay=0, budget=RetryBudget(ratio=0, min_retries=1))
+    func, calls = _flaky([StatusCodeError(503)] * 5)
+    with pytest.raises(StatusCodeError):
+        _run(policy, func)
+    assert len(calls) == 2
+    assert policy.snapshot()["server_error"]["budget_exhausted"] == 1
+
+
+def _mcp_tool(config):
+    from verl.tools.schemas import OpenAIFunctionToolSchema
+
+    from internbootcamp.src.base_mcp_tool import BaseMCPTool
+
+    schema = OpenAIFunctionToolSchema.model_validate({
+        "type": "function",
+        "function": {"name": "search", "description": "search", "parameters": {"type": "object", "properties": {}, "required": []}},
+    })
+    return BaseMCPTool({"mcp_server_url": "http://127.0.0.1:9", **config}, schema)
+
+
+@pytest.mark.parametrize("config, expected_attempts", [({}, 16), ({"retry_attempts": 3}, 3)])
+def test_mcp_tool_default_attempts(config, expected_attempts):
+    tool = _mcp_tool(config)
+    tool.retry_policy.base_delay = 0
+    calls = []
+
+    async def post_execute(instance_id, parameters):
+        calls.append(instance_id)
+        raise StatusCodeError(503)
+
+    tool._post_execute = post_execute
+    text, reward, _ = asyncio.run(tool._call_tool("instance", {}))
+    assert len(calls) == expected_attempts
+    assert "503" in text and reward == 0.0
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from internbootcamp.utils.tool_server import server_log
+from internbootcamp.utils.tool_server.server_log import ServerLogger
+
+
+def _read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_level_filtering(tmp_path):
+    path = tmp_path / "server.log"
+    logger = ServerLogger("test-level", log_file=str(path), level="WARNING", console=False)
+    assert not logger.should_log("INFO")
+    assert logger.should_log("WARNING")
+    assert logger.should_log("ERROR")
+    logger.log("debug", "DEBUG")
+    logger.log("info")
+    logger.log("warning", "WARNING")
+    logger.log("error", "ERROR")
+    logger.close()
+    lines = _read_lines(path)
+    assert [line.split("] ", 1)[1] for line in lines] == ["warning", "error"]
+    assert all(line.startswith("[") for line in lines)
+
+
+def test_invalid_level():
+    with pytest.raises(ValueError):
+        ServerLogger("test-invalid", level="TRACE", console=False)
+
+
+def test_sampled_logs_follow_sample_rate(monkeypatch):
+    logger = ServerLogger("test-sample", level="DEBUG", sample_rate=0.25, console=False)
+    monkeypatch.setattr(server_log.random, "random", lambda: 0.2)
+    assert logger.should_log("DEBUG", sampled=True)
+    monkeypatch.setattr(server_log.random, "random", lambda: 0.3)
+    assert not logger.should_log("DEBUG", sampled=True)
+    assert not logger.should_log("INFO", sampled=True)
+    # 未采样的日志与 WARNING 及以上不受采样率影响
+    assert logger.should_log("INFO")
+    assert logger.should_log("WARNING", sampled=True)
+    logger.close()
+
+
+def test_json_format_includes_fields(tmp_path):
+    path = tmp_path / "server.jsonl"
+    logger = ServerLogger("test-json", log_file=str(path), json_format=True, console=False)
+    logger.log("Worker注册成功", worker_id="w1", tools=["ToolA"])
+    logger.close()
+    [line] = _read_lines(path)
+    entry = json.loads(line)
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "internbootcamp.tool_server.test-json"
+    assert entry["message"] == "Worker注册成功"
+    assert entry["worker_id"] == "w1" and entry["tools"] == ["ToolA"]
+    assert "time" in entry
+
+
+def test_close_flushes_queue(tmp_path):
+    path = tmp_path / "server.log"
+    logger = ServerLogger("test-flush", log_file=str(path), console=False)
+    for index in range(1000):
+        logger.log(f"line {index}")
+    logger.close()
+    lines = _read_lines(path)
+    assert len(lines) == 1000
+    assert lines[-1].endswith("line 999")
+    # 重复关闭是安全的
+    logger.close()
+
+
+def test_close_unregisters_atexit_hook(monkeypatch):
+    registered = []
+    monkeypatch.setattr(server_log.atexit, "register", registered.append)
+    monkeypatch.setattr(server_log.atexit, "unregister", registered.remove)
+    logger = ServerLogger("test-atexit", console=False)
+    assert registered == [logger.close]
+    logger.close()
+    assert registered == []
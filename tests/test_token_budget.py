@@ -0,0 +1,36 @@
+from internbootcamp.utils.token_budget import (
+    CHARS_PER_TOKEN,
+    IMAGE_TOKENS,
+    MESSAGE_OVERHEAD_TOKENS,
+    ConversationTokenCounter,
+)
+
+
+def test_estimate_ignores_base64_image_data():
+    image = "data:image/png;base64," + "A" * 300_000
+    messages = [
+        {"role": "system", "content": "s" * 30},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "t" * 60},
+                {"type": "image_url", "image_url": {"url": image}},
+            ],
+        },
+    ]
+    tokens = ConversationTokenCounter().count(messages)
+    expected = 30 // CHARS_PER_TOKEN + 60 // CHARS_PER_TOKEN + 2 * MESSAGE_OVERHEAD_TOKENS + IMAGE_TOKENS
+    assert tokens == expected
+
+
+def test_usage_becomes_base_for_incremental_count():
+    counter = ConversationTokenCounter()
+    messages = [{"role": "user", "content": "q" * 30}]
+    counter.count(messages)
+    messages.append({"role": "assistant", "content": "a"})
+    counter.observe_usage({"prompt_tokens": 100, "completion_tokens": 20}, len(messages))
+    messages.append({"role": "tool", "content": "r" * 90})
+    assert counter.count(messages) == 120 + 90 // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+    # 估计的 usage 不作为基准
+    counter.observe_usage({"prompt_tokens": 5, "completion_tokens": 5, "estimated": True}, len(messages))
+    assert counter.count(messages) == 120 + 90 // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+from internbootcamp.src.base_evaluator import BaseEvaluator
+
+
+class FakeTool:
+    """execute 按参数中的 delay 等待，记录执行顺序与同时执行数"""
+
+    def __init__(self, name, stats):
+        self.name = name
+        self.stats = stats
+
+    async def create(self, instance_id=None, **kwargs):
+        return instance_id or f"{self.name}-instance"
+
+    async def execute(self, instance_id, parameters):
+        stats = self.stats
+        stats["active"] += 1
+        stats["active_by_tool"][self.name] = stats["active_by_tool"].get(self.name, 0) + 1
+        stats["max_active"] = max(stats["max_active"], stats["active"])
+        stats["max_active_by_tool"][self.name] = max(
+            stats["max_active_by_tool"].get(self.name, 0), stats["active_by_tool"][self.name]
+        )
+        try:
+            await asyncio.sleep(parameters["delay"])
+        finally:
+            stats["active"] -= 1
+            stats["active_by_tool"][self.name] -= 1
+        stats["finished"].append(parameters["x"])
+        return f"{self.name}:{parameters['x']}", float(parameters["x"]), {"x": parameters["x"]}
+
+    async def calc_reward(self, instance_id):
+        return 0.0
+
+
+def _evaluator(max_parallel_tool_calls):
+    return BaseEvaluator(
+        api_key="test",
+        reward_calculator=None,
+        api_url="http://127.0.0.1:9/v1",
+        api_model="test",
+        max_parallel_tool_calls=max_parallel_tool_calls,
+    )
+
+
+def _tool_call(name, x, delay):
+    return {
+        "id": f"call-{x}",
+        "type": "function",
+        "function": {"name": name, "arguments": json.dumps({"x": x, "delay": delay})},
+    }
+
+
+def _run(evaluator, tool_calls, names=None):
+    stats = {"active": 0, "max_active": 0, "active_by_tool": {}, "max_active_by_tool": {}, "finished": []}
+    names = names or sorted({tool_call["function"]["name"] for tool_call in tool_calls})
+    tool_instances = {name: {"instance": FakeTool(name, stats)} for name in names}
+    instance_ids = {name: None for name in names}
+    result = asyncio.run(evaluator._execute_tool_calls(tool_calls, instance_ids, {}, tool_instances))
+    return result, stats
+
+
+def test_responses_keep_tool_call_order():
+    tool_calls = [_tool_call("a", 0, 0.06), _tool_call("b", 1, 0.0), _tool_call("c", 2, 0.03)]
+    (instance_ids, messages, tool_reward, tool_metrics, _), stats = _run(_evaluator(4), tool_calls)
+    # 完成顺序与调用顺序不同
+    assert stats["finished"] == [1, 2, 0]
+    assert [message["content"] for message in messages] == ["a:0", "b:1", "c:2"]
+    assert [message["tool_call_id"] for message in messages] == ["call-0", "call-1", "call-2"]
+    assert all(message["role"] == "tool" for message in messages)
+    # 奖励与指标取最后一个工具调用
+    assert (tool_reward, tool_metrics) == (2.0, {"x": 2})
+    assert instance_ids == {"a": "a-instance", "b": "b-instance", "c": "c-instance"}
+
+
+def test_calls_to_same_tool_are_serialized():
+    tool_calls = [_tool_call("a", 0, 0.03), _tool_call("b", 1, 0.02), _tool_call("a", 2, 0.0), _tool_call("a", 3, 0.01)]
+    (_, messages, _, _, _), stats = _run(_evaluator(4), tool_calls)
+    assert stats["max_active_by_tool"] == {"a": 1, "b": 1}
+    # 不同工具并发执行
+    assert stats["max_active"] == 2
+    # 同名工具按调用顺序执行
+    assert [x for x in stats["finished"] if x != 1] == [0, 2, 3]
+    assert [message["content"] for message in messages] == ["a:0", "b:1", "a:2", "a:3"]
+
+
+def test_max_parallel_tool_calls_caps_concurrency():
+    tool_calls = [_tool_call(f"tool{index}", index, 0.02) for index in range(6)]
+    _, stats = _run(_evaluator(2), tool_calls)
+    assert stats["max_active"] == 2
+    _, stats = _run(_evaluator(6), tool_calls)
+    assert stats["max_active"] == 6
+    # max_parallel_tool_calls=1 时顺序执行
+    _, stats = _run(_evaluator(1), tool_calls)
+    assert stats["max_active"] == 1
+    assert stats["finished"] == list(range(6))
+
+
+def test_unknown_tool_and_bad_arguments_return_errors():
+    tool_calls = [
+        _tool_call("a", 5, 0.0),
+        {"id": "call-x", "type": "function", "function": {"name": "missing", "arguments": "{}"}},
+        {"id": "call-y", "type": "function", "function": {"name": "a", "arguments": "not json"}},
+    ]
+    (_, messages, tool_reward, _, _), _ = _run(_evaluator(4), tool_calls, names=["a"])
+    assert messages[0]["content"] == "a:5"
+    assert "未注册" in messages[1]["content"]
+    assert messages[2]["content"].startswith("Error calling a")
+    # 失败的调用不覆盖奖励
+    assert tool_reward == 5.0
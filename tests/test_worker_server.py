@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from internbootcamp.src.base_tool import BaseTool
+from internbootcamp.utils.tool_server.worker_server import DistributedWorkerServer
+
+
+class CounterTool(BaseTool):
+    """每个实例一个计数器；execute 把 n 加到计数器上"""
+
+    def __init__(self, config, tool_schema):
+        super().__init__(config, tool_schema)
+        self.state = {}
+
+    async def create(self, instance_id=None, identity=None, **kwargs):
+        self.state[instance_id] = 0
+        return instance_id
+
+    async def execute(self, instance_id, parameters, **kwargs):
+        await asyncio.sleep(0.01)
+        if parameters.get("fail"):
+            raise RuntimeError("tool bug")
+        self.state[instance_id] += parameters.get("n", 1)
+        return f"{instance_id}={self.state[instance_id]}", 0.0, {}
+
+    async def calc_reward(self, instance_id, **kwargs):
+        return float(self.state[instance_id])
+
+    async def release(self, instance_id, **kwargs):
+        return self.state.pop(instance_id, None) is not None
+
+
+TOOLS_CONFIG = [{
+    "class_name": f"{__name__}.CounterTool",
+    "tool_schema": {"type": "function", "function": {"name": "counter"}},
+    "config": {},
+}]
+
+
+@pytest.fixture
+def client():
+    worker = DistributedWorkerServer(TOOLS_CONFIG, "127.0.0.1", 0, "test-worker", log_options={"console": False})
+    with TestClient(worker.app) as test_client:
+        yield test_client
+    worker.logger.close()
+
+
+def test_execute_batch_keeps_per_instance_order(client):
+    operations = []
+    for instance_id in ("a", "b"):
+        operations.append({"op": "create", "instance_id": instance_id})
+    for n in (1, 2, 3):
+        for instance_id in ("a", "b"):
+            operations.append({"op": "execute", "instance_id": instance_id, "parameters": {"n": n}})
+    operations += [
+        {"op": "calc_reward", "instance_id": "a"},
+        {"op": "release", "instance_id": "a"},
+        {"op": "unknown", "instance_id": "b"},
+    ]
+    results = client.post("/CounterTool/execute_batch", json={"operations": operations}).json()["results"]
+    assert len(results) == len(operations)
+    assert results[0] == {"success": True, "result": "a"}
+    # 同一实例的操作按提交顺序执行，结果与操作一一对应
+    assert [result[0] for result in results[2:8]] == ["a=1", "b=1", "a=3", "b=3", "a=6", "b=6"]
+    assert results[8] == 6.0
+    assert results[9] == {"success": True, "result": True}
+    assert results[10]["success"] is False
+
+
+def test_batch_results_match_single_endpoints(client):
+    client.post("/CounterTool/create", json={"instance_id": "s"})
+    single = client.post("/CounterTool/execute", json={"instance_id": "s", "n": 5}).json()
+    batch = client.post("/CounterTool/execute_batch", json={"operations": [
+        {"op": "execute", "instance_id": "s", "parameters": {"n": 5}},
+    ]}).json()["results"]
+    assert single == ["s=5", 0.0, {}]
+    assert batch == [["s=10", 0.0, {}]]
+
+
+def test_tool_errors_are_returned_as_results(client):
+    client.post("/CounterTool/create", json={"instance_id": "e"})
+    # 工具异常作为结果返回（HTTP 200），客户端不会按 5xx 重试
+    response = client.post("/CounterTool/execute", json={"instance_id": "e", "fail": True})
+    assert response.status_code == 200
+    text, reward, metrics = response.json()
+    assert text.startswith("Tool execution failed") and reward == 0.0 and metrics["error"] == "tool bug"
+    batch = client.post("/CounterTool/execute_batch", json={"operations": [
+        {"op": "execute", "instance_id": "e", "parameters": {"fail": True}},
+    ]}).json()["results"]
+    assert batch[0][0].startswith("Tool execution failed") and batch[0][2] == {"error": "tool bug"}